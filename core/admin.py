@@ -2,7 +2,8 @@ from django.contrib import admin
 from .models import (
     Grower, Farm, PlantType, PlantPart, Pest, Disease,
     Region, SurveillanceCalculation, BoundaryMappingToken,
-    SeasonalStage, SurveySession, Observation, ObservationImage
+    SeasonalStage, SurveySession, Observation, ObservationImage, ImageUpload,
+    ImageBlob, SurveySessionSummary, CadastralBoundary
 )
 
 # Register your models here.
@@ -109,7 +110,7 @@ class SurveySessionAdmin(admin.ModelAdmin):
 class ObservationImageInline(admin.TabularInline):
     model = ObservationImage
     extra = 0
-    readonly_fields = ('uploaded_at',) 
+    readonly_fields = ('uploaded_at', 'blob')
 
 @admin.register(Observation)
 class ObservationAdmin(admin.ModelAdmin):
@@ -135,4 +136,28 @@ class ObservationAdmin(admin.ModelAdmin):
 # ObservationImage is managed inline via ObservationAdmin, no need to register separately unless desired
 # admin.site.register(ObservationImage)
 
+@admin.register(ImageUpload)
+class ImageUploadAdmin(admin.ModelAdmin):
+    list_display = ('upload_id', 'session', 'uploaded_by', 'filename', 'offset', 'total_size', 'status', 'updated_at')
+    list_filter = ('status',)
+    search_fields = ('upload_id', 'filename', 'session__session_id')
+    readonly_fields = ('upload_id', 'storage_path', 'offset', 'created_at', 'updated_at')
+
+@admin.register(ImageBlob)
+class ImageBlobAdmin(admin.ModelAdmin):
+    list_display = ('sha256', 'size', 'ref_count', 'created_at')
+    search_fields = ('sha256',)
+    readonly_fields = ('sha256', 'file', 'thumbnail', 'size', 'ref_count', 'created_at')
+
+@admin.register(SurveySessionSummary)
+class SurveySessionSummaryAdmin(admin.ModelAdmin):
+    list_display = ('session', 'observation_count', 'image_count', 'built_at')
+    readonly_fields = ('built_at',)
+
+@admin.register(CadastralBoundary)
+class CadastralBoundaryAdmin(admin.ModelAdmin):
+    list_display = ('geoscape_address_id', 'fetched_at', 'validated_at', 'expires_at')
+    search_fields = ('geoscape_address_id',)
+    readonly_fields = ('fetched_at', 'validated_at')
+
 # ---> END NEW ADMIN REGISTRATIONS <---
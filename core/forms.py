@@ -140,6 +140,25 @@ class FarmForm(forms.ModelForm):
         return cleaned_data
 
 
+class FarmImportForm(forms.Form):
+    """Form for uploading a CSV or GeoJSON list of farms."""
+    file = forms.FileField(
+        label="Farm list (CSV or GeoJSON)",
+        widget=forms.ClearableFileInput(attrs={'accept': '.csv,.json,.geojson'}),
+        help_text="Columns/properties: name, region, size_hectares, stocking_rate, plant_type, address, geoscape_address_id"
+    )
+    dry_run = forms.BooleanField(
+        required=False,
+        label="Check only (don't create farms)"
+    )
+
+    def clean_file(self):
+        upload = self.cleaned_data['file']
+        if not upload.name.lower().endswith(('.csv', '.json', '.geojson')):
+            raise ValidationError("Upload a .csv, .json or .geojson file.")
+        return upload
+
+
 class UserEditForm(forms.ModelForm):
     """Form for editing user account details."""
     class Meta:
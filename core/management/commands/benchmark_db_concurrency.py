@@ -0,0 +1,166 @@
+import os
+import time
+import logging
+import tempfile
+import threading
+import statistics
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from ...models import Grower, Farm, SurveySession
+
+SQLITE_PROFILES = ('default', 'tuned')
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks concurrent observation saves: N simulated surveyors auto-save drafts and '
+        'submit observations at the same time on a scratch database. On SQLite it runs once '
+        "with SQLite's defaults and once with the SQLITE_PRAGMAS profile; on PostgreSQL it "
+        'uses a temporary test database, so running it under each DB_ENGINE compares the two.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--surveyors', type=int, default=8, help='Concurrent surveyors (threads).')
+        parser.add_argument('--observations', type=int, default=20, help='Observations submitted per surveyor.')
+        parser.add_argument('--autosaves', type=int, default=2, help='Draft auto-saves before each submit.')
+        parser.add_argument('--profile', choices=SQLITE_PROFILES + ('both',), default='both',
+                            help='SQLite profile(s) to measure (ignored on PostgreSQL).')
+
+    def handle(self, *args, **options):
+        # Failed requests log tracebacks; keep the benchmark output readable
+        logging.disable(logging.CRITICAL)
+        try:
+            if connection.vendor == 'sqlite':
+                results = self._benchmark_sqlite(options)
+            elif connection.vendor == 'postgresql':
+                results = {'postgresql': self._benchmark_test_database(options)}
+            else:
+                raise CommandError(f"Unsupported database backend '{connection.vendor}'.")
+        finally:
+            logging.disable(logging.NOTSET)
+
+        self.stdout.write(self.style.NOTICE("--- Results ---"))
+        self.stdout.write(f"  {'profile':<10} {'requests':>8} {'failed':>7} {'seconds':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+        for profile, r in results.items():
+            self.stdout.write(
+                f"  {profile:<10} {r['requests']:>8} {r['failed']:>7} {r['seconds']:>8.2f} "
+                f"{r['throughput']:>8.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f}"
+            )
+        if len(results) == 2 and results['default']['throughput']:
+            gain = results['tuned']['throughput'] / results['default']['throughput']
+            self.stdout.write(self.style.SUCCESS(f"--- Tuned profile: {gain:.2f}x the throughput of the default ---"))
+
+    def _benchmark_sqlite(self, options):
+        """Runs each SQLite profile on its own scratch database file."""
+        tuned_pragmas = getattr(settings, 'SQLITE_PRAGMAS', None) or {}
+        if options['profile'] in ('tuned', 'both') and not tuned_pragmas:
+            raise CommandError('SQLITE_PRAGMAS is empty, so there is no tuned profile to measure.')
+
+        db_settings = connections.settings['default']
+        original_name = db_settings['NAME']
+        profiles = SQLITE_PROFILES if options['profile'] == 'both' else (options['profile'],)
+        results = {}
+        for profile in profiles:
+            pragmas = tuned_pragmas if profile == 'tuned' else {}
+            with tempfile.TemporaryDirectory() as tmp_dir, override_settings(SQLITE_PRAGMAS=pragmas):
+                connections.close_all()
+                db_settings['NAME'] = os.path.join(tmp_dir, 'bench.sqlite3')
+                try:
+                    self.stdout.write(self.style.NOTICE(f"--- Profile '{profile}': migrating scratch database ---"))
+                    call_command('migrate', verbosity=0, interactive=False)
+                    results[profile] = self._run(options)
+                finally:
+                    connections.close_all()
+                    db_settings['NAME'] = original_name
+        return results
+
+    def _benchmark_test_database(self, options):
+        """Runs on a temporary test database (test_<NAME>), created and dropped here."""
+        self.stdout.write(self.style.NOTICE(f"--- {connection.vendor}: creating test database ---"))
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            return self._run(options)
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def _run(self, options):
+        surveyors = []
+        for i in range(options['surveyors']):
+            user = User.objects.create_user(f'bench_surveyor_{i}', password='bench-password')
+            grower = Grower.objects.create(user=user, farm_name=f'Bench Farm {i}')
+            farm = Farm.objects.create(owner=grower, name=f'Bench Farm {i}', size_hectares=10, stocking_rate=100)
+            session = SurveySession.objects.create(
+                farm=farm, surveyor=user, status='in_progress',
+                target_plants_surveyed=options['observations']
+            )
+            client = Client(HTTP_HOST='localhost', HTTP_USER_AGENT='iphone')
+            client.force_login(user)
+            surveyors.append((client, session))
+        connection.close()
+
+        latencies = []
+        failures = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(len(surveyors))
+        auto_save_url = reverse('core:api_auto_save_observation')
+        create_url = reverse('core:api_create_observation')
+
+        def survey(client, session):
+            local_latencies, local_failures = [], 0
+            barrier.wait()
+            try:
+                for n in range(options['observations']):
+                    data = {
+                        'session_id': str(session.session_id),
+                        'latitude': f'{-12.46 + n * 1e-5:.7f}',
+                        'longitude': '130.8400000',
+                        'gps_accuracy': '4.0',
+                        'notes': f'Plant {n + 1}',
+                        # The survey form always sends the plant number
+                        'plant_sequence_number': str(n + 1),
+                    }
+                    for _ in range(options['autosaves']):
+                        started = time.perf_counter()
+                        response = client.post(auto_save_url, data)
+                        local_latencies.append(time.perf_counter() - started)
+                        if response.status_code == 200:
+                            data['draft_id'] = response.json().get('draft_id') or ''
+                        else:
+                            local_failures += 1
+                    started = time.perf_counter()
+                    response = client.post(create_url, data)
+                    local_latencies.append(time.perf_counter() - started)
+                    if response.status_code != 200:
+                        local_failures += 1
+            finally:
+                connection.close()
+            with lock:
+                latencies.extend(local_latencies)
+                failures.append(local_failures)
+
+        threads = [threading.Thread(target=survey, args=s) for s in surveyors]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        latencies_ms = sorted(l * 1000 for l in latencies)
+        return {
+            'requests': len(latencies_ms),
+            'failed': sum(failures),
+            'seconds': elapsed,
+            'throughput': len(latencies_ms) / elapsed if elapsed else 0.0,
+            'p50_ms': statistics.median(latencies_ms) if latencies_ms else 0.0,
+            'p95_ms': latencies_ms[int(0.95 * (len(latencies_ms) - 1))] if latencies_ms else 0.0,
+        }
@@ -0,0 +1,153 @@
+import io
+import os
+import random
+import contextlib
+import logging
+import tempfile
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import override_settings, CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ...models import Grower, Farm, SurveySession, Observation, Pest, Disease, PlantPart, SeasonalStage
+from ...services.view_cache import bump_version
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks the farm detail, session detail and active survey pages on a scratch '
+        'database, rendering them with template fragment caching off (FRAGMENT_CACHE_TIMEOUT=0) '
+        'and on. The per-user page cache is bypassed so only fragment caching is measured.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--observations', type=int, default=200, help='Observations in the benchmark session.')
+        parser.add_argument('--sessions', type=int, default=5, help='Completed sessions listed on the farm page.')
+        parser.add_argument('--repeat', type=int, default=20, help='Requests per page and mode.')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        logging.disable(logging.CRITICAL)
+        db_settings = connections.settings['default']
+        original_name = db_settings['NAME']
+        try:
+            if connection.vendor == 'sqlite':
+                with tempfile.TemporaryDirectory() as tmp_dir:
+                    connections.close_all()
+                    db_settings['NAME'] = os.path.join(tmp_dir, 'bench.sqlite3')
+                    try:
+                        self.stdout.write(self.style.NOTICE("--- Migrating scratch database ---"))
+                        call_command('migrate', verbosity=0, interactive=False)
+                        results = self._run(options)
+                    finally:
+                        connections.close_all()
+                        db_settings['NAME'] = original_name
+            else:
+                self.stdout.write(self.style.NOTICE(f"--- {connection.vendor}: creating test database ---"))
+                old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+                try:
+                    results = self._run(options)
+                finally:
+                    connections.close_all()
+                    connection.creation.destroy_test_db(old_name, verbosity=0)
+        finally:
+            logging.disable(logging.NOTSET)
+
+        self.stdout.write(self.style.NOTICE("--- Results (median per request) ---"))
+        self.stdout.write(f"  {'page':<16} {'uncached ms':>12} {'queries':>8} {'cached ms':>10} {'queries':>8} {'speedup':>8}")
+        for page, r in results.items():
+            speedup = r['off']['ms'] / r['on']['ms'] if r['on']['ms'] else 0.0
+            self.stdout.write(
+                f"  {page:<16} {r['off']['ms']:>12.1f} {r['off']['queries']:>8} "
+                f"{r['on']['ms']:>10.1f} {r['on']['queries']:>8} {speedup:>7.2f}x"
+            )
+
+    def _create_data(self, options):
+        rng = random.Random(options['seed'])
+        user = User.objects.create_user('bench_grower', password='bench-password')
+        grower = Grower.objects.create(user=user, farm_name='Bench Farm')
+        farm = Farm.objects.create(owner=grower, name='Bench Farm', size_hectares=20, stocking_rate=100)
+
+        pests = [Pest.objects.create(name=f'Bench pest {i}') for i in range(12)]
+        diseases = [Disease.objects.create(name=f'Bench disease {i}') for i in range(8)]
+        for i in range(5):
+            PlantPart.objects.create(name=f'Bench part {i}')
+        stage = SeasonalStage.objects.create(
+            name='Bench stage', months=','.join(str(m) for m in range(1, 13)), prevalence_p=0.05
+        )
+        stage.active_pests.set(pests[:6])
+        stage.active_diseases.set(diseases[:4])
+
+        now = timezone.now()
+        sessions = []
+        for s in range(options['sessions']):
+            start = now - timedelta(days=7 * (s + 1))
+            session = SurveySession.objects.create(
+                farm=farm, surveyor=user, status='completed',
+                start_time=start, end_time=start + timedelta(hours=2),
+                target_plants_surveyed=options['observations']
+            )
+            sessions.append(session)
+            count = options['observations'] if s == 0 else max(1, options['observations'] // 10)
+            for n in range(count):
+                obs = Observation.objects.create(
+                    session=session, status='completed',
+                    observation_time=start + timedelta(seconds=30 * n),
+                    latitude=f'{-12.46 + rng.uniform(0, 0.002):.7f}',
+                    longitude=f'{130.84 + rng.uniform(0, 0.002):.7f}',
+                    gps_accuracy='4.0', plant_sequence_number=n + 1,
+                    notes=f'Plant {n + 1}' if rng.random() < 0.3 else ''
+                )
+                obs.pests_observed.set(rng.sample(pests, rng.randint(0, 2)))
+                obs.diseases_observed.set(rng.sample(diseases, rng.randint(0, 1)))
+        return user, farm, sessions[0]
+
+    def _run(self, options):
+        user, farm, session = self._create_data(options)
+        client = Client(HTTP_HOST='localhost', HTTP_USER_AGENT='iphone')
+        client.force_login(user)
+        pages = {
+            'farm_detail': reverse('core:farm_detail', args=[farm.id]),
+            'session_detail': reverse('core:survey_session_detail', args=[session.session_id]),
+            'active_session': reverse('core:active_survey_session', args=[session.session_id]),
+        }
+
+        results = {}
+        for page, url in pages.items():
+            results[page] = {}
+            for mode, overrides in (('off', {'FRAGMENT_CACHE_TIMEOUT': 0}), ('on', {})):
+                cache.clear()
+                with override_settings(**overrides):
+                    # Warm-up request primes fragments (and the template loader)
+                    self._request(client, user, url)
+                    timings, queries = [], []
+                    for _ in range(options['repeat']):
+                        elapsed, query_count = self._request(client, user, url)
+                        timings.append(elapsed)
+                        queries.append(query_count)
+                results[page][mode] = {
+                    'ms': statistics.median(timings) * 1000,
+                    'queries': int(statistics.median(queries)),
+                }
+        return results
+
+    def _request(self, client, user, url):
+        # A new user version misses the per-user page cache but keeps fragments
+        bump_version('user', user.pk)
+        # Some views print debugging output; keep it out of the results
+        with CaptureQueriesContext(connection) as ctx, contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            response = client.get(url)
+            elapsed = time.perf_counter() - started
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {url} returned {response.status_code}")
+        return elapsed, len(ctx.captured_queries)
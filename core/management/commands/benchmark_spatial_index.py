@@ -0,0 +1,110 @@
+import os
+import time
+import sqlite3
+import tempfile
+import statistics
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from ...spatial_index import latlon_to_quadkeys, quadkey_ranges_for_bbox, METRES_PER_DEGREE
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks bounding-box queries on synthetic observations in a scratch SQLite '
+        'database, comparing a plain lat/lon scan with the quadkey index.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Number of synthetic observations.')
+        parser.add_argument('--queries', type=int, default=200, help='Number of random boxes to query.')
+        parser.add_argument('--box-size', type=float, default=500.0, help='Box edge length in metres.')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        rng = np.random.default_rng(options['seed'])
+
+        # Points spread over the Top End growing region
+        south, west, north, east = -14.5, 130.0, -12.0, 132.5
+        lats = rng.uniform(south, north, rows)
+        lons = rng.uniform(west, east, rows)
+
+        self.stdout.write(self.style.NOTICE(f"--- Building {rows:,} synthetic observations ---"))
+        started = time.perf_counter()
+        quadkeys = latlon_to_quadkeys(lats, lons)
+        self.stdout.write(f"  Quadkeys computed in {time.perf_counter() - started:.2f}s")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            conn = sqlite3.connect(os.path.join(tmp_dir, 'bench.sqlite3'))
+            conn.execute('CREATE TABLE observation (id INTEGER PRIMARY KEY, latitude REAL, longitude REAL, quadkey TEXT)')
+            conn.executemany(
+                'INSERT INTO observation (latitude, longitude, quadkey) VALUES (?, ?, ?)',
+                zip(lats.tolist(), lons.tolist(), quadkeys.tolist())
+            )
+            conn.execute('CREATE INDEX observation_quadkey ON observation (quadkey)')
+            conn.commit()
+            conn.execute('ANALYZE')
+
+            box_lat = options['box_size'] / METRES_PER_DEGREE
+            box_lon = options['box_size'] / (METRES_PER_DEGREE * np.cos(np.radians((south + north) / 2)))
+            boxes = []
+            for _ in range(options['queries']):
+                s = rng.uniform(south, north - box_lat)
+                w = rng.uniform(west, east - box_lon)
+                boxes.append((s, w, s + box_lat, w + box_lon))
+
+            scan_times, scan_counts = self._run_scan(conn, boxes)
+            index_times, index_counts = self._run_quadkey(conn, boxes)
+            conn.close()
+
+        if scan_counts != index_counts:
+            self.stdout.write(self.style.ERROR("  Result counts differ between strategies!"))
+
+        self._report('Full scan (latitude/longitude)', scan_times)
+        self._report('Quadkey index', index_times)
+        self.stdout.write(self.style.SUCCESS(
+            f"--- Done. Mean {statistics.mean(index_counts):.1f} rows per box; "
+            f"speed-up {statistics.median(scan_times) / statistics.median(index_times):.0f}x at the median ---"
+        ))
+
+    def _run_scan(self, conn, boxes):
+        times, counts = [], []
+        for s, w, n, e in boxes:
+            started = time.perf_counter()
+            count = conn.execute(
+                'SELECT COUNT(*) FROM observation WHERE latitude BETWEEN ? AND ? AND longitude BETWEEN ? AND ?',
+                (s, n, w, e)
+            ).fetchone()[0]
+            times.append(time.perf_counter() - started)
+            counts.append(count)
+        return times, counts
+
+    def _run_quadkey(self, conn, boxes):
+        times, counts = [], []
+        for s, w, n, e in boxes:
+            started = time.perf_counter()
+            clauses, params = [], []
+            for lo, hi in quadkey_ranges_for_bbox(s, w, n, e):
+                if hi is None:
+                    clauses.append('quadkey >= ?')
+                    params.append(lo)
+                else:
+                    clauses.append('(quadkey >= ? AND quadkey < ?)')
+                    params.extend([lo, hi])
+            count = conn.execute(
+                f'SELECT COUNT(*) FROM observation WHERE ({" OR ".join(clauses)}) '
+                'AND latitude BETWEEN ? AND ? AND longitude BETWEEN ? AND ?',
+                params + [s, n, w, e]
+            ).fetchone()[0]
+            times.append(time.perf_counter() - started)
+            counts.append(count)
+        return times, counts
+
+    def _report(self, label, times):
+        ordered = sorted(times)
+        p95 = ordered[int(len(ordered) * 0.95) - 1] if len(ordered) > 1 else ordered[0]
+        self.stdout.write(
+            f"  {label:<32} median {statistics.median(times) * 1000:8.3f} ms   p95 {p95 * 1000:8.3f} ms"
+        )
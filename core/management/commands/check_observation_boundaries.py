@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+
+from ...models import Farm, Observation
+from ...services.geofence_service import get_prepared_boundary
+from ...services.session_summary_service import discard_session_summaries
+from ...services.view_cache import bump_version
+
+
+class Command(BaseCommand):
+    help = 'Flags observations whose coordinates fall outside their farm boundary.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--farm', type=int, help='Only check observations for this farm ID.')
+
+    def handle(self, *args, **options):
+        farms = Farm.objects.filter(boundary__isnull=False).order_by('id')
+        if options['farm']:
+            farms = farms.filter(id=options['farm'])
+
+        self.stdout.write(self.style.NOTICE(f"--- Checking observations for {farms.count()} farm(s) ---"))
+        total_outside = 0
+        for farm in farms.iterator():
+            prepared = get_prepared_boundary(farm)
+            if prepared is None:
+                self.stdout.write(self.style.WARNING(f"  Farm {farm.id} '{farm.name}': boundary unusable, skipped."))
+                continue
+
+            observations = list(
+                Observation.objects.filter(
+                    session__farm=farm, latitude__isnull=False, longitude__isnull=False
+                ).only('id', 'session_id', 'latitude', 'longitude', 'outside_boundary')
+            )
+            if not observations:
+                continue
+
+            inside = prepared.contains_many(
+                [float(obs.latitude) for obs in observations],
+                [float(obs.longitude) for obs in observations]
+            )
+            changed = []
+            for obs, is_inside in zip(observations, inside):
+                outside = not bool(is_inside)
+                if obs.outside_boundary != outside:
+                    obs.outside_boundary = outside
+                    changed.append(obs)
+            Observation.objects.bulk_update(changed, ['outside_boundary'], batch_size=1000)
+            # bulk_update sends no post_save, so invalidate the summaries and cached pages here
+            if changed:
+                changed_sessions = {obs.session_id for obs in changed}
+                discard_session_summaries(changed_sessions)
+                for session_id in changed_sessions:
+                    bump_version('session', session_id)
+                bump_version('farm', farm.id)
+
+            outside_count = int((~inside).sum())
+            total_outside += outside_count
+            self.stdout.write(
+                f"  Farm {farm.id} '{farm.name}': {len(observations)} checked, {outside_count} outside boundary."
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"--- Done. {total_outside} observation(s) flagged outside their farm ---"))
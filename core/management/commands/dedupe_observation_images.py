@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from ...models import ObservationImage, ImageBlob
+from ...services.image_storage_service import adopt_legacy_image
+
+
+class Command(BaseCommand):
+    help = 'Moves observation images stored before deduplication into the content-addressed blob store.'
+
+    def handle(self, *args, **options):
+        legacy_images = ObservationImage.objects.filter(blob__isnull=True).order_by('id')
+        total = legacy_images.count()
+        self.stdout.write(self.style.NOTICE(f"--- Deduplicating {total} legacy observation image(s) ---"))
+
+        adopted = 0
+        missing = 0
+        for image in legacy_images.iterator():
+            if adopt_legacy_image(image):
+                adopted += 1
+            else:
+                missing += 1
+                self.stdout.write(self.style.WARNING(f"  Image {image.id}: file '{image.image.name}' not found, skipped."))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"--- Done. {adopted} image(s) now share {ImageBlob.objects.count()} blob(s); {missing} skipped ---"
+            )
+        )
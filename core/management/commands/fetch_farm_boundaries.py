@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ...models import Farm
+from ...services.boundary_service import fetch_and_save_cadastral_boundary
+from ...services.view_cache import bump_version
+
+
+class Command(BaseCommand):
+    help = (
+        'Fetches cadastral boundaries for farms whose background fetch failed or '
+        'never finished (e.g. the process restarted while it was pending).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stale-minutes', type=int, default=10,
+            help='Treat pending fetches older than this as abandoned.'
+        )
+        parser.add_argument('--include-failed', action='store_true', help='Also retry failed fetches.')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(minutes=options['stale_minutes'])
+        statuses = ['pending', 'failed'] if options['include_failed'] else ['pending']
+        farms = Farm.objects.filter(
+            boundary_status__in=statuses,
+            boundary_status_updated__lt=cutoff
+        ).exclude(geoscape_address_id__isnull=True).exclude(geoscape_address_id='').order_by('id')
+
+        self.stdout.write(self.style.NOTICE(f"--- Fetching boundaries for {farms.count()} farm(s) ---"))
+        fetched = 0
+        for farm in farms.iterator():
+            success, message = fetch_and_save_cadastral_boundary(farm)
+            if success:
+                fetched += 1
+                self.stdout.write(f"  Farm {farm.id} '{farm.name}': boundary saved.")
+            else:
+                Farm.objects.filter(id=farm.id).update(boundary_status='failed', boundary_status_updated=timezone.now())
+                # update() sends no post_save, so invalidate cached farm pages here
+                bump_version('farm', farm.id)
+                self.stdout.write(self.style.WARNING(f"  Farm {farm.id} '{farm.name}': {message}"))
+
+        self.stdout.write(self.style.SUCCESS(f"--- Done. {fetched} boundary(ies) saved ---"))
@@ -0,0 +1,88 @@
+import json
+import time
+import random
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qsl
+
+from django.core.management.base import BaseCommand
+
+from ...services.geoscape_service import load_fixture, fixture_body_bytes, get_fixture_dir
+
+
+class Command(BaseCommand):
+    help = (
+        'Serves recorded Geoscape responses over HTTP for offline tests and load tests, '
+        'with optional latency and error injection. Record fixtures with GEOSCAPE_MODE=record, '
+        'then set GEOSCAPE_BASE_URL to this server.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--latency-ms', type=float, default=0.0, help='Delay added to every response.')
+        parser.add_argument('--jitter-ms', type=float, default=0.0, help='Random extra delay, up to this much.')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with an error (0-1).')
+        parser.add_argument('--error-status', type=int, default=503, help='Status code for injected errors.')
+        parser.add_argument('--seed', type=int, help='Seed for latency jitter and error injection.')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        rng_lock = threading.Lock()
+        stats = {'served': 0, 'missing': 0, 'injected': 0}
+        stdout = self.stdout
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body: bytes, headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    if name.lower() != 'content-length':
+                        self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                with rng_lock:
+                    delay = options['latency_ms'] + rng.uniform(0, options['jitter_ms'])
+                    inject_error = rng.random() < options['error_rate']
+                if delay:
+                    time.sleep(delay / 1000)
+
+                if inject_error:
+                    stats['injected'] += 1
+                    self._send(options['error_status'], b'{"message": "Injected error"}', {'Content-Type': 'application/json'})
+                    return
+
+                url = urlsplit(self.path)
+                recorded = load_fixture(url.path, dict(parse_qsl(url.query, keep_blank_values=True)))
+                if recorded is None:
+                    stats['missing'] += 1
+                    stdout.write(f"  No fixture for {self.path}")
+                    self._send(404, json.dumps({'message': 'No recorded response'}).encode(), {'Content-Type': 'application/json'})
+                    return
+
+                stats['served'] += 1
+                self._send(recorded['status'], fixture_body_bytes(recorded), recorded.get('headers'))
+
+        server = ThreadingHTTPServer((options['host'], options['port']), Handler)
+        server.daemon_threads = True
+        self.stdout.write(self.style.SUCCESS(
+            f"--- Geoscape stand-in on http://{options['host']}:{server.server_port} "
+            f"serving fixtures from {get_fixture_dir()} ---"
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(
+                f"--- Stopped. {stats['served']} served, {stats['missing']} without fixture, "
+                f"{stats['injected']} injected errors ---"
+            )
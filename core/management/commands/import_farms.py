@@ -0,0 +1,68 @@
+import os
+import sys
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from ...models import Grower
+from ...services.farm_import_service import import_farms, write_report_csv, FarmImportError, ROW_INVALID
+
+
+class Command(BaseCommand):
+    help = (
+        'Imports farms for a grower from a CSV or GeoJSON file, resolving addresses and '
+        'cadastral boundaries concurrently, and prints a per-row report.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV, .json or .geojson file with one farm per row/feature.')
+        parser.add_argument('--owner', required=True, help='Username of the grower the farms belong to.')
+        parser.add_argument('--dry-run', action='store_true', help='Validate and resolve only; create nothing.')
+        parser.add_argument('--workers', type=int, default=None, help='Threads used for Geoscape lookups.')
+        parser.add_argument('--rate', type=float, default=None, help='Geoscape calls per second across all threads.')
+        parser.add_argument('--report', help="Write the per-row report as CSV to this path ('-' for stdout).")
+
+    def handle(self, *args, **options):
+        try:
+            grower = Grower.objects.get(user__username=options['owner'])
+        except Grower.DoesNotExist:
+            if User.objects.filter(username=options['owner']).exists():
+                raise CommandError(f"User '{options['owner']}' has no grower profile.")
+            raise CommandError(f"User '{options['owner']}' not found.")
+
+        path = options['path']
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            raise CommandError(f"Could not read {path}: {e}")
+
+        self.stdout.write(self.style.NOTICE(f"--- Importing farms from {os.path.basename(path)} for {options['owner']} ---"))
+        try:
+            report = import_farms(
+                data, path, grower,
+                dry_run=options['dry_run'], workers=options['workers'], rate=options['rate']
+            )
+        except FarmImportError as e:
+            raise CommandError(str(e))
+
+        for row in report['rows']:
+            line = f"  Row {row['line']} '{row['name']}': {row['status']}"
+            if row['farm_id']:
+                line += f" (farm {row['farm_id']})"
+            if row['messages']:
+                line += f" - {' '.join(row['messages'])}"
+            self.stdout.write(self.style.WARNING(line) if row['status'] == ROW_INVALID else line)
+
+        if options['report']:
+            if options['report'] == '-':
+                write_report_csv(report, sys.stdout)
+            else:
+                with open(options['report'], 'w', newline='', encoding='utf-8') as f:
+                    write_report_csv(report, f)
+
+        summary = f"{report['invalid']} invalid of {len(report['rows'])}"
+        if report['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f"--- Dry run done. {summary}; nothing created ---"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"--- Done. {report['created']} farm(s) created, {summary} ---"))
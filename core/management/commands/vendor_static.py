@@ -0,0 +1,118 @@
+import os
+import re
+import base64
+import hashlib
+import posixpath
+from urllib.parse import urljoin
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ...static_assets import VENDOR_ASSETS, is_vendored
+
+# Relative url(...) references in CSS (fonts, images); absolute and data: URLs are left alone
+CSS_URL_RE = re.compile(r"""url\(\s*['"]?(?!data:|[a-z]+://|//|#)([^'")?#]+)""", re.IGNORECASE)
+# Source map comments, which ManifestStaticFilesStorage also rewrites
+SOURCE_MAP_RE = re.compile(r'^(?:/\*|//)# sourceMappingURL=(\S+?)(?:\s*\*/)?\s*$', re.MULTILINE)
+
+
+class Command(BaseCommand):
+    help = (
+        'Downloads the pinned third-party CSS/JS in core/static_assets.py, with the fonts, '
+        'images and source maps they reference, into static/vendor/, verifying integrity '
+        'hashes. Commit the files so pages no longer load them from a CDN.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('assets', nargs='*', help='Asset names to fetch (default: all).')
+        parser.add_argument('--dest', help='Static directory to write to (default: the first STATICFILES_DIRS entry).')
+        parser.add_argument('--force', action='store_true', help='Download files that already exist.')
+        parser.add_argument('--timeout', type=float, default=30.0, help='Seconds to wait for each download.')
+
+    def handle(self, *args, **options):
+        names = options['assets'] or list(VENDOR_ASSETS)
+        unknown = [name for name in names if name not in VENDOR_ASSETS]
+        if unknown:
+            raise CommandError(f"Unknown asset(s): {', '.join(unknown)}. Known: {', '.join(VENDOR_ASSETS)}")
+
+        dest = options['dest']
+        if not dest:
+            static_dirs = getattr(settings, 'STATICFILES_DIRS', [])
+            if not static_dirs:
+                raise CommandError('STATICFILES_DIRS is empty; pass --dest.')
+            dest = static_dirs[0]
+            dest = dest[1] if isinstance(dest, (list, tuple)) else dest
+
+        self.session = requests.Session()
+        self.timeout = options['timeout']
+        for name in names:
+            asset = VENDOR_ASSETS[name]
+            local = os.path.join(dest, *asset['path'].split('/'))
+            if os.path.exists(local) and not options['force']:
+                self.stdout.write(f"  {name}: already vendored at {asset['path']}")
+                continue
+
+            self.stdout.write(self.style.NOTICE(f"--- {name}: {asset['url']} ---"))
+            content = self._download(asset['url'])
+            if asset['integrity']:
+                self._verify(name, content, asset['integrity'])
+            else:
+                digest = base64.b64encode(hashlib.sha384(content).digest()).decode()
+                self.stdout.write(self.style.WARNING(f"  No pinned integrity; downloaded sha384-{digest}"))
+
+            content = self._fetch_references(asset['url'], asset['path'], content, dest, options['force'])
+            self._write(local, content)
+            self.stdout.write(f"  Saved {asset['path']} ({len(content):,} bytes)")
+
+        is_vendored.cache_clear()
+        self.stdout.write(self.style.SUCCESS("--- Done. Commit the files under static/vendor/ ---"))
+
+    def _download(self, url):
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            raise CommandError(f"Could not download {url}: {e}")
+        return response.content
+
+    def _verify(self, name, content, integrity):
+        algorithm, _, expected = integrity.partition('-')
+        actual = base64.b64encode(hashlib.new(algorithm, content).digest()).decode()
+        if actual != expected:
+            raise CommandError(f"{name}: integrity mismatch (expected {integrity}, got {algorithm}-{actual}).")
+
+    def _write(self, local, content):
+        os.makedirs(os.path.dirname(local), exist_ok=True)
+        with open(local, 'wb') as f:
+            f.write(content)
+
+    def _fetch_references(self, url, path, content, dest, force):
+        """
+        Downloads files the asset refers to by relative URL, next to it.
+
+        collectstatic fails on references to missing files, so a source map
+        that cannot be fetched has its comment removed instead.
+        """
+        text = content.decode('utf-8', errors='replace')
+        references = set(SOURCE_MAP_RE.findall(text))
+        if path.endswith('.css'):
+            references.update(CSS_URL_RE.findall(text))
+
+        for ref in sorted(references):
+            ref_path = posixpath.normpath(posixpath.join(posixpath.dirname(path), ref))
+            local = os.path.join(dest, *ref_path.split('/'))
+            if os.path.exists(local) and not force:
+                continue
+            try:
+                ref_content = self._download(urljoin(url, ref))
+            except CommandError as e:
+                if ref.endswith('.map'):
+                    self.stdout.write(self.style.WARNING(f"  {e}; dropping the sourceMappingURL comment"))
+                    text = SOURCE_MAP_RE.sub('', text)
+                    content = text.encode('utf-8')
+                    continue
+                raise
+            self._write(local, ref_content)
+            self.stdout.write(f"  Saved {ref_path} ({len(ref_content):,} bytes)")
+        return content
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:13
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0019_remove_distribution_pattern'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('upload_id', models.UUIDField(db_index=True, default=uuid.uuid4, editable=False, unique=True)),
+                ('filename', models.CharField(help_text='Original filename supplied by the client.', max_length=255)),
+                ('storage_path', models.CharField(help_text='Path (relative to MEDIA_ROOT) the chunks are written to.', max_length=255)),
+                ('total_size', models.PositiveBigIntegerField(help_text='Expected size of the complete file in bytes.')),
+                ('offset', models.PositiveBigIntegerField(default=0, help_text='Number of bytes received so far.')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('completed', 'Completed')], db_index=True, default='pending', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+                ('observation_image', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload', to='core.observationimage')),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='image_uploads', to='core.surveysession')),
+                ('uploaded_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='image_uploads', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Image Upload',
+                'verbose_name_plural': 'Image Uploads',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['session', 'status'], name='core_imageu_session_a2d9c2_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:14
+
+import core.models
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_imageupload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(db_index=True, help_text='Hex SHA-256 digest of the file contents.', max_length=64, unique=True)),
+                ('file', models.ImageField(upload_to=core.models.image_blob_path)),
+                ('thumbnail', models.ImageField(blank=True, null=True, upload_to=core.models.image_blob_thumbnail_path)),
+                ('size', models.PositiveBigIntegerField(help_text='File size in bytes.')),
+                ('ref_count', models.PositiveIntegerField(default=0, help_text='Number of ObservationImage rows referencing this blob.')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Image Blob',
+                'verbose_name_plural': 'Image Blobs',
+            },
+        ),
+        migrations.AddField(
+            model_name='observationimage',
+            name='blob',
+            field=models.ForeignKey(blank=True, help_text='Shared content-addressed file; `image` points at the same path.', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='images', to='core.imageblob'),
+        ),
+    ]
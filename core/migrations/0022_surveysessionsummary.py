@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_imageblob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SurveySessionSummary',
+            fields=[
+                ('session', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='core.surveysession')),
+                ('observation_count', models.PositiveIntegerField(default=0)),
+                ('image_count', models.PositiveIntegerField(default=0)),
+                ('unique_pests', models.JSONField(default=list, help_text='List of {id, name} for pests found in the session.')),
+                ('unique_diseases', models.JSONField(default=list, help_text='List of {id, name} for diseases found in the session.')),
+                ('bbox', models.JSONField(blank=True, help_text='Bounding box of observation coordinates as [south, west, north, east].', null=True)),
+                ('map_points', models.JSONField(default=list, help_text='Observation points for the session map.')),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Survey Session Summary',
+                'verbose_name_plural': 'Survey Session Summaries',
+            },
+        ),
+    ]
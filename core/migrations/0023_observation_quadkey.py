@@ -0,0 +1,58 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:25
+
+import math
+
+from django.db import migrations, models
+
+BACKFILL_BATCH_SIZE = 5000
+
+# Frozen copy of core.spatial_index.latlon_to_quadkey as of this migration,
+# so later changes to that module cannot change what this backfill writes
+QUADKEY_LEVEL = 24
+MAX_LATITUDE = 85.05112878
+
+
+def latlon_to_quadkey(lat, lon, level=QUADKEY_LEVEL):
+    lat = min(max(lat, -MAX_LATITUDE), MAX_LATITUDE)
+    n = 1 << level
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    x, y = min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+    digits = []
+    for i in range(level, 0, -1):
+        mask = 1 << (i - 1)
+        digits.append(str((1 if x & mask else 0) + (2 if y & mask else 0)))
+    return ''.join(digits)
+
+
+def backfill_quadkeys(apps, schema_editor):
+    Observation = apps.get_model('core', 'Observation')
+    pending = Observation.objects.filter(
+        latitude__isnull=False, longitude__isnull=False
+    ).only('id', 'latitude', 'longitude').order_by('id')
+
+    last_id = 0
+    while True:
+        batch = list(pending.filter(id__gt=last_id)[:BACKFILL_BATCH_SIZE])
+        if not batch:
+            break
+        for obs in batch:
+            obs.quadkey = latlon_to_quadkey(float(obs.latitude), float(obs.longitude))
+        Observation.objects.bulk_update(batch, ['quadkey'])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_surveysessionsummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='observation',
+            name='quadkey',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, help_text='Quadkey of the map tile containing the coordinates, for spatial lookups.', max_length=24),
+        ),
+        migrations.RunPython(backfill_quadkeys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_observation_quadkey'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='observation',
+            name='outside_boundary',
+            field=models.BooleanField(blank=True, help_text='Whether the coordinates fall outside the farm boundary (empty if not checked).', null=True),
+        ),
+    ]
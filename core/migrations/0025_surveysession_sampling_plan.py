@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_observation_outside_boundary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='surveysession',
+            name='sampling_plan',
+            field=models.JSONField(blank=True, help_text='Target plant positions generated inside the farm boundary at session start.', null=True),
+        ),
+    ]
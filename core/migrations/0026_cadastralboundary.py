@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:36
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_surveysession_sampling_plan'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CadastralBoundary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('geoscape_address_id', models.CharField(help_text='Geoscape address ID the parcel was looked up by.', max_length=255, unique=True)),
+                ('geometry', models.JSONField(help_text='GeoJSON geometry of the parcel.')),
+                ('etag', models.CharField(blank=True, default='', help_text='ETag from the last Geoscape response, for conditional revalidation.', max_length=255)),
+                ('last_modified', models.CharField(blank=True, default='', help_text='Last-Modified header from the last Geoscape response.', max_length=64)),
+                ('fetched_at', models.DateTimeField(default=django.utils.timezone.now, help_text='When the geometry was last downloaded.')),
+                ('validated_at', models.DateTimeField(default=django.utils.timezone.now, help_text='When the geometry was last confirmed current with Geoscape.')),
+                ('expires_at', models.DateTimeField(db_index=True, help_text='After this time the entry is revalidated on next use.')),
+            ],
+            options={
+                'verbose_name': 'Cadastral Boundary',
+                'verbose_name_plural': 'Cadastral Boundaries',
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:37
+
+from django.db import migrations, models
+
+
+def mark_existing_boundaries(apps, schema_editor):
+    """Farms that already have a boundary need no fetch."""
+    Farm = apps.get_model('core', 'Farm')
+    Farm.objects.filter(boundary__isnull=False).update(boundary_status='ok')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0026_cadastralboundary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='farm',
+            name='boundary_status',
+            field=models.CharField(blank=True, choices=[('', 'Not Requested'), ('pending', 'Pending'), ('ok', 'OK'), ('failed', 'Failed')], default='', help_text='State of the background cadastral boundary fetch.', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='farm',
+            name='boundary_status_updated',
+            field=models.DateTimeField(blank=True, help_text='When boundary_status last changed.', null=True),
+        ),
+        migrations.RunPython(mark_existing_boundaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:32
+
+from django.db import migrations, models
+
+
+def discard_summaries(apps, schema_editor):
+    """Stored bounding boxes included observations outside the farm boundary; views rebuild them."""
+    SurveySessionSummary = apps.get_model('core', 'SurveySessionSummary')
+    SurveySessionSummary.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0027_farm_boundary_status'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='surveysessionsummary',
+            name='map_points',
+        ),
+        migrations.AlterField(
+            model_name='surveysessionsummary',
+            name='bbox',
+            field=models.JSONField(blank=True, help_text='Bounding box of the mapped observations (inside the farm boundary) as [south, west, north, east].', null=True),
+        ),
+        migrations.RunPython(discard_summaries, migrations.RunPython.noop),
+    ]
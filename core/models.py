@@ -3,7 +3,9 @@ from django.contrib.auth.models import User
 from django.utils import timezone
 from decimal import Decimal
 import uuid
-from datetime import timedelta
+from datetime import datetime, timedelta
+
+from .spatial_index import QUADKEY_LEVEL, latlon_to_quadkey
 
 # Constants for choices
 DISTRIBUTION_CHOICES = [
@@ -36,6 +38,18 @@ OBSERVATION_STATUS_CHOICES = [
     ('completed', 'Completed'),   # For final save
 ]
 
+BOUNDARY_STATUS_CHOICES = [
+    ('', 'Not Requested'),
+    ('pending', 'Pending'),       # Background fetch from Geoscape queued or running
+    ('ok', 'OK'),
+    ('failed', 'Failed'),
+]
+
+UPLOAD_STATUS_CHOICES = [
+    ('pending', 'Pending'),       # Chunks still being received
+    ('completed', 'Completed'),   # Committed to an ObservationImage
+]
+
 
 class Grower(models.Model):
     """
@@ -374,6 +388,18 @@ class Farm(models.Model):
         blank=True,
         help_text="Cadastral boundary polygon data (e.g., GeoJSON) from Geoscape API"
     )
+    boundary_status = models.CharField(
+        max_length=10,
+        choices=BOUNDARY_STATUS_CHOICES,
+        blank=True,
+        default='',
+        help_text="State of the background cadastral boundary fetch."
+    )
+    boundary_status_updated = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When boundary_status last changed."
+    )
     
     class Meta:
         ordering = ['name']
@@ -820,6 +846,11 @@ class SurveySession(models.Model):
         blank=True, 
         help_text="Recommended number of plants based on calculation at session start."
     )
+    sampling_plan = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Target plant positions generated inside the farm boundary at session start."
+    )
     session_id = models.UUIDField(
         default=uuid.uuid4, 
         editable=False, 
@@ -1038,6 +1069,19 @@ class Observation(models.Model):
         db_index=True,
         help_text="Status of the observation (Draft or Completed)"
     )
+    quadkey = models.CharField(
+        max_length=QUADKEY_LEVEL,
+        blank=True,
+        default='',
+        db_index=True,
+        editable=False,
+        help_text="Quadkey of the map tile containing the coordinates, for spatial lookups."
+    )
+    outside_boundary = models.BooleanField(
+        null=True,
+        blank=True,
+        help_text="Whether the coordinates fall outside the farm boundary (empty if not checked)."
+    )
     
     # Add custom manager
     objects = ObservationManager()
@@ -1055,6 +1099,14 @@ class Observation(models.Model):
     
     def __str__(self):
         return f"Observation {self.plant_sequence_number or 'n/a'} on {self.observation_time.strftime('%Y-%m-%d %H:%M')}"
+    
+    def save(self, *args, **kwargs):
+        # Keep the spatial index key in step with the coordinates
+        self.quadkey = latlon_to_quadkey(self.latitude, self.longitude) if self.has_coordinates() else ''
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'quadkey'}
+        super().save(*args, **kwargs)
         
     def has_coordinates(self):
         """
@@ -1090,6 +1142,9 @@ class Observation(models.Model):
         Returns:
             bool: True if images exist, False otherwise
         """
+        # Use prefetched images when available to avoid a query per observation
+        if 'images' in getattr(self, '_prefetched_objects_cache', {}):
+            return bool(self._prefetched_objects_cache['images'])
         return self.images.exists()
         
     def finalize(self, save=True):
@@ -1136,14 +1191,19 @@ def observation_image_path(instance, filename):
     Determines the file path for uploaded observation images.
     
     Args:
-        instance (ObservationImage): The image instance being uploaded
+        instance (ObservationImage or ImageUpload): The image instance being uploaded.
+            Chunked uploads start before their Observation exists, so they carry
+            the session directly.
         filename (str): Original filename of the uploaded image
         
     Returns:
         str: Path where the file should be stored
     """
     # Get the session UUID for organizing images
-    session_uuid = instance.observation.session.session_id
+    if isinstance(instance, ImageUpload):
+        session_uuid = instance.session.session_id
+    else:
+        session_uuid = instance.observation.session.session_id
     
     # Ensure filename doesn't have problematic characters
     import re
@@ -1157,6 +1217,78 @@ def observation_image_path(instance, filename):
     return f'survey_images/{session_uuid}/{unique_prefix}_{safe_filename}'
 
 
+def image_blob_path(instance, filename):
+    """
+    Determines the content-addressed file path for an image blob.
+    
+    Blobs are sharded by the first characters of their SHA-256 digest so no
+    single directory grows too large, and identical bytes always map to the
+    same path.
+    
+    Args:
+        instance (ImageBlob): The blob being stored
+        filename (str): Original filename, used only for its extension
+        
+    Returns:
+        str: Path where the file should be stored
+    """
+    import os
+    extension = os.path.splitext(filename)[1].lower()[:10]
+    digest = instance.sha256
+    return f'survey_images/blobs/{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+
+def image_blob_thumbnail_path(instance, filename):
+    """
+    Determines the file path for a blob's thumbnail.
+    
+    Args:
+        instance (ImageBlob): The blob the thumbnail belongs to
+        filename (str): Ignored; thumbnails are always JPEG
+        
+    Returns:
+        str: Path where the thumbnail should be stored
+    """
+    digest = instance.sha256
+    return f'survey_images/thumbnails/{digest[:2]}/{digest[2:4]}/{digest}.jpg'
+
+
+class ImageBlob(models.Model):
+    """
+    Stores a single copy of an uploaded image, addressed by its SHA-256 digest.
+    
+    Any number of ObservationImage rows can reference the same blob, so retries
+    and re-uploads of identical photos share one file and one thumbnail. The
+    reference count tracks how many images point at the blob; when it drops to
+    zero the blob and its files are removed.
+    """
+    sha256 = models.CharField(
+        max_length=64,
+        unique=True,
+        db_index=True,
+        help_text="Hex SHA-256 digest of the file contents."
+    )
+    file = models.ImageField(upload_to=image_blob_path)
+    thumbnail = models.ImageField(
+        upload_to=image_blob_thumbnail_path,
+        null=True,
+        blank=True
+    )
+    size = models.PositiveBigIntegerField(help_text="File size in bytes.")
+    ref_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of ObservationImage rows referencing this blob."
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Image Blob"
+        verbose_name_plural = "Image Blobs"
+
+    def __str__(self):
+        return f"Blob {self.sha256[:12]} ({self.ref_count} refs)"
+
+
 class ObservationImage(models.Model):
     """
     Stores an image associated with a specific Observation point.
@@ -1172,6 +1304,14 @@ class ObservationImage(models.Model):
         db_index=True
     )
     image = models.ImageField(upload_to=observation_image_path)
+    blob = models.ForeignKey(
+        ImageBlob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='images',
+        help_text="Shared content-addressed file; `image` points at the same path."
+    )
     caption = models.CharField(max_length=255, blank=True, null=True)
     uploaded_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
@@ -1207,8 +1347,194 @@ class ObservationImage(models.Model):
         Returns:
             str: URL to the thumbnail or full image if thumbnail doesn't exist
         """
-        # In the future, this could use django-imagekit or similar
-        # for now, just return the regular URL
+        # Thumbnails are generated once per blob, so duplicates share them
+        if self.blob_id and self.blob.thumbnail:
+            return self.blob.thumbnail.url
         return self.image.url
 
+
+class ImageUpload(models.Model):
+    """
+    Tracks a resumable, chunked image upload for a survey session.
+    
+    Chunks are written directly to the final storage path, so an interrupted
+    upload can be resumed from the last acknowledged byte offset. Once all
+    bytes have arrived the upload is committed, which attaches the stored
+    file to an Observation as an ObservationImage without copying it.
+    """
+    upload_id = models.UUIDField(
+        default=uuid.uuid4,
+        editable=False,
+        unique=True,
+        db_index=True
+    )
+    session = models.ForeignKey(
+        SurveySession,
+        on_delete=models.CASCADE,
+        related_name='image_uploads',
+        db_index=True
+    )
+    uploaded_by = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='image_uploads'
+    )
+    filename = models.CharField(
+        max_length=255,
+        help_text="Original filename supplied by the client."
+    )
+    storage_path = models.CharField(
+        max_length=255,
+        help_text="Path (relative to MEDIA_ROOT) the chunks are written to."
+    )
+    total_size = models.PositiveBigIntegerField(
+        help_text="Expected size of the complete file in bytes."
+    )
+    offset = models.PositiveBigIntegerField(
+        default=0,
+        help_text="Number of bytes received so far."
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=UPLOAD_STATUS_CHOICES,
+        default='pending',
+        db_index=True
+    )
+    observation_image = models.OneToOneField(
+        ObservationImage,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='upload'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Image Upload"
+        verbose_name_plural = "Image Uploads"
+        indexes = [
+            models.Index(fields=['session', 'status']),
+        ]
+
+    def __str__(self):
+        return f"Upload {self.upload_id} ({self.offset}/{self.total_size} bytes)"
+
+    def is_complete(self):
+        """
+        Check if every byte of the file has been received.
+        
+        Returns:
+            bool: True if the offset has reached the expected size
+        """
+        return self.offset >= self.total_size
+
+    def to_dict(self):
+        """
+        Convert upload state to a dictionary for API responses.
+        
+        Returns:
+            dict: Dictionary representation of the upload
+        """
+        return {
+            'upload_id': str(self.upload_id),
+            'filename': self.filename,
+            'offset': self.offset,
+            'total_size': self.total_size,
+            'upload_status': self.status,
+            'image_id': self.observation_image_id,
+        }
+
+class SurveySessionSummary(models.Model):
+    """
+    Stored summary of a finished survey session.
+    
+    Completed sessions rarely change, so the counts, findings and map
+    extent shown on the session detail page are computed once when the
+    session finishes and read back from here. Editing or deleting one of the
+    session's observations discards the summary, and the next view rebuilds it.
+    """
+    session = models.OneToOneField(
+        SurveySession,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='summary'
+    )
+    observation_count = models.PositiveIntegerField(default=0)
+    image_count = models.PositiveIntegerField(default=0)
+    unique_pests = models.JSONField(
+        default=list,
+        help_text="List of {id, name} for pests found in the session."
+    )
+    unique_diseases = models.JSONField(
+        default=list,
+        help_text="List of {id, name} for diseases found in the session."
+    )
+    bbox = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Bounding box of the mapped observations (inside the farm boundary) as [south, west, north, east]."
+    )
+    built_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Survey Session Summary"
+        verbose_name_plural = "Survey Session Summaries"
+
+    def __str__(self):
+        return f"Summary of {self.session}"
+
+
+class CadastralBoundary(models.Model):
+    """
+    Cached cadastral parcel geometry from Geoscape, keyed by address ID.
+    
+    Farms on the same parcel, or an address chosen again, reuse the stored
+    geometry instead of calling Geoscape. Entries past `expires_at` are still
+    served and revalidated in the background with a conditional request.
+    """
+    geoscape_address_id = models.CharField(
+        max_length=255,
+        unique=True,
+        help_text="Geoscape address ID the parcel was looked up by."
+    )
+    geometry = models.JSONField(
+        help_text="GeoJSON geometry of the parcel."
+    )
+    etag = models.CharField(
+        max_length=255,
+        blank=True,
+        default='',
+        help_text="ETag from the last Geoscape response, for conditional revalidation."
+    )
+    last_modified = models.CharField(
+        max_length=64,
+        blank=True,
+        default='',
+        help_text="Last-Modified header from the last Geoscape response."
+    )
+    fetched_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="When the geometry was last downloaded."
+    )
+    validated_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="When the geometry was last confirmed current with Geoscape."
+    )
+    expires_at = models.DateTimeField(
+        db_index=True,
+        help_text="After this time the entry is revalidated on next use."
+    )
+
+    class Meta:
+        verbose_name = "Cadastral Boundary"
+        verbose_name_plural = "Cadastral Boundaries"
+
+    def __str__(self):
+        return self.geoscape_address_id
+
+    def is_expired(self) -> bool:
+        return self.expires_at <= timezone.now()
+
 # ---> END NEW MODELS <---
\ No newline at end of file
@@ -0,0 +1,194 @@
+# core/services/address_cache.py
+"""
+In-process caches for address search.
+
+Address suggestions are kept in an LRU cache with a time-to-live, keyed by
+(normalized query, state). Typing a query sends every longer prefix in turn,
+so when a shorter prefix already returned a complete result set (fewer
+results than the upstream limit), a longer query is answered by filtering
+that set locally instead of calling Geoscape again. The region to state
+abbreviation lookup is cached the same way, so most keystrokes are served
+without leaving the process.
+"""
+import re
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from django.conf import settings
+
+from ..models import Region
+
+# Shortest query sent upstream; shorter prefixes are never cached
+MIN_QUERY_LENGTH = 3
+
+DEFAULT_SUGGESTION_CACHE_SIZE = 1024
+DEFAULT_SUGGESTION_CACHE_TTL = 10 * 60
+DEFAULT_REGION_CACHE_TTL = 5 * 60
+
+_NON_WORD = re.compile(r'[^0-9a-z]+')
+
+
+class LRUTTLCache:
+    """
+    A thread-safe, size-bounded LRU cache whose entries expire after `ttl` seconds.
+
+    Args:
+        maxsize: Maximum number of entries
+        ttl: Seconds an entry stays valid
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returns the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalizes a search query for cache keys and local matching.
+
+    Lowercases, turns punctuation into spaces and collapses whitespace, so
+    "Darwin  City," and "darwin city" share an entry.
+    """
+    return ' '.join(_NON_WORD.sub(' ', query.lower()).split())
+
+
+def matches_query(address: str, normalized_query: str) -> bool:
+    """
+    Checks whether an address matches a query the way predictive search does.
+
+    Every query word must start some word of the address.
+
+    Args:
+        address: Suggested address text
+        normalized_query: Output of normalize_query
+
+    Returns:
+        True if the address matches
+    """
+    address_words = normalize_query(address).split()
+    return all(
+        any(word.startswith(token) for word in address_words)
+        for token in normalized_query.split()
+    )
+
+
+class SuggestionCache:
+    """
+    Prefix-aware cache of address suggestions.
+
+    Each entry records whether it holds the complete result set for its
+    query. Complete entries can answer any longer query that extends them.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = LRUTTLCache(maxsize, ttl)
+
+    def get(self, query: str, state: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Returns cached suggestions for a query, or None on a miss.
+
+        Args:
+            query: The raw search query
+            state: State/territory abbreviation
+
+        Returns:
+            List of suggestions, or None if the upstream API must be asked
+        """
+        normalized = normalize_query(query)
+        exact = self._cache.get((normalized, state))
+        if exact is not None:
+            return exact[0]
+
+        # Longest cached prefix first, so the local filter has the least work
+        for end in range(len(normalized) - 1, MIN_QUERY_LENGTH - 1, -1):
+            entry = self._cache.get((normalized[:end], state))
+            if entry is None:
+                continue
+            suggestions, complete = entry
+            if not complete:
+                # A truncated result may be missing matches for the longer query
+                continue
+            filtered = [s for s in suggestions if matches_query(s.get('address', ''), normalized)]
+            self._cache.set((normalized, state), (filtered, True))
+            return filtered
+        return None
+
+    def put(self, query: str, state: str, suggestions: List[Dict[str, Any]], complete: bool):
+        """
+        Stores suggestions for a query.
+
+        Args:
+            query: The raw search query
+            state: State/territory abbreviation
+            suggestions: Suggestions returned upstream
+            complete: Whether the upstream returned every match (fewer than its limit)
+        """
+        self._cache.set((normalize_query(query), state), (suggestions, complete))
+
+    def clear(self):
+        self._cache.clear()
+
+
+suggestion_cache = SuggestionCache(
+    getattr(settings, 'ADDRESS_SUGGESTION_CACHE_SIZE', DEFAULT_SUGGESTION_CACHE_SIZE),
+    getattr(settings, 'ADDRESS_SUGGESTION_CACHE_TTL', DEFAULT_SUGGESTION_CACHE_TTL)
+)
+
+_region_cache = LRUTTLCache(256, getattr(settings, 'REGION_CACHE_TTL', DEFAULT_REGION_CACHE_TTL))
+
+
+def get_region_state(region_id) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    Returns a region's name and state abbreviation, cached in process.
+
+    Args:
+        region_id: Primary key of the Region
+
+    Returns:
+        Tuple of (name, state_abbreviation), or None if the region does not exist
+    """
+    try:
+        key = int(region_id)
+    except (TypeError, ValueError):
+        return None
+
+    cached = _region_cache.get(key)
+    if cached is not None:
+        return cached
+
+    row = Region.objects.filter(pk=key).values_list('name', 'state_abbreviation').first()
+    if row is None:
+        return None
+    _region_cache.set(key, row)
+    return row
@@ -0,0 +1,160 @@
+# core/services/api_metrics.py
+"""
+Latency and usage accounting for external API calls.
+
+Each endpoint gets a fixed-bucket latency histogram and counters for calls,
+errors, status codes and calls refused by the circuit breaker. These live in
+process memory and describe the worker that serves the page. Quota usage
+(requests per day and per month) is counted in the Django cache, so it is
+shared between workers when the cache backend is. Every attempt that reaches
+the API counts, so a call retried twice uses three requests of quota.
+"""
+import threading
+from collections import deque
+from datetime import date
+from typing import Dict, Any, Iterable, Optional
+
+from django.core.cache import cache
+
+from .circuit_breaker import percentile
+
+# Upper bounds (milliseconds) of the latency histogram buckets; the last is open-ended
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Recent latencies kept per endpoint for percentiles
+RECENT_SAMPLES = 200
+
+# Quota counters outlive their period a little so the previous one can still be read
+QUOTA_DAY_TTL = 2 * 24 * 3600
+QUOTA_MONTH_TTL = 32 * 24 * 3600
+
+
+class EndpointMetrics:
+    """Counters and a latency histogram for one endpoint."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.short_circuited = 0
+        self.status_counts: Dict[str, int] = {}
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.total_ms = 0.0
+        self.recent_ms = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, latency_ms: float, status: str, error: bool):
+        self.calls += 1
+        if error:
+            self.errors += 1
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        self.total_ms += latency_ms
+        self.recent_ms.append(latency_ms)
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if latency_ms <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        labels = [f"<= {bound} ms" for bound in LATENCY_BUCKETS_MS] + [f"> {LATENCY_BUCKETS_MS[-1]} ms"]
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'short_circuited': self.short_circuited,
+            'status_counts': dict(sorted(self.status_counts.items())),
+            'mean_ms': round(self.total_ms / self.calls, 1) if self.calls else None,
+            'p50_ms': round(percentile(self.recent_ms, 0.50), 1) if self.recent_ms else None,
+            'p95_ms': round(percentile(self.recent_ms, 0.95), 1) if self.recent_ms else None,
+            'histogram': [{'bucket': label, 'count': count} for label, count in zip(labels, self.buckets)],
+        }
+
+
+class ApiMetrics:
+    """
+    Per-endpoint metrics for one external API.
+
+    Args:
+        name: API name, also used in the quota cache keys
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._endpoints: Dict[str, EndpointMetrics] = {}
+        self._lock = threading.Lock()
+
+    def _endpoint(self, endpoint: str) -> EndpointMetrics:
+        metrics = self._endpoints.get(endpoint)
+        if metrics is None:
+            metrics = self._endpoints.setdefault(endpoint, EndpointMetrics())
+        return metrics
+
+    def _quota_keys(self, endpoint: str, today: Optional[date] = None):
+        today = today or date.today()
+        return (
+            f"api_quota:{self.name}:{endpoint}:day:{today.isoformat()}",
+            f"api_quota:{self.name}:{endpoint}:month:{today.strftime('%Y-%m')}",
+        )
+
+    def record_attempt(self, endpoint: str):
+        """
+        Counts one request that reached the API against the quota.
+
+        Called for every attempt, retries included, since each uses up quota.
+
+        Args:
+            endpoint: Request path, without query string
+        """
+        day_key, month_key = self._quota_keys(endpoint)
+        for key, ttl in ((day_key, QUOTA_DAY_TTL), (month_key, QUOTA_MONTH_TTL)):
+            # add() is a no-op when the key exists, so incr() never misses
+            cache.add(key, 0, ttl)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 1, ttl)
+
+    def record_call(self, endpoint: str, latency: float, status_code: Optional[int] = None, error: bool = False):
+        """
+        Records the outcome and latency of a completed call, including any retries.
+
+        Args:
+            endpoint: Request path, without query string
+            latency: Seconds the call took
+            status_code: Final HTTP status, or None if no response was received
+            error: Whether the call counted as a failure
+        """
+        status = str(status_code) if status_code is not None else 'no_response'
+        with self._lock:
+            self._endpoint(endpoint).observe(latency * 1000.0, status, error)
+
+    def record_short_circuit(self, endpoint: str):
+        """Records a call refused by the circuit breaker."""
+        with self._lock:
+            self._endpoint(endpoint).short_circuited += 1
+
+    def quota_usage(self, endpoint: str) -> Dict[str, int]:
+        day_key, month_key = self._quota_keys(endpoint)
+        return {'today': cache.get(day_key, 0), 'this_month': cache.get(month_key, 0)}
+
+    def snapshot(self, known_endpoints: Iterable[str] = ()) -> Dict[str, Any]:
+        """
+        Returns endpoint metrics and quota usage for display.
+
+        Args:
+            known_endpoints: Endpoints to include even if this process has not called them,
+                so quota used by other workers still shows
+
+        Returns:
+            Dictionary with the API name and per-endpoint metrics
+        """
+        with self._lock:
+            for endpoint in known_endpoints:
+                self._endpoint(endpoint)
+            endpoints = {name: metrics.as_dict() for name, metrics in sorted(self._endpoints.items())}
+        for name, data in endpoints.items():
+            data['quota'] = self.quota_usage(name)
+        return {'name': self.name, 'endpoints': endpoints}
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
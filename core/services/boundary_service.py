@@ -1,16 +1,49 @@
 # core/services/boundary_service.py
 import logging
+import threading
 import uuid
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
 from django.utils import timezone
 from django.urls import reverse
 from datetime import timedelta
 from typing import Dict, Any, Optional, Tuple
 
-from ..models import Farm, BoundaryMappingToken
-from .geoscape_service import fetch_cadastral_boundary
+from ..models import Farm, BoundaryMappingToken, CadastralBoundary
+from .geoscape_service import fetch_cadastral_boundary_conditional
+from .view_cache import bump_version
 
 logger = logging.getLogger(__name__)
 
+# How long a cached parcel is trusted before revalidation, unless Geoscape sends max-age
+DEFAULT_CADASTRAL_CACHE_TTL = 30 * 24 * 60 * 60
+
+# Seconds a boundary fetch may stay 'pending' before it is assumed lost and re-queued
+DEFAULT_BOUNDARY_PENDING_TIMEOUT = 10 * 60
+
+# Address IDs with a background revalidation in progress
+_revalidating = set()
+_revalidating_lock = threading.Lock()
+
+
+def _start_background(target, args: tuple, name: str, setting: str):
+    """
+    Runs `target(*args)` in a daemon thread, or inline if `setting` is False.
+    
+    The thread closes its database connection when done.
+    """
+    def run():
+        try:
+            target(*args)
+        finally:
+            close_old_connections()
+    
+    if not getattr(settings, setting, True):
+        target(*args)
+        return
+    threading.Thread(target=run, name=name, daemon=True).start()
+
 
 def create_mapping_token(farm: Farm) -> BoundaryMappingToken:
     """
@@ -148,12 +181,241 @@ def fetch_and_save_cadastral_boundary(farm: Farm) -> Tuple[bool, Optional[str]]:
     if not farm.geoscape_address_id:
         return False, "No Geoscape address ID available for this farm."
     
-    boundary_json = fetch_cadastral_boundary(farm.geoscape_address_id)
+    boundary_json = get_cadastral_boundary(farm.geoscape_address_id)
     if not boundary_json:
         return False, "Failed to fetch cadastral boundary from Geoscape."
     
     # Save the boundary to the farm
     farm.boundary = boundary_json
-    farm.save(update_fields=['boundary'])
+    farm.boundary_status = 'ok'
+    farm.boundary_status_updated = timezone.now()
+    farm.save(update_fields=['boundary', 'boundary_status', 'boundary_status_updated'])
+    
+    return True, "Successfully fetched and saved cadastral boundary."
+
+
+def _cache_expiry(max_age: Optional[int]):
+    ttl = max_age if max_age is not None else getattr(settings, 'CADASTRAL_CACHE_TTL', DEFAULT_CADASTRAL_CACHE_TTL)
+    return timezone.now() + timedelta(seconds=ttl)
+
+
+def get_cadastral_boundary(address_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Returns the parcel geometry for a Geoscape address ID, using the boundary cache.
+    
+    Cached geometry is returned immediately, even when expired; expired
+    entries are revalidated in the background. Only a cache miss waits for
+    Geoscape.
+    
+    Args:
+        address_id: The Geoscape address ID
+        
+    Returns:
+        GeoJSON geometry dictionary, or None if it could not be fetched
+    """
+    entry = CadastralBoundary.objects.filter(geoscape_address_id=address_id).first()
+    if entry is not None:
+        if entry.is_expired():
+            schedule_cadastral_revalidation(address_id)
+        logger.debug(f"Cadastral boundary for {address_id} served from cache")
+        return entry.geometry
+    
+    result = fetch_cadastral_boundary_conditional(address_id)
+    if not result or not result['geometry']:
+        return None
+    
+    store_cadastral_boundary(address_id, result)
+    return result['geometry']
+
+
+def store_cadastral_boundary(address_id: str, result: Dict[str, Any]) -> CadastralBoundary:
+    """
+    Saves a full response from fetch_cadastral_boundary_conditional to the boundary cache.
+    
+    Args:
+        address_id: The Geoscape address ID
+        result: The fetch result (with geometry and validators)
+        
+    Returns:
+        The created or updated CadastralBoundary
+    """
+    now = timezone.now()
+    entry, _ = CadastralBoundary.objects.update_or_create(
+        geoscape_address_id=address_id,
+        defaults={
+            'geometry': result['geometry'],
+            'etag': result['etag'] or '',
+            'last_modified': result['last_modified'] or '',
+            'fetched_at': now,
+            'validated_at': now,
+            'expires_at': _cache_expiry(result['max_age']),
+        }
+    )
+    return entry
+
+
+def revalidate_cadastral_boundary(address_id: str) -> bool:
+    """
+    Checks a cached parcel with Geoscape using a conditional request.
+    
+    A 304 response only extends the entry's expiry; a full response replaces
+    the stored geometry. On failure the entry is kept as is and retried on
+    next use.
+    
+    Args:
+        address_id: The Geoscape address ID
+        
+    Returns:
+        True if the entry was confirmed or refreshed
+    """
+    entry = CadastralBoundary.objects.filter(geoscape_address_id=address_id).first()
+    if entry is None:
+        return get_cadastral_boundary(address_id) is not None
+    
+    result = fetch_cadastral_boundary_conditional(address_id, entry.etag, entry.last_modified)
+    if not result:
+        logger.warning(f"Could not revalidate cadastral boundary for {address_id}")
+        return False
+    
+    now = timezone.now()
+    entry.validated_at = now
+    entry.expires_at = _cache_expiry(result['max_age'])
+    entry.etag = result['etag'] or ''
+    entry.last_modified = result['last_modified'] or ''
+    if not result['not_modified']:
+        entry.geometry = result['geometry']
+        entry.fetched_at = now
+        logger.info(f"Cadastral boundary for {address_id} changed upstream; cache refreshed")
+    entry.save()
+    return True
+
+
+def _revalidate_in_background(address_id: str):
+    try:
+        revalidate_cadastral_boundary(address_id)
+    except Exception as e:
+        logger.exception(f"Background revalidation failed for {address_id}: {e}")
+    finally:
+        with _revalidating_lock:
+            _revalidating.discard(address_id)
+
+
+def schedule_cadastral_revalidation(address_id: str) -> bool:
+    """
+    Starts a background revalidation of a cached parcel, unless one is already running.
+    
+    Set CADASTRAL_REVALIDATE_IN_BACKGROUND to False to revalidate inline.
+    
+    Args:
+        address_id: The Geoscape address ID
+        
+    Returns:
+        True if a revalidation was started
+    """
+    with _revalidating_lock:
+        if address_id in _revalidating:
+            return False
+        _revalidating.add(address_id)
+    
+    _start_background(
+        _revalidate_in_background, (address_id,),
+        f'cadastral-revalidate-{address_id}', 'CADASTRAL_REVALIDATE_IN_BACKGROUND'
+    )
+    return True
+
+
+def _set_boundary_status(farm_id: int, status: str, **fields):
+    if Farm.objects.filter(id=farm_id).update(
+        boundary_status=status, boundary_status_updated=timezone.now(), **fields
+    ):
+        # update() sends no post_save, so invalidate cached farm pages here
+        bump_version('farm', farm_id)
+
+
+def _fetch_boundary_job(farm_id: int, address_id: str, clear_on_failure: bool):
+    """
+    Background job: fetches the parcel for `address_id` and saves it to the farm.
+    
+    The result is dropped if the farm's address changed while the job ran,
+    since a newer job has been queued for the new address.
+    """
+    try:
+        geometry = get_cadastral_boundary(address_id)
+    except Exception as e:
+        logger.exception(f"Boundary fetch failed for farm {farm_id}: {e}")
+        geometry = None
+    
+    current = Farm.objects.filter(id=farm_id, geoscape_address_id=address_id)
+    if geometry:
+        if current.update(boundary=geometry, boundary_status='ok', boundary_status_updated=timezone.now()):
+            bump_version('farm', farm_id)
+            logger.info(f"Saved cadastral boundary for farm {farm_id}")
+        return
+    
+    logger.warning(f"Could not fetch cadastral boundary for farm {farm_id} ({address_id})")
+    fields = {'boundary': None} if clear_on_failure else {}
+    if current.update(boundary_status='failed', boundary_status_updated=timezone.now(), **fields):
+        bump_version('farm', farm_id)
+
+
+def request_cadastral_boundary(farm: Farm, clear_on_failure: bool = False) -> bool:
+    """
+    Queues a background fetch of the farm's cadastral boundary.
+    
+    The farm is marked 'pending' at once; the job runs after the current
+    transaction commits and sets the status to 'ok' or 'failed'. Set
+    BOUNDARY_FETCH_IN_BACKGROUND to False to fetch inline.
+    
+    Args:
+        farm: The Farm instance (must have a geoscape_address_id)
+        clear_on_failure: Remove the existing boundary if the fetch fails,
+            e.g. because the address changed and the old parcel no longer applies
+        
+    Returns:
+        True if a fetch was queued
+    """
+    address_id = farm.geoscape_address_id
+    if not address_id:
+        return False
+    
+    farm.boundary_status = 'pending'
+    farm.boundary_status_updated = timezone.now()
+    _set_boundary_status(farm.id, 'pending')
+    
+    transaction.on_commit(lambda: _start_background(
+        _fetch_boundary_job, (farm.id, address_id, clear_on_failure),
+        f'farm-boundary-{farm.id}', 'BOUNDARY_FETCH_IN_BACKGROUND'
+    ))
+    return True
+
+
+def requeue_stale_boundary_job(farm: Farm) -> bool:
+    """
+    Re-queues a boundary fetch that has been 'pending' for too long.
+    
+    Jobs run in a daemon thread, so a restart while one runs leaves the farm
+    pending with nothing left to finish it. This is called whenever the
+    status is read; the conditional update lets only one of several
+    concurrent readers queue the new job. `manage.py fetch_farm_boundaries`
+    sweeps the rest.
+    
+    Args:
+        farm: The Farm instance
+        
+    Returns:
+        True if a new fetch was queued
+    """
+    if farm.boundary_status != 'pending' or not farm.geoscape_address_id:
+        return False
+    
+    timeout = getattr(settings, 'BOUNDARY_PENDING_TIMEOUT', DEFAULT_BOUNDARY_PENDING_TIMEOUT)
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    claimed = Farm.objects.filter(
+        Q(boundary_status_updated__lt=cutoff) | Q(boundary_status_updated__isnull=True),
+        id=farm.id, boundary_status='pending'
+    ).update(boundary_status_updated=timezone.now())
+    if not claimed:
+        return False
     
-    return True, "Successfully fetched and saved cadastral boundary."
\ No newline at end of file
+    logger.warning(f"Boundary fetch for farm {farm.id} pending for over {timeout}s; re-queuing")
+    return request_cadastral_boundary(farm)
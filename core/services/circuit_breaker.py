@@ -0,0 +1,167 @@
+# core/services/circuit_breaker.py
+"""
+Circuit breaker for calls to an external API.
+
+While the breaker is closed, calls go through and their outcome and latency
+are recorded. It opens after a run of consecutive failures, or when the p95
+latency of recent calls goes above a threshold. While open, calls fail at
+once instead of tying up a worker. After `reset_timeout` seconds it
+half-opens and lets a limited number of probe calls through: a healthy
+probe closes it again, a failed or slow one reopens it.
+"""
+import time
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+# Recent calls needed before the p95 latency can open the breaker
+MIN_LATENCY_SAMPLES = 20
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of calling the API while the breaker is open."""
+
+
+def percentile(values, fraction: float) -> float:
+    """Returns the nearest-rank percentile of a sequence (0.0 when empty)."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+class CircuitBreaker:
+    """
+    A thread-safe circuit breaker.
+
+    Args:
+        name: Label used in logs
+        failure_threshold: Consecutive failures that open the breaker
+        latency_threshold: p95 latency in seconds that opens the breaker
+        window: Number of recent call latencies kept for the p95
+        reset_timeout: Seconds the breaker stays open before probing
+        half_open_max_calls: Concurrent probe calls allowed while half-open
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        latency_threshold: float = 3.0,
+        window: int = 50,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.latency_threshold = latency_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self._lock = threading.Lock()
+        self._state = STATE_CLOSED
+        self._consecutive_failures = 0
+        self._latencies = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._open_reason = ''
+        self._probes_in_flight = 0
+        self._times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == STATE_OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = STATE_HALF_OPEN
+            self._probes_in_flight = 0
+            logger.info(f"Circuit '{self.name}' half-open; probing")
+        return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Checks whether a call may proceed, reserving a probe slot when half-open.
+
+        Every allowed call must be followed by record_success or record_failure.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == STATE_CLOSED:
+                return True
+            if state == STATE_HALF_OPEN and self._probes_in_flight < self.half_open_max_calls:
+                self._probes_in_flight += 1
+                return True
+            return False
+
+    def _open(self, reason: str):
+        self._state = STATE_OPEN
+        self._opened_at = time.monotonic()
+        self._open_reason = reason
+        self._times_opened += 1
+        self._latencies.clear()
+        logger.warning(f"Circuit '{self.name}' opened: {reason}")
+
+    def record_success(self, latency: float):
+        with self._lock:
+            if self._state == STATE_HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if latency > self.latency_threshold:
+                    self._open(f"probe took {latency:.2f}s")
+                    return
+                self._state = STATE_CLOSED
+                self._consecutive_failures = 0
+                self._latencies.clear()
+                logger.info(f"Circuit '{self.name}' closed after a successful probe")
+                return
+            if self._state == STATE_OPEN:
+                # A call started before the breaker opened; it is not a probe
+                return
+
+            self._consecutive_failures = 0
+            self._latencies.append(latency)
+            if len(self._latencies) >= MIN_LATENCY_SAMPLES:
+                p95 = percentile(self._latencies, 0.95)
+                if p95 > self.latency_threshold:
+                    self._open(f"p95 latency {p95:.2f}s over {self.latency_threshold:.2f}s")
+
+    def record_failure(self, latency: float):
+        with self._lock:
+            if self._state == STATE_HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                self._open("probe failed")
+                return
+            if self._state == STATE_OPEN:
+                return
+            self._consecutive_failures += 1
+            self._latencies.append(latency)
+            if self._consecutive_failures >= self.failure_threshold:
+                self._open(f"{self._consecutive_failures} consecutive failures")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns the breaker's state for display."""
+        with self._lock:
+            state = self._current_state()
+            retry_in = None
+            if state == STATE_OPEN:
+                retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at)), 1)
+            return {
+                'name': self.name,
+                'state': state,
+                'consecutive_failures': self._consecutive_failures,
+                'recent_p95_seconds': round(percentile(self._latencies, 0.95), 3),
+                'recent_samples': len(self._latencies),
+                'open_reason': self._open_reason,
+                'retry_in_seconds': retry_in,
+                'times_opened': self._times_opened,
+            }
@@ -0,0 +1,140 @@
+# core/services/draft_service.py
+"""
+Buffered storage for in-progress observation drafts.
+
+By default drafts are `Observation` rows with status 'draft', rewritten (with
+their pest/disease links) on every auto-save. With DRAFT_STORE set to 'cache'
+or 'file', the draft is kept outside the database instead, keyed by
+(session, user), and only becomes an Observation when the surveyor submits it.
+
+- 'cache': Django's default cache. Use a shared backend (e.g. Redis or
+  file-based) when running several worker processes.
+- 'file': one JSON file per draft under DRAFT_STORE_DIR.
+"""
+import os
+import json
+import logging
+import hashlib
+from typing import Dict, Any, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+DRAFT_STORE_DATABASE = 'database'
+DRAFT_STORE_CACHE = 'cache'
+DRAFT_STORE_FILE = 'file'
+
+# Fields kept for a buffered draft, in the shape the survey form restores from
+DRAFT_FIELDS = (
+    'latitude', 'longitude', 'gps_accuracy', 'pests_observed',
+    'diseases_observed', 'notes', 'plant_sequence_number',
+)
+
+
+def get_draft_store() -> str:
+    """
+    Returns the configured draft store.
+
+    Returns:
+        One of 'database', 'cache' or 'file'
+    """
+    store = getattr(settings, 'DRAFT_STORE', DRAFT_STORE_DATABASE)
+    if store not in (DRAFT_STORE_DATABASE, DRAFT_STORE_CACHE, DRAFT_STORE_FILE):
+        logger.warning(f"Unknown DRAFT_STORE {store!r}, using database drafts")
+        return DRAFT_STORE_DATABASE
+    return store
+
+
+def drafts_buffered() -> bool:
+    """
+    Checks whether drafts are kept outside the observation tables.
+
+    Returns:
+        True if drafts go to the cache or file store
+    """
+    return get_draft_store() != DRAFT_STORE_DATABASE
+
+
+def _draft_key(session, user) -> str:
+    return f'survey-draft:{session.session_id}:{user.pk}'
+
+
+def _draft_file_path(key: str) -> str:
+    store_dir = getattr(settings, 'DRAFT_STORE_DIR', os.path.join(settings.BASE_DIR, 'draft_store'))
+    return os.path.join(store_dir, hashlib.sha1(key.encode()).hexdigest() + '.json')
+
+
+def save_draft(session, user, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Stores the current form state for a surveyor's session, replacing any previous draft.
+
+    Args:
+        session: The SurveySession being surveyed
+        user: The surveyor
+        data: Form values, keyed by the names in DRAFT_FIELDS
+
+    Returns:
+        The stored draft
+    """
+    draft = {field: data.get(field) for field in DRAFT_FIELDS}
+    key = _draft_key(session, user)
+
+    if get_draft_store() == DRAFT_STORE_FILE:
+        path = _draft_file_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so a concurrent reader never sees a partial file
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(draft, f)
+        os.replace(tmp_path, path)
+    else:
+        cache.set(key, draft, getattr(settings, 'DRAFT_STORE_TIMEOUT', 7 * 24 * 60 * 60))
+
+    return draft
+
+
+def load_draft(session, user) -> Optional[Dict[str, Any]]:
+    """
+    Retrieves the buffered draft for a surveyor's session.
+
+    Args:
+        session: The SurveySession being surveyed
+        user: The surveyor
+
+    Returns:
+        The draft dictionary, or None if there is none
+    """
+    key = _draft_key(session, user)
+
+    if get_draft_store() == DRAFT_STORE_FILE:
+        try:
+            with open(_draft_file_path(key)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            logger.warning(f"Discarding unreadable draft for session {session.session_id}: {e}")
+            return None
+
+    return cache.get(key)
+
+
+def discard_draft(session, user) -> None:
+    """
+    Removes the buffered draft for a surveyor's session, if any.
+
+    Args:
+        session: The SurveySession being surveyed
+        user: The surveyor
+    """
+    key = _draft_key(session, user)
+
+    if get_draft_store() == DRAFT_STORE_FILE:
+        try:
+            os.remove(_draft_file_path(key))
+        except FileNotFoundError:
+            pass
+    else:
+        cache.delete(key)
@@ -0,0 +1,464 @@
+# core/services/farm_import_service.py
+"""
+Bulk import of farms from CSV or GeoJSON.
+
+Rows are parsed and validated together: regions, plant types, the owner's
+existing farm names and already-used Geoscape address IDs are loaded with one
+query each. Addresses and cadastral boundaries are then resolved through a
+thread pool whose Geoscape calls share a rate limiter, so a 200-row file
+takes seconds rather than minutes without bursting past the API quota. The
+workers only make network calls; parcels already in the boundary cache are
+read, and new ones stored, from the calling thread in batches, so SQLite
+never sees concurrent writers. Valid rows are written with a single
+bulk_create and every row gets a result entry for the report.
+
+CSV columns (header row required; only `name` and `region` are mandatory):
+    name, region, size_hectares, stocking_rate, plant_type, address, geoscape_address_id
+
+`region` may be a region name or state abbreviation. GeoJSON files are a
+FeatureCollection with the same keys as feature properties; a Polygon or
+MultiPolygon geometry is used as the farm boundary instead of fetching one.
+"""
+import io
+import csv
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Any, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Farm, Grower, PlantType, Region, CadastralBoundary
+from .geoscape_service import search_addresses, fetch_cadastral_boundary_conditional
+from .boundary_service import store_cadastral_boundary
+from .view_cache import bump_version
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ROWS = 500
+# Rows per upload through the web page, which resolves them within the request:
+# at most two Geoscape calls a row at DEFAULT_RATE_LIMIT keeps it to a few seconds
+DEFAULT_WEB_MAX_ROWS = 25
+DEFAULT_WORKERS = 8
+# Geoscape calls per second across all import workers
+DEFAULT_RATE_LIMIT = 10.0
+
+IMPORT_FIELDS = (
+    'name', 'region', 'size_hectares', 'stocking_rate', 'plant_type', 'address', 'geoscape_address_id'
+)
+
+# Row outcomes in the report
+ROW_CREATED = 'created'
+ROW_VALID = 'valid'          # Passed validation in a dry run
+ROW_INVALID = 'invalid'
+
+
+class FarmImportError(Exception):
+    """Raised when an import file cannot be read at all."""
+
+
+class RateLimiter:
+    """
+    Token bucket shared by threads: at most `rate` acquisitions per second,
+    with bursts of up to `burst`.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def _clean(value: Any) -> str:
+    return str(value).strip() if value is not None else ''
+
+
+def parse_farm_file(data: bytes, filename: str, max_rows: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Parses a CSV or GeoJSON farm list into row dictionaries.
+
+    Args:
+        data: File contents
+        filename: Original file name; a .json/.geojson extension selects GeoJSON
+        max_rows: Most farms accepted (default FARM_IMPORT_MAX_ROWS)
+
+    Returns:
+        List of rows with the IMPORT_FIELDS keys plus 'line' and, for GeoJSON,
+        'boundary'
+
+    Raises:
+        FarmImportError: If the file cannot be decoded or has the wrong structure
+    """
+    try:
+        text = data.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        raise FarmImportError("The file must be UTF-8 encoded.")
+
+    rows = []
+    if filename.lower().endswith(('.json', '.geojson')):
+        try:
+            collection = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise FarmImportError(f"Invalid GeoJSON: {e}")
+        if not isinstance(collection, dict) or collection.get('type') != 'FeatureCollection':
+            raise FarmImportError("GeoJSON must be a FeatureCollection with one feature per farm.")
+        for number, feature in enumerate(collection.get('features') or [], start=1):
+            properties = (feature or {}).get('properties') or {}
+            row = {field: _clean(properties.get(field)) for field in IMPORT_FIELDS}
+            row['line'] = number
+            row['boundary'] = (feature or {}).get('geometry')
+            rows.append(row)
+    else:
+        reader = csv.DictReader(io.StringIO(text))
+        if not reader.fieldnames:
+            raise FarmImportError("The CSV file is empty.")
+        headers = {name.strip().lower() for name in reader.fieldnames if name}
+        missing = {'name', 'region'} - headers
+        if missing:
+            raise FarmImportError(f"The CSV header is missing: {', '.join(sorted(missing))}.")
+        for row_data in reader:
+            normalized = {(k or '').strip().lower(): v for k, v in row_data.items()}
+            row = {field: _clean(normalized.get(field)) for field in IMPORT_FIELDS}
+            # Header is line 1
+            row['line'] = reader.line_num
+            row['boundary'] = None
+            rows.append(row)
+
+    if max_rows is None:
+        max_rows = getattr(settings, 'FARM_IMPORT_MAX_ROWS', DEFAULT_MAX_ROWS)
+    if len(rows) > max_rows:
+        raise FarmImportError(f"The file has {len(rows)} farms; at most {max_rows} can be imported at once.")
+    return rows
+
+
+def _valid_geometry(geometry) -> bool:
+    """Checks that a GeoJSON Polygon/MultiPolygon has rings of at least four numeric positions."""
+    if not isinstance(geometry, dict):
+        return False
+    coordinates = geometry.get('coordinates')
+    if geometry.get('type') == 'Polygon':
+        polygons = [coordinates]
+    elif geometry.get('type') == 'MultiPolygon':
+        polygons = coordinates
+    else:
+        return False
+    if not isinstance(polygons, list) or not polygons:
+        return False
+    for rings in polygons:
+        if not isinstance(rings, list) or not rings:
+            return False
+        for ring in rings:
+            if not isinstance(ring, list) or len(ring) < 4:
+                return False
+            for position in ring:
+                if not isinstance(position, list) or len(position) < 2:
+                    return False
+                if not all(isinstance(c, (int, float)) and not isinstance(c, bool) for c in position[:2]):
+                    return False
+    return True
+
+
+def validate_rows(rows: List[Dict[str, Any]], grower: Grower) -> List[Dict[str, Any]]:
+    """
+    Validates parsed rows against each other and the database.
+
+    Args:
+        rows: Output of parse_farm_file
+        grower: The owner the farms will be created for
+
+    Returns:
+        One result per row: the row's 'line' and 'name', 'status' (ROW_VALID or
+        ROW_INVALID), 'errors', and for valid rows the cleaned 'fields'
+    """
+    regions = list(Region.objects.all())
+    regions_by_key = {region.name.lower(): region for region in regions}
+    abbreviations = [r.state_abbreviation.lower() for r in regions if r.state_abbreviation]
+    for region in regions:
+        # A state abbreviation only identifies a region if no other region shares it
+        if region.state_abbreviation and abbreviations.count(region.state_abbreviation.lower()) == 1:
+            regions_by_key.setdefault(region.state_abbreviation.lower(), region)
+    plant_types = {pt.name.lower(): pt for pt in PlantType.objects.all()}
+    default_plant_type = plant_types.get('mango')
+    existing_names = {name.lower() for name in Farm.objects.filter(owner=grower).values_list('name', flat=True)}
+    file_address_ids = {row['geoscape_address_id'] for row in rows if row['geoscape_address_id']}
+    used_address_ids = set(
+        Farm.objects.filter(geoscape_address_id__in=file_address_ids).values_list('geoscape_address_id', flat=True)
+    )
+
+    seen_names = set()
+    seen_address_ids = set()
+    results = []
+    for row in rows:
+        errors = []
+        fields: Dict[str, Any] = {}
+        name = row['name']
+
+        if not name:
+            errors.append("Name is required.")
+        elif len(name) > Farm._meta.get_field('name').max_length:
+            errors.append("Name is too long.")
+        elif name.lower() in existing_names:
+            errors.append("You already have a farm with this name.")
+        elif name.lower() in seen_names:
+            errors.append("The name appears more than once in the file.")
+        seen_names.add(name.lower())
+        fields['name'] = name
+
+        region = regions_by_key.get(row['region'].lower()) if row['region'] else None
+        if region is None:
+            errors.append(f"Unknown region '{row['region']}'." if row['region'] else "Region is required.")
+        fields['region'] = region
+
+        try:
+            size = Decimal(row['size_hectares']) if row['size_hectares'] else None
+            if size is not None and (size <= 0 or size >= Decimal('1e8')):
+                errors.append("Size (hectares) must be a positive number.")
+            fields['size_hectares'] = size.quantize(Decimal('0.01')) if size is not None else None
+        except InvalidOperation:
+            errors.append(f"Size '{row['size_hectares']}' is not a number.")
+
+        try:
+            stocking = int(row['stocking_rate']) if row['stocking_rate'] else None
+            if stocking is not None and stocking <= 0:
+                errors.append("Stocking rate must be a positive whole number.")
+            fields['stocking_rate'] = stocking
+        except ValueError:
+            errors.append(f"Stocking rate '{row['stocking_rate']}' is not a whole number.")
+
+        plant_type = plant_types.get(row['plant_type'].lower()) if row['plant_type'] else default_plant_type
+        if plant_type is None:
+            errors.append(
+                f"Unknown plant type '{row['plant_type']}'." if row['plant_type']
+                else "Default 'Mango' PlantType not found. Please add it via admin."
+            )
+        fields['plant_type'] = plant_type
+
+        address_id = row['geoscape_address_id']
+        if address_id:
+            if address_id in used_address_ids:
+                errors.append("This Geoscape address is already linked to another farm.")
+            elif address_id in seen_address_ids:
+                errors.append("The Geoscape address ID appears more than once in the file.")
+            seen_address_ids.add(address_id)
+        fields['geoscape_address_id'] = address_id or None
+        fields['address'] = row['address']
+
+        if row.get('boundary') is not None and not _valid_geometry(row['boundary']):
+            errors.append("The feature geometry must be a valid Polygon or MultiPolygon.")
+        fields['boundary'] = row.get('boundary')
+
+        results.append({
+            'line': row['line'],
+            'name': name,
+            'status': ROW_INVALID if errors else ROW_VALID,
+            'errors': errors,
+            'fields': fields,
+        })
+    return results
+
+
+def _resolve_address(result: Dict[str, Any], limiter: RateLimiter):
+    """Pool task: finds the Geoscape address ID for a row given only an address."""
+    fields = result['fields']
+    try:
+        limiter.acquire()
+        suggestions = search_addresses(fields['address'], fields['region'].state_abbreviation)
+    except Exception as e:
+        logger.exception(f"Error resolving address for import row {result['line']}: {e}")
+        suggestions = []
+    if suggestions and suggestions[0].get('id'):
+        fields['geoscape_address_id'] = suggestions[0]['id']
+        fields['formatted_address'] = suggestions[0].get('address')
+    else:
+        result['warnings'].append(f"No Geoscape match for address '{fields['address']}'.")
+
+
+def _fetch_parcel(address_id: str, limiter: RateLimiter) -> Optional[Dict[str, Any]]:
+    """Pool task: fetches one cadastral parcel (network only; nothing is saved)."""
+    try:
+        limiter.acquire()
+        result = fetch_cadastral_boundary_conditional(address_id)
+    except Exception as e:
+        logger.exception(f"Error fetching cadastral boundary {address_id} for import: {e}")
+        return None
+    return result if result and result['geometry'] else None
+
+
+def resolve_rows(results: List[Dict[str, Any]], workers: Optional[int] = None, rate: Optional[float] = None):
+    """
+    Resolves addresses and cadastral boundaries for valid rows concurrently.
+
+    Rows that fail to resolve are still imported, with a warning; their
+    boundary can be fetched later from the farm page.
+
+    Args:
+        results: Output of validate_rows (updated in place)
+        workers: Thread pool size (default FARM_IMPORT_WORKERS)
+        rate: Geoscape calls per second across workers (default FARM_IMPORT_RATE_LIMIT)
+    """
+    valid = [r for r in results if r['status'] == ROW_VALID]
+    for result in valid:
+        result.setdefault('warnings', [])
+    to_search = [
+        r for r in valid
+        if not r['fields']['geoscape_address_id'] and r['fields']['address'] and r['fields']['region'].state_abbreviation
+    ]
+    needs_parcel = lambda r: r['fields']['geoscape_address_id'] and r['fields']['boundary'] is None
+    if not to_search and not any(needs_parcel(r) for r in valid):
+        return
+
+    workers = workers or getattr(settings, 'FARM_IMPORT_WORKERS', DEFAULT_WORKERS)
+    rate = rate if rate is not None else getattr(settings, 'FARM_IMPORT_RATE_LIMIT', DEFAULT_RATE_LIMIT)
+    limiter = RateLimiter(rate, burst=workers)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='farm-import') as pool:
+        list(pool.map(lambda r: _resolve_address(r, limiter), to_search))
+
+        # Two rows may resolve to the same parcel; only the first can keep it
+        resolved_ids = [r['fields']['geoscape_address_id'] for r in valid if r['fields']['geoscape_address_id']]
+        claimed = set(
+            Farm.objects.filter(geoscape_address_id__in=resolved_ids).values_list('geoscape_address_id', flat=True)
+        )
+        for result in sorted(valid, key=lambda r: r['line']):
+            address_id = result['fields']['geoscape_address_id']
+            if not address_id:
+                continue
+            if address_id in claimed:
+                result['status'] = ROW_INVALID
+                result['errors'].append(f"Geoscape address {address_id} is already used by another farm.")
+            claimed.add(address_id)
+
+        parcel_rows = [r for r in valid if r['status'] == ROW_VALID and needs_parcel(r)]
+        address_ids = sorted({r['fields']['geoscape_address_id'] for r in parcel_rows})
+        geometries = dict(
+            CadastralBoundary.objects.filter(geoscape_address_id__in=address_ids).values_list('geoscape_address_id', 'geometry')
+        )
+        missing = [a for a in address_ids if a not in geometries]
+        fetched = dict(zip(missing, pool.map(lambda a: _fetch_parcel(a, limiter), missing)))
+
+    for address_id, result in fetched.items():
+        if result:
+            store_cadastral_boundary(address_id, result)
+            geometries[address_id] = result['geometry']
+
+    for result in parcel_rows:
+        geometry = geometries.get(result['fields']['geoscape_address_id'])
+        result['fields']['boundary_status'] = 'ok' if geometry else 'failed'
+        if geometry:
+            result['fields']['boundary'] = geometry
+        else:
+            result['warnings'].append("Cadastral boundary could not be fetched; retry from the farm page.")
+
+
+def import_farms(
+    data: bytes,
+    filename: str,
+    grower: Grower,
+    dry_run: bool = False,
+    workers: Optional[int] = None,
+    rate: Optional[float] = None,
+    max_rows: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Imports farms from a CSV or GeoJSON file.
+
+    Args:
+        data: File contents
+        filename: Original file name (selects the format)
+        grower: Owner of the new farms
+        dry_run: Validate and resolve, but create nothing
+        workers: Thread pool size for Geoscape lookups
+        rate: Geoscape calls per second across workers
+        max_rows: Most farms accepted (default FARM_IMPORT_MAX_ROWS)
+
+    Returns:
+        Dictionary with 'rows' (per-row results without internal fields),
+        'created', 'invalid' and 'dry_run'
+
+    Raises:
+        FarmImportError: If the file cannot be read
+    """
+    rows = parse_farm_file(data, filename, max_rows)
+    results = validate_rows(rows, grower)
+    resolve_rows(results, workers, rate)
+
+    valid = [r for r in results if r['status'] == ROW_VALID]
+    if valid and not dry_run:
+        now = timezone.now()
+        farms = []
+        for result in valid:
+            fields = result['fields']
+            farms.append(Farm(
+                owner=grower,
+                name=fields['name'],
+                region=fields['region'],
+                size_hectares=fields['size_hectares'],
+                stocking_rate=fields['stocking_rate'],
+                plant_type=fields['plant_type'],
+                geoscape_address_id=fields['geoscape_address_id'],
+                formatted_address=fields.get('formatted_address') or fields['address'] or None,
+                has_exact_address=bool(fields['geoscape_address_id']),
+                boundary=fields['boundary'],
+                boundary_status=fields.get('boundary_status') or ('ok' if fields['boundary'] else ''),
+                boundary_status_updated=now if (fields['boundary'] or fields.get('boundary_status')) else None,
+            ))
+        with transaction.atomic():
+            created = Farm.objects.bulk_create(farms)
+        # bulk_create sends no post_save, so invalidate the grower's cached pages here
+        bump_version('grower', grower.pk)
+        for result, farm in zip(valid, created):
+            result['status'] = ROW_CREATED
+            result['farm_id'] = farm.pk
+        logger.info(f"Imported {len(created)} farm(s) for grower {grower.pk}")
+
+    report = []
+    for result in results:
+        fields = result['fields']
+        report.append({
+            'line': result['line'],
+            'name': result['name'],
+            'status': result['status'],
+            'farm_id': result.get('farm_id'),
+            'geoscape_address_id': fields.get('geoscape_address_id') or '',
+            'boundary': 'yes' if fields.get('boundary') else 'no',
+            'messages': result['errors'] + result.get('warnings', []),
+        })
+    return {
+        'rows': report,
+        'created': sum(1 for r in report if r['status'] == ROW_CREATED),
+        'invalid': sum(1 for r in report if r['status'] == ROW_INVALID),
+        'dry_run': dry_run,
+    }
+
+
+def write_report_csv(report: Dict[str, Any], stream):
+    """Writes an import report's rows as CSV to a text stream."""
+    writer = csv.writer(stream)
+    writer.writerow(['line', 'name', 'status', 'farm_id', 'geoscape_address_id', 'boundary', 'messages'])
+    for row in report['rows']:
+        writer.writerow([
+            row['line'], row['name'], row['status'], row['farm_id'] or '',
+            row['geoscape_address_id'], row['boundary'], ' '.join(row['messages'])
+        ])
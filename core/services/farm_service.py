@@ -4,8 +4,7 @@ from typing import Dict, Any, Optional, List, Tuple
 
 from django.contrib.auth.models import User
 from ..models import Farm, Grower, PlantType, SurveySession, Observation
-from .geoscape_service import fetch_cadastral_boundary
-from .boundary_service import fetch_and_save_cadastral_boundary
+from .boundary_service import request_cadastral_boundary
 
 logger = logging.getLogger(__name__)
 
@@ -88,11 +87,9 @@ def create_farm(farm_data: Dict[str, Any], user: User) -> Tuple[Optional[Farm],
         # Save the farm
         farm.save()
         
-        # If we have a Geoscape address ID, try to fetch the boundary
+        # If we have a Geoscape address ID, fetch the boundary in the background
         if farm.geoscape_address_id:
-            success, message = fetch_and_save_cadastral_boundary(farm)
-            if not success:
-                logger.warning(f"Could not fetch boundary for farm {farm.id}: {message}")
+            request_cadastral_boundary(farm)
         
         return farm, None
     
@@ -0,0 +1,246 @@
+# core/services/geofence_service.py
+"""
+Point-in-polygon checks of observation positions against farm boundaries.
+
+A farm's boundary GeoJSON is parsed once into a PreparedBoundary (flat
+edge lists plus bounding boxes) and kept in a per-process cache keyed by
+farm. The cache entry is rebuilt when the stored boundary changes. Single
+points are tested with a bbox prefilter and ray casting; batches use a
+NumPy version of the same test.
+"""
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of farms kept in the prepared boundary cache
+BOUNDARY_CACHE_SIZE = 256
+
+# Polygons with more edges than this are tested with NumPy even for single points
+SCALAR_EDGE_LIMIT = 48
+
+BOUNDARY_POLICY_OFF = 'off'
+BOUNDARY_POLICY_FLAG = 'flag'
+BOUNDARY_POLICY_REJECT = 'reject'
+
+
+def _extract_polygons(geojson) -> List[List[List[Sequence[float]]]]:
+    """
+    Returns the polygons (lists of rings) in a GeoJSON geometry, feature or collection.
+
+    Args:
+        geojson: Parsed GeoJSON object
+
+    Returns:
+        List of polygons, each a list of rings of [lon, lat] positions
+    """
+    if not isinstance(geojson, dict):
+        return []
+    kind = geojson.get('type')
+    if kind == 'FeatureCollection':
+        return [p for feature in geojson.get('features') or [] for p in _extract_polygons(feature)]
+    if kind == 'Feature':
+        return _extract_polygons(geojson.get('geometry'))
+    if kind == 'Polygon':
+        return [geojson.get('coordinates') or []]
+    if kind == 'MultiPolygon':
+        return list(geojson.get('coordinates') or [])
+    return []
+
+
+class PreparedBoundary:
+    """
+    A farm boundary pre-processed for fast containment tests.
+
+    Holes are handled with the even-odd rule: a point is inside a polygon if
+    a ray from it crosses an odd number of edges across all of the polygon's
+    rings, so each polygon is stored as one flat list of edges. As usual for
+    ray casting, a point exactly on an edge counts as inside on the south and
+    west sides of a region and outside on its north and east sides, so two
+    polygons sharing an edge never both contain it.
+    """
+
+    def __init__(self, geojson):
+        self.polygons: List[Tuple[Tuple[float, float, float, float], list, np.ndarray]] = []
+        for polygon in _extract_polygons(geojson):
+            edges = []
+            for ring in polygon:
+                if len(ring) < 3:
+                    continue
+                points = [(float(pos[0]), float(pos[1])) for pos in ring]
+                edges.extend(
+                    (x_i, y_i, x_j, y_j)
+                    for (x_i, y_i), (x_j, y_j) in zip(points, points[-1:] + points[:-1])
+                    if y_i != y_j  # Horizontal edges never cross the ray
+                )
+            if not edges:
+                continue
+            # Edges as columns x_i, y_i, x_j, y_j
+            edge_array = np.asarray(edges, dtype=np.float64)
+            xs = edge_array[:, [0, 2]]
+            ys = edge_array[:, [1, 3]]
+            bbox = (float(ys.min()), float(xs.min()), float(ys.max()), float(xs.max()))
+            self.polygons.append((bbox, edges, edge_array))
+
+        if self.polygons:
+            bboxes = [bbox for bbox, _, _ in self.polygons]
+            self.bbox = (
+                min(b[0] for b in bboxes), min(b[1] for b in bboxes),
+                max(b[2] for b in bboxes), max(b[3] for b in bboxes),
+            )
+        else:
+            self.bbox = None
+
+    def is_empty(self) -> bool:
+        return not self.polygons
+
+    def contains(self, lat: float, lon: float) -> bool:
+        """
+        Tests whether a point lies inside the boundary.
+
+        Args:
+            lat: Latitude in decimal degrees
+            lon: Longitude in decimal degrees
+
+        Returns:
+            True if the point is inside any polygon of the boundary
+        """
+        if self.bbox is None:
+            return False
+        south, west, north, east = self.bbox
+        if not (south <= lat <= north and west <= lon <= east):
+            return False
+
+        for (p_south, p_west, p_north, p_east), edges, edge_array in self.polygons:
+            if not (p_south <= lat <= p_north and p_west <= lon <= p_east):
+                continue
+            if len(edges) > SCALAR_EDGE_LIMIT:
+                x_i, y_i, x_j, y_j = edge_array.T
+                crosses = (y_i > lat) != (y_j > lat)
+                x_cross = (x_j[crosses] - x_i[crosses]) * (lat - y_i[crosses]) / (y_j[crosses] - y_i[crosses]) + x_i[crosses]
+                inside = bool(np.count_nonzero(lon < x_cross) % 2)
+            else:
+                inside = False
+                for x_i, y_i, x_j, y_j in edges:
+                    if (y_i > lat) != (y_j > lat) and lon < (x_j - x_i) * (lat - y_i) / (y_j - y_i) + x_i:
+                        inside = not inside
+            if inside:
+                return True
+        return False
+
+    def contains_many(self, lats, lons) -> np.ndarray:
+        """
+        Vectorized containment test for many points.
+
+        Args:
+            lats: Array-like of latitudes
+            lons: Array-like of longitudes
+
+        Returns:
+            Boolean NumPy array, True where the point is inside the boundary
+        """
+        lat = np.asarray(lats, dtype=np.float64)
+        lon = np.asarray(lons, dtype=np.float64)
+        result = np.zeros(lat.shape, dtype=bool)
+        if self.bbox is None:
+            return result
+
+        for (p_south, p_west, p_north, p_east), edges, edge_array in self.polygons:
+            candidates = np.nonzero(
+                (lat >= p_south) & (lat <= p_north) & (lon >= p_west) & (lon <= p_east) & ~result
+            )[0]
+            if candidates.size == 0:
+                continue
+            py = lat[candidates]
+            px = lon[candidates]
+            inside = np.zeros(candidates.size, dtype=bool)
+            # Loop over edges, vectorized across points
+            for x_i, y_i, x_j, y_j in edges:
+                crosses = (y_i > py) != (y_j > py)
+                inside ^= crosses & (px < (x_j - x_i) * (py - y_i) / (y_j - y_i) + x_i)
+            result[candidates] |= inside
+        return result
+
+
+_cache: "OrderedDict[int, Tuple[str, PreparedBoundary]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _boundary_fingerprint(boundary) -> str:
+    if isinstance(boundary, str):
+        return boundary
+    return json.dumps(boundary, sort_keys=True, separators=(',', ':'))
+
+
+def get_prepared_boundary(farm) -> Optional[PreparedBoundary]:
+    """
+    Returns the prepared boundary for a farm, reusing the cached one if unchanged.
+
+    Args:
+        farm: The Farm instance
+
+    Returns:
+        A PreparedBoundary, or None if the farm has no usable boundary
+    """
+    boundary = farm.boundary
+    if not boundary:
+        return None
+    fingerprint = _boundary_fingerprint(boundary)
+
+    with _cache_lock:
+        cached = _cache.get(farm.pk)
+        if cached and cached[0] == fingerprint:
+            _cache.move_to_end(farm.pk)
+            return cached[1]
+
+    try:
+        geojson = json.loads(boundary) if isinstance(boundary, str) else boundary
+    except ValueError:
+        logger.warning(f"Farm {farm.pk} has an unreadable boundary")
+        return None
+    prepared = PreparedBoundary(geojson)
+    if prepared.is_empty():
+        return None
+
+    with _cache_lock:
+        _cache[farm.pk] = (fingerprint, prepared)
+        _cache.move_to_end(farm.pk)
+        while len(_cache) > BOUNDARY_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return prepared
+
+
+def get_boundary_policy() -> str:
+    """
+    Returns how out-of-bounds observations are handled on submission.
+
+    Returns:
+        'off', 'flag' (store and mark them) or 'reject'
+    """
+    return getattr(settings, 'OBSERVATION_BOUNDARY_POLICY', BOUNDARY_POLICY_FLAG)
+
+
+def check_point_in_farm(farm, latitude, longitude) -> Optional[bool]:
+    """
+    Checks whether a position falls inside a farm's boundary.
+
+    Args:
+        farm: The Farm instance
+        latitude: Latitude (Decimal, float or None)
+        longitude: Longitude (Decimal, float or None)
+
+    Returns:
+        True/False, or None if there is no position or no boundary to check against
+    """
+    if latitude is None or longitude is None or get_boundary_policy() == BOUNDARY_POLICY_OFF:
+        return None
+    prepared = get_prepared_boundary(farm)
+    if prepared is None:
+        return None
+    return prepared.contains(float(latitude), float(longitude))
@@ -1,14 +1,249 @@
 # core/services/geoscape_service.py
+import os
+import json
+import hashlib
 import requests
 import logging
 from django.conf import settings
+from requests.structures import CaseInsensitiveDict
 from typing import Dict, Any, Optional, List
 
+from .http_client import PooledHttpClient, get_shared_client
+from .address_cache import suggestion_cache, normalize_query
+from .circuit_breaker import CircuitBreaker, CircuitOpenError, STATE_OPEN
+from .api_metrics import ApiMetrics
+from .single_flight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
-# API URLs
-GEOSCAPE_CADASTRE_URL = "https://api.psma.com.au/v1/landParcels/cadastres/findByIdentifier"
-GEOSCAPE_ADDRESS_SEARCH_URL = "https://api.psma.com.au/v1/predictive/address"
+# API endpoints, relative to GEOSCAPE_BASE_URL
+DEFAULT_GEOSCAPE_BASE_URL = "https://api.psma.com.au"
+GEOSCAPE_CADASTRE_PATH = "/v1/landParcels/cadastres/findByIdentifier"
+GEOSCAPE_ADDRESS_SEARCH_PATH = "/v1/predictive/address"
+
+# Read timeouts per endpoint; cadastre lookups return larger geometries
+CADASTRE_READ_TIMEOUT = 15
+ADDRESS_SEARCH_READ_TIMEOUT = 10
+
+# Suggestions requested per search; fewer back means the result set is complete
+DEFAULT_SUGGESTION_LIMIT = 10
+
+# GEOSCAPE_MODE values: call the API, call it and save each response as a
+# fixture, or answer from saved fixtures without any network access
+GEOSCAPE_MODE_LIVE = 'live'
+GEOSCAPE_MODE_RECORD = 'record'
+GEOSCAPE_MODE_REPLAY = 'replay'
+
+# Response headers kept in fixtures
+FIXTURE_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control')
+
+# Shown to users instead of waiting on Geoscape while the circuit breaker is open
+GEOSCAPE_UNAVAILABLE_MESSAGE = "Address lookup is temporarily unavailable. Please try again in a minute."
+
+# Shared by every live client in the process, so a failing API is noticed once
+geoscape_breaker = CircuitBreaker(
+    'geoscape',
+    failure_threshold=getattr(settings, 'GEOSCAPE_BREAKER_FAILURE_THRESHOLD', 5),
+    latency_threshold=getattr(settings, 'GEOSCAPE_BREAKER_LATENCY_THRESHOLD', 3.0),
+    window=getattr(settings, 'GEOSCAPE_BREAKER_WINDOW', 50),
+    reset_timeout=getattr(settings, 'GEOSCAPE_BREAKER_RESET_TIMEOUT', 30),
+    half_open_max_calls=getattr(settings, 'GEOSCAPE_BREAKER_HALF_OPEN_CALLS', 1),
+)
+geoscape_metrics = ApiMetrics('geoscape')
+
+# Identical requests in flight at the same time share one upstream call
+geoscape_flight = SingleFlight('geoscape')
+
+
+def get_geoscape_mode() -> str:
+    return getattr(settings, 'GEOSCAPE_MODE', GEOSCAPE_MODE_LIVE)
+
+
+def get_fixture_dir() -> str:
+    return getattr(settings, 'GEOSCAPE_FIXTURE_DIR', os.path.join(settings.BASE_DIR, 'geoscape_fixtures'))
+
+
+def fixture_path(path: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Returns the fixture file for a request.
+    
+    Requests are identified by path and query parameters (values compared as
+    strings); headers such as the API key are not part of the key.
+    
+    Args:
+        path: API path, e.g. GEOSCAPE_ADDRESS_SEARCH_PATH
+        params: Query parameters
+        
+    Returns:
+        Absolute path of the fixture JSON file
+    """
+    canonical = json.dumps(
+        [path, sorted((str(k), str(v)) for k, v in (params or {}).items())],
+        separators=(',', ':')
+    )
+    digest = hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:16]
+    endpoint = path.rstrip('/').rsplit('/', 1)[-1]
+    return os.path.join(get_fixture_dir(), f"{endpoint}-{digest}.json")
+
+
+def save_fixture(path: str, params: Optional[Dict[str, Any]], response: requests.Response) -> str:
+    """
+    Saves a response as a fixture for replay.
+    
+    Args:
+        path: API path
+        params: Query parameters of the request
+        response: The response to record
+        
+    Returns:
+        Path of the written fixture
+    """
+    try:
+        body = response.json()
+    except ValueError:
+        body = response.text
+    fixture = {
+        'request': {'path': path, 'params': {str(k): str(v) for k, v in (params or {}).items()}},
+        'response': {
+            'status': response.status_code,
+            'headers': {name: response.headers[name] for name in FIXTURE_HEADERS if name in response.headers},
+            'body': body,
+        },
+    }
+    target = fixture_path(path, params)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp_path = f"{target}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(fixture, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, target)
+    return target
+
+
+def load_fixture(path: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Loads the recorded response for a request.
+    
+    Returns:
+        Dictionary with 'status', 'headers' and 'body', or None if not recorded
+    """
+    try:
+        with open(fixture_path(path, params), encoding='utf-8') as f:
+            return json.load(f)['response']
+    except FileNotFoundError:
+        return None
+
+
+def fixture_body_bytes(recorded: Dict[str, Any]) -> bytes:
+    """Serializes a recorded body back into response bytes."""
+    body = recorded['body']
+    return body.encode('utf-8') if isinstance(body, str) else json.dumps(body).encode('utf-8')
+
+
+class RecordingClient:
+    """
+    Sends requests through the live client and saves each response as a fixture.
+
+    304 Not Modified answers to revalidation requests are not saved: they have
+    no body, and fixtures are keyed without the conditional headers, so one
+    would replace the recorded 200 for the same request.
+    """
+
+    def __init__(self, client: PooledHttpClient):
+        self.client = client
+
+    def get(self, path: str, **kwargs: Any) -> requests.Response:
+        response = self.client.get(path, **kwargs)
+        if response.status_code == 304:
+            return response
+        try:
+            save_fixture(path, kwargs.get('params'), response)
+        except OSError as e:
+            logger.error(f"Could not record Geoscape fixture for {path}: {e}")
+        return response
+
+
+class ReplayClient:
+    """Answers requests from recorded fixtures, without network access."""
+
+    def get(self, path: str, **kwargs: Any) -> requests.Response:
+        params = kwargs.get('params')
+        recorded = load_fixture(path, params)
+        if recorded is None:
+            # Surface as a network failure so callers take their usual error path
+            raise requests.exceptions.ConnectionError(f"No recorded Geoscape response for {path} {params}")
+        response = requests.Response()
+        response.status_code = recorded['status']
+        response.headers = CaseInsensitiveDict(recorded.get('headers') or {})
+        response._content = fixture_body_bytes(recorded)
+        response.encoding = 'utf-8'
+        response.url = path
+        return response
+
+
+def get_client():
+    """
+    Returns the Geoscape client for the configured GEOSCAPE_MODE.
+    
+    Returns:
+        The shared pooled client ('live'), a recording wrapper around it
+        ('record'), or a fixture-backed ReplayClient ('replay')
+    """
+    mode = get_geoscape_mode()
+    if mode == GEOSCAPE_MODE_REPLAY:
+        return ReplayClient()
+    if mode == GEOSCAPE_MODE_RECORD:
+        return RecordingClient(get_live_client())
+    return get_live_client()
+
+
+def get_live_client() -> PooledHttpClient:
+    """
+    Returns the shared, connection-pooled Geoscape client.
+    
+    Returns:
+        PooledHttpClient configured from the GEOSCAPE_* settings
+    """
+    return get_shared_client('geoscape', lambda: PooledHttpClient(
+        base_url=getattr(settings, 'GEOSCAPE_BASE_URL', DEFAULT_GEOSCAPE_BASE_URL),
+        pool_size=getattr(settings, 'GEOSCAPE_POOL_SIZE', 10),
+        connect_timeout=getattr(settings, 'GEOSCAPE_CONNECT_TIMEOUT', 3.05),
+        read_timeout=getattr(settings, 'GEOSCAPE_READ_TIMEOUT', 10),
+        max_retries=getattr(settings, 'GEOSCAPE_MAX_RETRIES', 2),
+        backoff_base=getattr(settings, 'GEOSCAPE_BACKOFF_BASE', 0.25),
+        backoff_max=getattr(settings, 'GEOSCAPE_BACKOFF_MAX', 4.0),
+        headers={"Accept": "application/json"},
+        breaker=geoscape_breaker,
+        metrics=geoscape_metrics,
+    ))
+
+
+def is_geoscape_available() -> bool:
+    """Returns False while the circuit breaker is refusing Geoscape calls."""
+    if get_geoscape_mode() == GEOSCAPE_MODE_REPLAY:
+        return True
+    return geoscape_breaker.state != STATE_OPEN
+
+
+def get_geoscape_status() -> Dict[str, Any]:
+    """
+    Returns the circuit breaker state and per-endpoint metrics for staff.
+    
+    Returns:
+        Dictionary with 'mode', 'breaker' and 'metrics'
+    """
+    return {
+        'mode': get_geoscape_mode(),
+        'breaker': geoscape_breaker.snapshot(),
+        'metrics': geoscape_metrics.snapshot(
+            known_endpoints=(GEOSCAPE_ADDRESS_SEARCH_PATH, GEOSCAPE_CADASTRE_PATH)
+        ),
+        'single_flight': geoscape_flight.snapshot(),
+    }
+
+
+def _timeout(read_timeout: float):
+    """Returns a (connect, read) timeout with the configured connect timeout."""
+    return (getattr(settings, 'GEOSCAPE_CONNECT_TIMEOUT', 3.05), read_timeout)
 
 
 def get_api_key() -> Optional[str]:
@@ -19,6 +254,9 @@ def get_api_key() -> Optional[str]:
         The API key as a string or None if not configured
     """
     api_key = getattr(settings, 'GEOSCAPE_API_KEY', None)
+    if not api_key and get_geoscape_mode() == GEOSCAPE_MODE_REPLAY:
+        # Fixtures do not depend on the key, so replay works without one
+        return 'replay'
     if not api_key:
         logger.error("GEOSCAPE_API_KEY setting is not configured")
     return api_key
@@ -35,6 +273,37 @@ def fetch_cadastral_boundary(address_id: str) -> Optional[Dict[str, Any]]:
         A dictionary representing the GeoJSON geometry part of the boundary,
         or None if an error occurs or the boundary is not found.
     """
+    result = fetch_cadastral_boundary_conditional(address_id)
+    return result['geometry'] if result else None
+
+
+def _parse_max_age(cache_control: str) -> Optional[int]:
+    """Returns the max-age of a Cache-Control header in seconds, if present."""
+    for directive in cache_control.split(','):
+        name, _, value = directive.strip().partition('=')
+        if name.lower() == 'max-age' and value.strip().isdigit():
+            return int(value.strip())
+    return None
+
+
+def fetch_cadastral_boundary_conditional(
+    address_id: str,
+    etag: str = '',
+    last_modified: str = ''
+) -> Optional[Dict[str, Any]]:
+    """
+    Fetches a cadastral boundary, sending cache validators if given.
+    
+    Args:
+        address_id: The Geoscape address ID
+        etag: ETag of the copy already held, sent as If-None-Match
+        last_modified: Last-Modified of the copy already held, sent as If-Modified-Since
+        
+    Returns:
+        Dictionary with 'not_modified' (True on 304), 'geometry' (None when
+        not modified), 'etag', 'last_modified' and 'max_age' (seconds or
+        None), or None if an error occurs or the boundary is not found.
+    """
     if not address_id:
         logger.warning("fetch_cadastral_boundary called with no address_id")
         return None
@@ -43,20 +312,43 @@ def fetch_cadastral_boundary(address_id: str) -> Optional[Dict[str, Any]]:
     if not api_key:
         return None
     
-    headers = {
-        "Accept": "application/json",
-        "Authorization": api_key
-    }
+    # Concurrent fetches of the same parcel (e.g. a double-submitted form) share one request
+    return geoscape_flight.do(
+        (GEOSCAPE_CADASTRE_PATH, address_id, etag, last_modified),
+        lambda: _request_cadastral_boundary(address_id, api_key, etag, last_modified)
+    )
+
+
+def _request_cadastral_boundary(
+    address_id: str,
+    api_key: str,
+    etag: str,
+    last_modified: str
+) -> Optional[Dict[str, Any]]:
+    """Sends the cadastre request; see fetch_cadastral_boundary_conditional for the result."""
+    headers = {"Authorization": api_key}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
     params = {"addressId": address_id}
     
     try:
         logger.info(f"Fetching cadastral boundary for addressId: {address_id}")
-        response = requests.get(
-            GEOSCAPE_CADASTRE_URL, 
+        response = get_client().get(
+            GEOSCAPE_CADASTRE_PATH, 
             headers=headers, 
             params=params, 
-            timeout=15
+            timeout=_timeout(CADASTRE_READ_TIMEOUT)
         )
+        validators = {
+            'etag': response.headers.get('ETag', etag),
+            'last_modified': response.headers.get('Last-Modified', last_modified),
+            'max_age': _parse_max_age(response.headers.get('Cache-Control', '')),
+        }
+        if response.status_code == 304:
+            logger.info(f"Cadastral boundary for addressId {address_id} not modified")
+            return {'not_modified': True, 'geometry': None, **validators}
         response.raise_for_status()
         
         data = response.json()
@@ -73,8 +365,11 @@ def fetch_cadastral_boundary(address_id: str) -> Optional[Dict[str, Any]]:
         
         # Return the raw geometry dictionary
         logger.info(f"Successfully fetched geometry data for addressId: {address_id}")
-        return geometry_data
+        return {'not_modified': False, 'geometry': geometry_data, **validators}
     
+    except CircuitOpenError:
+        logger.warning(f"Geoscape unavailable; cadastral boundary for {address_id} not fetched")
+        return None
     except requests.exceptions.RequestException as e:
         logger.error(f"Network error fetching Geoscape cadastral data for {address_id}: {e}")
         return None
@@ -90,6 +385,10 @@ def search_addresses(query: str, state_territory: str) -> List[Dict[str, Any]]:
     """
     Searches for addresses using the Geoscape predictive API.
     
+    Results are served from the in-process suggestion cache where possible,
+    including by filtering a complete result for a shorter prefix of the query.
+    On a miss, identical searches already in flight are joined rather than repeated.
+    
     Args:
         query: The address search query
         state_territory: The state/territory abbreviation (e.g., NT, QLD)
@@ -101,34 +400,58 @@ def search_addresses(query: str, state_territory: str) -> List[Dict[str, Any]]:
         logger.warning("Address search query too short")
         return []
     
+    cached = suggestion_cache.get(query, state_territory)
+    if cached is not None:
+        logger.debug(f"Address search for '{query}' in {state_territory} served from cache")
+        return cached
+    
     api_key = get_api_key()
     if not api_key:
         return []
     
-    headers = {
-        "Accept": "application/json",
-        "Authorization": api_key
-    }
+    # Users typing the same town at once, or overlapping requests from one
+    # browser, wait on a single upstream call and share its suggestions
+    return geoscape_flight.do(
+        (GEOSCAPE_ADDRESS_SEARCH_PATH, normalize_query(query), state_territory),
+        lambda: _request_address_suggestions(query, state_territory, api_key)
+    )
+
+
+def _request_address_suggestions(query: str, state_territory: str, api_key: str) -> List[Dict[str, Any]]:
+    """Sends the predictive search request and caches a successful result."""
+    # A flight that finished between the caller's cache check and this one may have filled the cache
+    cached = suggestion_cache.get(query, state_territory)
+    if cached is not None:
+        return cached
+    
+    limit = getattr(settings, 'GEOSCAPE_SUGGESTION_LIMIT', DEFAULT_SUGGESTION_LIMIT)
+    headers = {"Authorization": api_key}
     params = {
         "query": query,
-        "stateTerritory": state_territory
+        "stateTerritory": state_territory,
+        "maxNumberOfResults": limit
     }
     
     try:
         logger.info(f"Searching addresses: '{query}' in {state_territory}")
-        response = requests.get(
-            GEOSCAPE_ADDRESS_SEARCH_URL, 
+        response = get_client().get(
+            GEOSCAPE_ADDRESS_SEARCH_PATH, 
             headers=headers, 
             params=params, 
-            timeout=10
+            timeout=_timeout(ADDRESS_SEARCH_READ_TIMEOUT)
         )
         response.raise_for_status()
         
         data = response.json()
         suggestions = data.get('suggest', [])
         logger.info(f"Address search returned {len(suggestions)} results")
+        # Only successful responses are cached; errors fall through to the handlers below
+        suggestion_cache.put(query, state_territory, suggestions, complete=len(suggestions) < limit)
         return suggestions
     
+    except CircuitOpenError:
+        logger.warning(f"Geoscape unavailable; address search for '{query}' not sent")
+        return []
     except requests.exceptions.RequestException as e:
         logger.error(f"Network error in address search: {e}")
         return []
@@ -0,0 +1,195 @@
+# core/services/heatmap_service.py
+"""
+Server-side density grids for observation heatmaps.
+
+Observations are binned into a regular lat/lon grid with NumPy, each weighted
+by the number of pests and diseases found, so map pages receive one value per
+occupied cell instead of every observation point.
+"""
+import math
+import logging
+from datetime import date
+from typing import Dict, Any, Optional, Sequence
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, QuerySet
+
+from ..models import Farm, SurveySession, Observation
+from .view_cache import VersionKey, get_versions
+
+logger = logging.getLogger(__name__)
+
+# Metres per degree of latitude
+METRES_PER_DEGREE = 111_320.0
+
+# Default grid cell edge in metres
+DEFAULT_CELL_SIZE_M = 10.0
+
+# Upper bound on cells per axis, so a spread-out farm cannot produce a huge grid
+MAX_BINS_PER_AXIS = 256
+
+
+def bin_observations(
+    lats: Sequence[float],
+    lons: Sequence[float],
+    weights: Sequence[float],
+    cell_size_m: float = DEFAULT_CELL_SIZE_M
+) -> Dict[str, Any]:
+    """
+    Bins weighted points into a lat/lon grid.
+
+    Args:
+        lats: Latitudes in decimal degrees
+        lons: Longitudes in decimal degrees
+        weights: Weight of each point
+        cell_size_m: Approximate cell edge length in metres
+
+    Returns:
+        Dictionary with the grid bounds, shape, cell size in degrees, maximum
+        intensity and the non-empty cells as [lat, lon, intensity] centres
+    """
+    lat_arr = np.asarray(lats, dtype=np.float64)
+    lon_arr = np.asarray(lons, dtype=np.float64)
+    weight_arr = np.asarray(weights, dtype=np.float64)
+
+    if lat_arr.size == 0:
+        return {'bounds': None, 'rows': 0, 'cols': 0, 'cell_size': None, 'max': 0.0, 'cells': []}
+
+    south, north = float(lat_arr.min()), float(lat_arr.max())
+    west, east = float(lon_arr.min()), float(lon_arr.max())
+
+    # Convert the cell size to degrees at the grid's mid latitude
+    cell_lat = cell_size_m / METRES_PER_DEGREE
+    cos_lat = max(math.cos(math.radians((south + north) / 2)), 0.01)
+    cell_lon = cell_size_m / (METRES_PER_DEGREE * cos_lat)
+
+    rows = min(MAX_BINS_PER_AXIS, max(1, math.ceil((north - south) / cell_lat)))
+    cols = min(MAX_BINS_PER_AXIS, max(1, math.ceil((east - west) / cell_lon)))
+    # Widen degenerate (single point) extents to one cell
+    north = max(north, south + cell_lat)
+    east = max(east, west + cell_lon)
+
+    grid, lat_edges, lon_edges = np.histogram2d(
+        lat_arr, lon_arr,
+        bins=(rows, cols),
+        range=((south, north), (west, east)),
+        weights=weight_arr
+    )
+
+    row_idx, col_idx = np.nonzero(grid)
+    lat_centres = (lat_edges[:-1] + lat_edges[1:]) / 2
+    lon_centres = (lon_edges[:-1] + lon_edges[1:]) / 2
+    cells = np.column_stack((
+        lat_centres[row_idx].round(7),
+        lon_centres[col_idx].round(7),
+        grid[row_idx, col_idx]
+    ))
+
+    return {
+        'bounds': [south, west, north, east],
+        'rows': rows,
+        'cols': cols,
+        'cell_size': [float(lat_edges[1] - lat_edges[0]), float(lon_edges[1] - lon_edges[0])],
+        'max': float(grid.max()),
+        'cells': cells.tolist(),
+    }
+
+
+def _build_heatmap(
+    observations: QuerySet,
+    cache_key: str,
+    versions: Sequence[VersionKey],
+    cell_size_m: float
+) -> Dict[str, Any]:
+    """
+    Returns the heatmap for a queryset of observations, using the cache when possible.
+
+    The cache key includes the view-cache version of the session or farm, which
+    model signals bump whenever an observation is added, edited, re-flagged or
+    deleted, so any change produces a fresh grid.
+
+    Args:
+        observations: Observations to include
+        cache_key: Key prefix identifying the scope and filters
+        versions: (kind, pk) pairs whose versions the grid depends on
+        cell_size_m: Cell edge length in metres
+
+    Returns:
+        Heatmap dictionary (see bin_observations) plus 'observation_count'
+    """
+    key = f"{cache_key}:{cell_size_m}:{get_versions(versions)}"
+    heatmap = cache.get(key)
+    if heatmap is not None:
+        return heatmap
+
+    # Fixes known to fall outside the farm boundary would only add noise
+    observations = observations.filter(
+        latitude__isnull=False, longitude__isnull=False
+    ).exclude(outside_boundary=True)
+    rows = observations.annotate(
+        num_pests=Count('pests_observed', distinct=True),
+        num_diseases=Count('diseases_observed', distinct=True)
+    ).values_list('latitude', 'longitude', 'num_pests', 'num_diseases')
+
+    lats, lons, weights = [], [], []
+    observation_count = 0
+    for lat, lon, num_pests, num_diseases in rows:
+        observation_count += 1
+        findings = num_pests + num_diseases
+        if findings:
+            lats.append(float(lat))
+            lons.append(float(lon))
+            weights.append(findings)
+
+    heatmap = bin_observations(lats, lons, weights, cell_size_m)
+    heatmap['observation_count'] = observation_count
+
+    cache.set(key, heatmap, getattr(settings, 'HEATMAP_CACHE_TIMEOUT', 60 * 60))
+    return heatmap
+
+
+def get_session_heatmap(session: SurveySession, cell_size_m: float = DEFAULT_CELL_SIZE_M) -> Dict[str, Any]:
+    """
+    Returns the pest/disease density grid for a survey session.
+
+    Args:
+        session: The SurveySession instance
+        cell_size_m: Cell edge length in metres
+
+    Returns:
+        Heatmap dictionary
+    """
+    observations = Observation.objects.completed().filter(session=session)
+    return _build_heatmap(
+        observations, f'heatmap:session:{session.pk}', [('session', session.pk)], cell_size_m
+    )
+
+
+def get_farm_heatmap(
+    farm: Farm,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    cell_size_m: float = DEFAULT_CELL_SIZE_M
+) -> Dict[str, Any]:
+    """
+    Returns the pest/disease density grid across a farm's sessions.
+
+    Args:
+        farm: The Farm instance
+        start_date: Only include observations on or after this date
+        end_date: Only include observations on or before this date
+        cell_size_m: Cell edge length in metres
+
+    Returns:
+        Heatmap dictionary
+    """
+    observations = Observation.objects.completed().filter(session__farm=farm)
+    if start_date:
+        observations = observations.filter(observation_time__date__gte=start_date)
+    if end_date:
+        observations = observations.filter(observation_time__date__lte=end_date)
+    return _build_heatmap(
+        observations, f'heatmap:farm:{farm.pk}:{start_date}:{end_date}', [('farm', farm.pk)], cell_size_m
+    )
@@ -0,0 +1,403 @@
+# core/services/hotspot_service.py
+"""
+Hotspot detection for pest and disease findings.
+
+Observations are binned onto a grid in metres and each surveyed cell is scored
+with the Getis-Ord Gi* statistic on positive observations, which compares the
+share of positives in the cell's neighbourhood with the share across all
+observations. Cells nobody surveyed hold no observations, so they are left
+out rather than counted as clean. Neighbourhood sums come from a summed-area
+table, so scoring is a handful of array operations regardless of the number
+of points.
+
+Every surveyed cell is a separate test, so a cell is flagged only when its
+exact binomial p-value passes the Benjamini-Hochberg procedure at
+DEFAULT_FDR_ALPHA; a fixed z cut-off flags about one cell in forty on purely
+random findings. Adjacent significant cells are merged into clusters, each
+returned as a polygon with its scores.
+"""
+import math
+import logging
+from collections import deque
+from datetime import date
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, QuerySet
+
+from ..models import Farm, SurveySession, Observation
+from .view_cache import get_versions
+
+logger = logging.getLogger(__name__)
+
+METRES_PER_DEGREE = 111_320.0
+
+# Default grid cell edge and neighbourhood radius, in metres
+DEFAULT_CELL_SIZE_M = 20.0
+DEFAULT_NEIGHBOURHOOD_M = 40.0
+
+# Expected share of false hotspot cells among those flagged (Benjamini-Hochberg)
+DEFAULT_FDR_ALPHA = 0.05
+
+# Upper bound on cells per axis; the cell size grows to respect it
+MAX_CELLS_PER_AXIS = 1024
+
+
+def _to_metres(lats: np.ndarray, lons: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float, float, float]:
+    """
+    Projects coordinates onto a local plane in metres (equirectangular).
+
+    Returns:
+        Tuple of (x, y, origin_lat, origin_lon, metres_per_degree_lon)
+    """
+    origin_lat = float(lats.min())
+    origin_lon = float(lons.min())
+    metres_per_lon = METRES_PER_DEGREE * math.cos(math.radians(float(lats.mean())))
+    x = (lons - origin_lon) * metres_per_lon
+    y = (lats - origin_lat) * METRES_PER_DEGREE
+    return x, y, origin_lat, origin_lon, metres_per_lon
+
+
+def _window_sums(grid: np.ndarray, radius: int) -> np.ndarray:
+    """
+    Sums each cell's (2 * radius + 1) square neighbourhood, clipped at the edges.
+
+    Args:
+        grid: 2D array of cell values
+        radius: Neighbourhood radius in cells
+
+    Returns:
+        Array of neighbourhood sums with the same shape as `grid`
+    """
+    rows, cols = grid.shape
+    table = np.zeros((rows + 1, cols + 1), dtype=np.float64)
+    table[1:, 1:] = grid.cumsum(axis=0).cumsum(axis=1)
+
+    r0 = np.clip(np.arange(rows) - radius, 0, rows)
+    r1 = np.clip(np.arange(rows) + radius + 1, 0, rows)
+    c0 = np.clip(np.arange(cols) - radius, 0, cols)
+    c1 = np.clip(np.arange(cols) + radius + 1, 0, cols)
+    return (
+        table[np.ix_(r1, c1)] - table[np.ix_(r0, c1)]
+        - table[np.ix_(r1, c0)] + table[np.ix_(r0, c0)]
+    )
+
+
+def getis_ord_grid(
+    sums: np.ndarray,
+    radius: int,
+    counts: Optional[np.ndarray] = None,
+    square_sums: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Computes the Getis-Ord Gi* z-score of every cell with binary square weights.
+
+    Each cell may hold several observations; the statistic then treats every
+    observation in a cell's neighbourhood as a neighbour, so cells without
+    observations add nothing to either the neighbourhood or the averages.
+
+    Args:
+        sums: 2D array, the sum of the observation values in each cell
+        radius: Neighbourhood radius in cells
+        counts: Observations in each cell (default: one per cell)
+        square_sums: Sum of the squared observation values in each cell
+            (default: sums ** 2, right for one observation per cell)
+
+    Returns:
+        2D array of z-scores (zero where undefined or unobserved)
+    """
+    zeros = np.zeros(sums.shape, dtype=np.float64)
+    if counts is None:
+        counts = np.ones(sums.shape, dtype=np.float64)
+    if square_sums is None:
+        square_sums = sums ** 2
+    n = float(counts.sum())
+    if n < 2:
+        return zeros
+    mean = sums.sum() / n
+    std = math.sqrt(max(square_sums.sum() / n - mean ** 2, 0.0))
+    if std == 0:
+        return zeros
+
+    local_sum = _window_sums(sums, radius)
+    # With binary weights, sum(w) == sum(w^2) == number of observations in the window
+    weight_sum = _window_sums(counts, radius)
+    denominator = std * np.sqrt((n * weight_sum - weight_sum ** 2) / (n - 1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (local_sum - mean * weight_sum) / denominator
+    z = np.nan_to_num(z, nan=0.0, posinf=0.0, neginf=0.0)
+    z[counts == 0] = 0.0
+    return z
+
+
+def binomial_upper_tail(successes: np.ndarray, trials: np.ndarray, p: float) -> np.ndarray:
+    """
+    Returns P(X >= successes) for X ~ Binomial(trials, p), elementwise.
+
+    Exact, because the hotspot tests live far out in the tail, where the
+    normal approximation is several times too small for counts this skewed.
+    The pmf is built once per distinct number of trials.
+    """
+    successes = np.asarray(successes, dtype=np.int64)
+    trials = np.asarray(trials, dtype=np.int64)
+    tails = np.ones(successes.shape, dtype=np.float64)
+    if p <= 0.0:
+        tails[successes > 0] = 0.0
+        return tails
+    if p >= 1.0:
+        return tails
+
+    log_p, log_q = math.log(p), math.log1p(-p)
+    for n in np.unique(trials):
+        k = np.arange(n + 1)
+        log_choose = np.concatenate(([0.0], np.cumsum(np.log(n - k[:-1]) - np.log(k[1:]))))
+        pmf = np.exp(log_choose + k * log_p + (n - k) * log_q)
+        # Summed from the far end so the small tail terms are not lost
+        tail = np.minimum(np.cumsum(pmf[::-1])[::-1], 1.0)
+        selected = trials == n
+        tails[selected] = tail[np.clip(successes[selected], 0, n)]
+    return tails
+
+
+def fdr_significant(p_values: np.ndarray, alpha: float = DEFAULT_FDR_ALPHA) -> np.ndarray:
+    """
+    Applies the Benjamini-Hochberg procedure to a set of p-values.
+
+    Args:
+        p_values: 1D array, one p-value per test
+        alpha: False discovery rate to control
+
+    Returns:
+        Boolean array, True for the tests that are rejected
+    """
+    if p_values.size == 0:
+        return np.zeros(0, dtype=bool)
+    ranked = np.sort(p_values)
+    passed = np.nonzero(ranked <= alpha * np.arange(1, ranked.size + 1) / ranked.size)[0]
+    if not passed.size:
+        return np.zeros(p_values.shape, dtype=bool)
+    return p_values <= ranked[passed[-1]]
+
+
+def _connected_components(mask: np.ndarray) -> List[List[Tuple[int, int]]]:
+    """Groups True cells into 8-connected components."""
+    remaining = set(zip(*np.nonzero(mask)))
+    components = []
+    while remaining:
+        start = remaining.pop()
+        component = [start]
+        queue = deque([start])
+        while queue:
+            r, c = queue.popleft()
+            for dr in (-1, 0, 1):
+                for dc in (-1, 0, 1):
+                    neighbour = (r + dr, c + dc)
+                    if neighbour in remaining:
+                        remaining.remove(neighbour)
+                        component.append(neighbour)
+                        queue.append(neighbour)
+        components.append(component)
+    return components
+
+
+def _convex_hull(points: np.ndarray) -> np.ndarray:
+    """Returns the convex hull of 2D points in counter-clockwise order (monotone chain)."""
+    points = np.unique(points, axis=0)
+    if len(points) < 3:
+        return points
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower, upper = [], []
+    for p in points:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], p) <= 0:
+            lower.pop()
+        lower.append(p)
+    for p in points[::-1]:
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], p) <= 0:
+            upper.pop()
+        upper.append(p)
+    return np.array(lower[:-1] + upper[:-1])
+
+
+def detect_hotspots(
+    lats: Sequence[float],
+    lons: Sequence[float],
+    weights: Sequence[float],
+    cell_size_m: float = DEFAULT_CELL_SIZE_M,
+    neighbourhood_m: float = DEFAULT_NEIGHBOURHOOD_M,
+    fdr_alpha: float = DEFAULT_FDR_ALPHA
+) -> Dict[str, Any]:
+    """
+    Finds clusters of significantly high positive rates.
+
+    Args:
+        lats: Latitudes of all surveyed observations, positive or not
+        lons: Longitudes of all surveyed observations
+        weights: Number of findings at each observation (0 if none)
+        cell_size_m: Grid cell edge in metres
+        neighbourhood_m: Gi* neighbourhood radius in metres
+        fdr_alpha: False discovery rate for hotspot cells
+
+    Returns:
+        GeoJSON FeatureCollection of cluster polygons, with the grid
+        parameters used under 'properties'
+    """
+    lat_arr = np.asarray(lats, dtype=np.float64)
+    lon_arr = np.asarray(lons, dtype=np.float64)
+    weight_arr = np.asarray(weights, dtype=np.float64)
+
+    result = {'type': 'FeatureCollection', 'features': [], 'properties': {'point_count': int(lat_arr.size)}}
+    if lat_arr.size == 0:
+        return result
+
+    x, y, origin_lat, origin_lon, metres_per_lon = _to_metres(lat_arr, lon_arr)
+    cell = max(cell_size_m, float(max(x.max(), y.max())) / MAX_CELLS_PER_AXIS, 1e-6)
+    cols = int(x.max() // cell) + 1
+    rows = int(y.max() // cell) + 1
+    col_idx = np.minimum((x // cell).astype(np.int64), cols - 1)
+    row_idx = np.minimum((y // cell).astype(np.int64), rows - 1)
+
+    flat = row_idx * cols + col_idx
+    counts = np.bincount(flat, minlength=rows * cols).reshape(rows, cols)
+    positives = np.bincount(flat, weights=(weight_arr > 0), minlength=rows * cols).reshape(rows, cols)
+    findings = np.bincount(flat, weights=weight_arr, minlength=rows * cols).reshape(rows, cols)
+
+    radius = max(1, int(math.ceil(neighbourhood_m / cell)))
+    # Each observation scores 1 if positive, so squares sum to the positives
+    z = getis_ord_grid(positives, radius, counts, positives)
+
+    # Significance: positives among the neighbourhood's observations against
+    # the overall positive rate, tested in every surveyed cell
+    tested = counts > 0
+    p_values = binomial_upper_tail(
+        np.rint(_window_sums(positives, radius)[tested]),
+        np.rint(_window_sums(counts, radius)[tested]),
+        float(positives.sum()) / lat_arr.size
+    )
+    hot = np.zeros((rows, cols), dtype=bool)
+    hot[tested] = fdr_significant(p_values, fdr_alpha)
+    hot &= (positives > 0) & (z > 0)
+
+    result['properties'].update({
+        'cell_size_m': cell,
+        'neighbourhood_m': radius * cell,
+        'fdr_alpha': fdr_alpha,
+        'cells_tested': int(tested.sum()),
+    })
+
+    features = []
+    for component in _connected_components(hot):
+        r = np.array([rc[0] for rc in component])
+        c = np.array([rc[1] for rc in component])
+        # Cell corners in metres, then back to lon/lat
+        corners = np.concatenate([
+            np.column_stack(((c + dc) * cell, (r + dr) * cell))
+            for dc in (0, 1) for dr in (0, 1)
+        ])
+        hull = _convex_hull(corners)
+        ring = [
+            [round(float(origin_lon + px / metres_per_lon), 7), round(float(origin_lat + py / METRES_PER_DEGREE), 7)]
+            for px, py in hull
+        ]
+        ring.append(ring[0])
+        cell_z = z[r, c]
+        features.append({
+            'type': 'Feature',
+            'geometry': {'type': 'Polygon', 'coordinates': [ring]},
+            'properties': {
+                'score': round(float(cell_z.max()), 3),
+                'mean_z': round(float(cell_z.mean()), 3),
+                'cells': len(component),
+                'observations': int(counts[r, c].sum()),
+                'positives': int(positives[r, c].sum()),
+                'findings': int(findings[r, c].sum()),
+            }
+        })
+
+    features.sort(key=lambda f: f['properties']['score'], reverse=True)
+    result['features'] = features
+    return result
+
+
+def _surveyed_observations(observations: QuerySet):
+    """Returns (lats, lons, findings) for every located observation inside the farm."""
+    rows = observations.filter(
+        latitude__isnull=False, longitude__isnull=False
+    ).exclude(outside_boundary=True).annotate(
+        num_pests=Count('pests_observed', distinct=True),
+        num_diseases=Count('diseases_observed', distinct=True)
+    ).values_list('latitude', 'longitude', 'num_pests', 'num_diseases')
+
+    lats, lons, findings = [], [], []
+    for lat, lon, num_pests, num_diseases in rows:
+        lats.append(float(lat))
+        lons.append(float(lon))
+        findings.append(num_pests + num_diseases)
+    return lats, lons, findings
+
+
+def get_session_hotspots(session: SurveySession, cell_size_m: float = DEFAULT_CELL_SIZE_M) -> Dict[str, Any]:
+    """
+    Returns hotspot clusters for a survey session.
+
+    Results for completed sessions are cached under the session's version
+    token, so later edits (e.g. outside_boundary backfills) are picked up;
+    active sessions are computed on each call.
+
+    Args:
+        session: The SurveySession instance
+        cell_size_m: Grid cell edge in metres
+
+    Returns:
+        GeoJSON FeatureCollection of hotspot polygons
+    """
+    cache_key = None
+    if session.status == 'completed':
+        cache_key = f"hotspots:session:{session.pk}:{cell_size_m}:{get_versions([('session', session.pk)])}"
+        hotspots = cache.get(cache_key)
+        if hotspots is not None:
+            return hotspots
+
+    observations = Observation.objects.completed().filter(session=session)
+    hotspots = detect_hotspots(*_surveyed_observations(observations), cell_size_m=cell_size_m)
+
+    if cache_key:
+        cache.set(cache_key, hotspots, getattr(settings, 'HEATMAP_CACHE_TIMEOUT', 60 * 60))
+    return hotspots
+
+
+def get_farm_hotspots(
+    farm: Farm,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    cell_size_m: float = DEFAULT_CELL_SIZE_M
+) -> Dict[str, Any]:
+    """
+    Returns hotspot clusters across a farm's survey history.
+
+    Args:
+        farm: The Farm instance
+        start_date: Only include observations on or after this date
+        end_date: Only include observations on or before this date
+        cell_size_m: Grid cell edge in metres
+
+    Returns:
+        GeoJSON FeatureCollection of hotspot polygons
+    """
+    observations = Observation.objects.completed().filter(session__farm=farm)
+    if start_date:
+        observations = observations.filter(observation_time__date__gte=start_date)
+    if end_date:
+        observations = observations.filter(observation_time__date__lte=end_date)
+
+    version = get_versions([('farm', farm.pk)])
+    cache_key = f"hotspots:farm:{farm.pk}:{start_date}:{end_date}:{cell_size_m}:{version}"
+    hotspots = cache.get(cache_key)
+    if hotspots is None:
+        hotspots = detect_hotspots(*_surveyed_observations(observations), cell_size_m=cell_size_m)
+        cache.set(cache_key, hotspots, getattr(settings, 'HEATMAP_CACHE_TIMEOUT', 60 * 60))
+    return hotspots
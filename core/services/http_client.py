@@ -0,0 +1,216 @@
+# core/services/http_client.py
+"""
+Shared HTTP client for outbound API calls.
+
+Each named client wraps one requests.Session shared by all threads. Its urllib3
+connection pool keeps connections alive between requests, so repeated calls
+(such as address search on every keystroke) reuse an open TLS connection.
+Idempotent requests that fail with a connection error, a timeout, 429 or a
+5xx response are retried a bounded number of times with jittered
+exponential backoff. A client can be given a circuit breaker, which refuses
+calls while the API is failing or slow, and a metrics recorder, which sees
+the outcome and latency of every call and counts every attempt that reached
+the API against its quota.
+"""
+import time
+import random
+import logging
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict, Any, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+
+from .circuit_breaker import CircuitBreaker, CircuitOpenError, STATE_OPEN
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class PooledHttpClient:
+    """
+    A thread-safe HTTP client with keep-alive pooling and retries.
+
+    Args:
+        base_url: Scheme and host prefixed to request paths
+        pool_size: Maximum connections kept open to the host
+        connect_timeout: Seconds allowed to establish a connection
+        read_timeout: Seconds allowed between bytes of the response
+        max_retries: Retries after the first attempt (0 disables retrying)
+        backoff_base: Backoff before the first retry, doubled on each retry
+        backoff_max: Upper bound on a single backoff, including Retry-After
+        headers: Headers sent with every request
+        breaker: CircuitBreaker guarding the API, if any
+        metrics: ApiMetrics recording each call, if any
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        pool_size: int = 10,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.25,
+        backoff_max: float = 4.0,
+        headers: Optional[Dict[str, str]] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        metrics=None
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker
+        self.metrics = metrics
+
+        self.session = requests.Session()
+        # Nothing here needs cookies; refusing them keeps the shared jar unchanged across threads
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        if headers:
+            self.session.headers.update(headers)
+        # Retries are handled in request() so backoff and logging stay in one place
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=False, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """
+        Returns the delay before retry number `attempt` (1-based).
+
+        Uses "full jitter": a random delay up to the exponential bound, so
+        clients retrying at once spread out instead of retrying in lockstep.
+        A Retry-After header in seconds is honoured, capped at backoff_max.
+        """
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        bound = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return random.uniform(0, bound)
+
+    def request(self, method: str, path: str, **kwargs: Any) -> requests.Response:
+        """
+        Sends a request, retrying transient failures.
+
+        Only GET, HEAD and OPTIONS are retried; other methods are sent once.
+        A call that still ends in a network error or a retryable status counts
+        as a failure for the circuit breaker.
+
+        Args:
+            method: HTTP method
+            path: Path appended to the base URL (or an absolute URL)
+            **kwargs: Passed to requests.Session.request (params, headers, ...)
+
+        Returns:
+            The final response; the caller decides how to treat error statuses
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+            requests.exceptions.RequestException: If every attempt failed to get a response
+        """
+        endpoint = urlsplit(path).path or '/'
+        if self.breaker is not None and not self.breaker.allow_request():
+            if self.metrics is not None:
+                self.metrics.record_short_circuit(endpoint)
+            raise CircuitOpenError(f"Circuit '{self.breaker.name}' is open; {method} {endpoint} not sent")
+
+        started = time.monotonic()
+        response = None
+        try:
+            response = self._send(method, path, endpoint, **kwargs)
+        finally:
+            self._record(endpoint, time.monotonic() - started, response)
+        return response
+
+    def _record(self, endpoint: str, latency: float, response: Optional[requests.Response]):
+        """Reports a finished call to the breaker and metrics (response is None on an exception)."""
+        failed = response is None or response.status_code in RETRY_STATUS_CODES
+        if self.breaker is not None:
+            if failed:
+                self.breaker.record_failure(latency)
+            else:
+                self.breaker.record_success(latency)
+        if self.metrics is not None:
+            status = response.status_code if response is not None else None
+            self.metrics.record_call(endpoint, latency, status, error=failed)
+
+    def _record_attempt(self, endpoint: str):
+        """Called after each attempt that got a response; retries use quota too."""
+        if self.metrics is not None:
+            self.metrics.record_attempt(endpoint)
+
+    def _should_retry(self, attempt: int, retries: int) -> bool:
+        # Stop retrying once another call has opened the breaker
+        return attempt < retries and (self.breaker is None or self.breaker.state != STATE_OPEN)
+
+    def _send(self, method: str, path: str, endpoint: str, **kwargs: Any) -> requests.Response:
+        url = path if path.startswith(('http://', 'https://')) else f"{self.base_url}{path}"
+        kwargs.setdefault('timeout', self.timeout)
+        retries = self.max_retries if method.upper() in ('GET', 'HEAD', 'OPTIONS') else 0
+
+        attempt = 0
+        while True:
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if not self._should_retry(attempt, retries):
+                    raise
+                attempt += 1
+                delay = self._backoff(attempt)
+                logger.warning(f"{method} {path} failed ({e.__class__.__name__}); retry {attempt}/{retries} in {delay:.2f}s")
+                time.sleep(delay)
+                continue
+
+            self._record_attempt(endpoint)
+            if response.status_code in RETRY_STATUS_CODES and self._should_retry(attempt, retries):
+                attempt += 1
+                delay = self._backoff(attempt, response)
+                logger.warning(f"{method} {path} returned {response.status_code}; retry {attempt}/{retries} in {delay:.2f}s")
+                time.sleep(delay)
+                continue
+            return response
+
+    def get(self, path: str, **kwargs: Any) -> requests.Response:
+        return self.request('GET', path, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+_clients: Dict[str, PooledHttpClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_shared_client(name: str, factory) -> PooledHttpClient:
+    """
+    Returns the process-wide client registered under `name`, creating it once.
+
+    Args:
+        name: Registry key (e.g. 'geoscape')
+        factory: Zero-argument callable building the client on first use
+
+    Returns:
+        The shared PooledHttpClient
+    """
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                client = factory()
+                _clients[name] = client
+    return client
+
+
+def reset_shared_clients():
+    """Closes and forgets all shared clients (e.g. after settings change in tests)."""
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
@@ -0,0 +1,276 @@
+# core/services/image_storage_service.py
+import os
+import io
+import hashlib
+import logging
+from typing import Optional, Tuple, BinaryIO
+
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from ..models import Observation, ObservationImage, ImageBlob, image_blob_path
+
+logger = logging.getLogger(__name__)
+
+# Size of the blocks read while hashing
+HASH_BLOCK_SIZE = 64 * 1024
+
+# Longest edge of generated thumbnails, in pixels
+THUMBNAIL_SIZE = (320, 320)
+
+
+def compute_sha256(file_obj: BinaryIO) -> str:
+    """
+    Computes the SHA-256 digest of a file without loading it into memory.
+
+    Args:
+        file_obj: A readable, seekable file-like object
+
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.sha256()
+    file_obj.seek(0)
+    for block in iter(lambda: file_obj.read(HASH_BLOCK_SIZE), b''):
+        digest.update(block)
+    file_obj.seek(0)
+    return digest.hexdigest()
+
+
+def generate_thumbnail(blob: ImageBlob) -> bool:
+    """
+    Generates and saves a JPEG thumbnail for a blob.
+
+    Args:
+        blob: The ImageBlob to generate a thumbnail for
+
+    Returns:
+        True if a thumbnail was saved, False otherwise
+    """
+    from PIL import Image
+
+    try:
+        with blob.file.open('rb') as source:
+            image = Image.open(source)
+            image.thumbnail(THUMBNAIL_SIZE)
+            if image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+            buffer = io.BytesIO()
+            image.save(buffer, format='JPEG', quality=80)
+        blob.thumbnail.save(f'{blob.sha256}.jpg', ContentFile(buffer.getvalue()), save=False)
+        blob.save(update_fields=['thumbnail'])
+        return True
+    except Exception as e:
+        logger.warning(f"Could not generate thumbnail for blob {blob.sha256}: {e}")
+        return False
+
+
+def _acquire_blob(sha256: str, size: int, store, make_thumbnail: bool = True) -> Tuple[ImageBlob, bool]:
+    """
+    Looks up a blob by digest, storing it with `store` if it does not exist yet.
+
+    The reference count is incremented in either case.
+
+    Args:
+        sha256: Hex digest of the content
+        size: Content size in bytes
+        store: Callable taking the new (unsaved) ImageBlob and saving its file
+        make_thumbnail: Generate the thumbnail of a new blob now (False when
+            its file is only put in place later)
+
+    Returns:
+        Tuple containing (blob, created)
+    """
+    updated = ImageBlob.objects.filter(sha256=sha256).update(ref_count=F('ref_count') + 1)
+    if updated:
+        return ImageBlob.objects.get(sha256=sha256), False
+
+    blob = ImageBlob(sha256=sha256, size=size, ref_count=1)
+    try:
+        with transaction.atomic():
+            store(blob)
+            blob.save()
+    except IntegrityError:
+        # Another request stored the same content first; share its blob
+        ImageBlob.objects.filter(sha256=sha256).update(ref_count=F('ref_count') + 1)
+        existing = ImageBlob.objects.get(sha256=sha256)
+        if blob.file.name and blob.file.name != existing.file.name:
+            default_storage.delete(blob.file.name)
+        return existing, False
+
+    if make_thumbnail:
+        generate_thumbnail(blob)
+    return blob, True
+
+
+def store_uploaded_image(
+    observation: Observation,
+    uploaded_file: File,
+    caption: Optional[str] = None
+) -> ObservationImage:
+    """
+    Stores an uploaded image by content hash and attaches it to an observation.
+
+    If identical bytes were stored before, the existing blob is reused and no
+    new file or thumbnail is written.
+
+    Args:
+        observation: The Observation the image belongs to
+        uploaded_file: The uploaded file object
+        caption: Optional caption for the image
+
+    Returns:
+        The created ObservationImage
+    """
+    sha256 = compute_sha256(uploaded_file)
+    filename = getattr(uploaded_file, 'name', '') or 'image'
+
+    def store(blob):
+        blob.file.save(os.path.basename(filename), uploaded_file, save=False)
+
+    blob, created = _acquire_blob(sha256, uploaded_file.size, store)
+    if not created:
+        logger.info(f"Reusing stored image {sha256[:12]} for observation {observation.id}")
+
+    return ObservationImage.objects.create(
+        observation=observation,
+        image=blob.file.name,
+        blob=blob,
+        caption=caption
+    )
+
+
+def store_file_at_path(
+    observation: Observation,
+    storage_path: str,
+    caption: Optional[str] = None
+) -> ObservationImage:
+    """
+    Moves a file already in storage into the content-addressed store.
+
+    Used for chunked uploads, whose bytes are assembled at a staging path. The
+    staging file is renamed into place, or deleted if the content is already
+    stored, once the surrounding transaction commits.
+
+    Args:
+        observation: The Observation the image belongs to
+        storage_path: Path of the staged file, relative to MEDIA_ROOT
+        caption: Optional caption for the image
+
+    Returns:
+        The created ObservationImage
+    """
+    blob = _adopt_staged_file(storage_path)
+    return ObservationImage.objects.create(
+        observation=observation,
+        image=blob.file.name,
+        blob=blob,
+        caption=caption
+    )
+
+
+def _adopt_staged_file(storage_path: str) -> ImageBlob:
+    """
+    Takes a reference to the blob for a file already in storage.
+
+    The file is only renamed into the store (or deleted, if its content is
+    already stored) after the surrounding transaction commits, like the file
+    deletion in release_blob. A rollback therefore leaves it at its staging
+    path, where the caller can commit it again.
+
+    Args:
+        storage_path: Path of the staged file, relative to MEDIA_ROOT
+
+    Returns:
+        The ImageBlob for the file's content
+    """
+    staged_path = default_storage.path(storage_path)
+    with open(staged_path, 'rb') as staged:
+        sha256 = compute_sha256(staged)
+
+    def store(blob):
+        blob.file.name = image_blob_path(blob, storage_path)
+
+    blob, created = _acquire_blob(sha256, os.path.getsize(staged_path), store, make_thumbnail=False)
+    if created:
+        transaction.on_commit(lambda: _publish_staged_file(blob, staged_path))
+    else:
+        transaction.on_commit(lambda: _delete_files([storage_path]))
+    return blob
+
+
+def _publish_staged_file(blob: ImageBlob, staged_path: str) -> None:
+    """
+    Renames a staged file to its blob's path and generates the thumbnail.
+
+    Args:
+        blob: The newly created ImageBlob
+        staged_path: Absolute path of the staged file
+    """
+    try:
+        final_path = default_storage.path(blob.file.name)
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        os.replace(staged_path, final_path)
+    except OSError as e:
+        logger.error(f"Could not move {staged_path} into blob {blob.sha256}: {e}")
+        return
+    generate_thumbnail(blob)
+
+
+def release_blob(blob_id: int) -> None:
+    """
+    Drops one reference to a blob, deleting it and its files at zero.
+
+    Args:
+        blob_id: Primary key of the ImageBlob
+    """
+    with transaction.atomic():
+        ImageBlob.objects.filter(pk=blob_id, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+        blob = ImageBlob.objects.filter(pk=blob_id, ref_count=0).first()
+        if not blob:
+            return
+        file_names = [name for name in (blob.file.name, blob.thumbnail.name) if name]
+        blob.delete()
+        # Only remove files once the row deletion is durable
+        transaction.on_commit(lambda: _delete_files(file_names))
+
+    logger.info(f"Deleted unreferenced image blob {blob_id}")
+
+
+def _delete_files(file_names) -> None:
+    """
+    Removes files from storage, logging rather than raising on failure.
+
+    Args:
+        file_names: Iterable of storage paths
+    """
+    for name in file_names:
+        try:
+            default_storage.delete(name)
+        except Exception as e:
+            logger.warning(f"Could not delete blob file {name}: {e}")
+
+
+def adopt_legacy_image(image: ObservationImage) -> bool:
+    """
+    Moves an ObservationImage stored before deduplication into the blob store.
+
+    Args:
+        image: An ObservationImage without a blob
+
+    Returns:
+        True if the image now references a blob, False if its file is missing
+    """
+    if image.blob_id:
+        return True
+    if not image.image.name or not default_storage.exists(image.image.name):
+        logger.warning(f"Skipping image {image.id}: file {image.image.name!r} not found")
+        return False
+
+    blob = _adopt_staged_file(image.image.name)
+    image.image = blob.file.name
+    image.blob = blob
+    image.save(update_fields=['image', 'blob'])
+    return True
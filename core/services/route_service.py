@@ -0,0 +1,382 @@
+# core/services/route_service.py
+"""
+Walking routes through a session's sampling plan.
+
+Target points are projected onto a local metre grid and ordered as an open
+path: a nearest-neighbour tour is built with grid-bucket lookups, then
+improved with 2-opt and Or-opt moves restricted to each point's nearest
+neighbours. Improvement stops at a time budget, so large plans still return
+promptly with the best route found so far.
+"""
+import math
+import time
+import logging
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from ..models import SurveySession, Observation
+
+logger = logging.getLogger(__name__)
+
+METRES_PER_DEGREE = 111_320.0
+
+# Candidate neighbours considered for each point during improvement
+NEIGHBOUR_COUNT = 8
+
+# Longest segment moved by Or-opt
+OR_OPT_MAX_SEGMENT = 3
+
+# Default improvement budget in seconds
+DEFAULT_TIME_LIMIT = 0.15
+
+# A target counts as visited once an observation is recorded this close to it
+DEFAULT_VISIT_RADIUS_M = 5.0
+
+# Improvements smaller than this (metres) are ignored to avoid cycling on rounding
+EPSILON = 1e-7
+
+
+class _Grid:
+    """Buckets point indices by square cell for nearest-point searches."""
+
+    def __init__(self, xs: List[float], ys: List[float]):
+        n = len(xs)
+        width = (max(xs) - min(xs)) or 1.0
+        height = (max(ys) - min(ys)) or 1.0
+        # About two points per cell
+        self.size = max(math.sqrt(width * height / max(n / 2, 1)), 1e-6)
+        self.min_x = min(xs)
+        self.min_y = min(ys)
+        self.cells: Dict[Tuple[int, int], set] = {}
+        self.xs = xs
+        self.ys = ys
+        for i in range(n):
+            self.cells.setdefault(self.cell_of(i), set()).add(i)
+        max_cell = max(self.cell_of(i) for i in range(n))
+        self.max_ring = max(max_cell) + 1
+
+    def cell_of(self, i: int) -> Tuple[int, int]:
+        return int((self.xs[i] - self.min_x) // self.size), int((self.ys[i] - self.min_y) // self.size)
+
+    def remove(self, i: int):
+        cell = self.cells.get(self.cell_of(i))
+        if cell is not None:
+            cell.discard(i)
+
+    def _ring(self, cx: int, cy: int, r: int):
+        if r == 0:
+            yield cx, cy
+            return
+        for dx in range(-r, r + 1):
+            yield cx + dx, cy - r
+            yield cx + dx, cy + r
+        for dy in range(-r + 1, r):
+            yield cx - r, cy + dy
+            yield cx + r, cy + dy
+
+    def nearest(self, x: float, y: float, k: int = 1, exclude: int = -1) -> List[int]:
+        """Returns up to k indices nearest to (x, y), closest first."""
+        cx = int((x - self.min_x) // self.size)
+        cy = int((y - self.min_y) // self.size)
+        found: List[Tuple[float, int]] = []
+        r = 0
+        while r <= self.max_ring + abs(cx) + abs(cy):
+            for cell in self._ring(cx, cy, r):
+                for i in self.cells.get(cell, ()):
+                    if i != exclude:
+                        found.append((math.hypot(self.xs[i] - x, self.ys[i] - y), i))
+            # Anything in later rings is at least r * size away
+            if len(found) >= k:
+                found.sort()
+                if found[k - 1][0] <= r * self.size:
+                    break
+            r += 1
+        found.sort()
+        return [i for _, i in found[:k]]
+
+
+def _project(points: Sequence[Sequence[float]]) -> Tuple[List[float], List[float]]:
+    """Projects [lat, lon] points onto a local plane in metres."""
+    arr = np.asarray(points, dtype=np.float64)
+    metres_per_lon = METRES_PER_DEGREE * math.cos(math.radians(float(arr[:, 0].mean())))
+    xs = (arr[:, 1] - arr[:, 1].min()) * metres_per_lon
+    ys = (arr[:, 0] - arr[:, 0].min()) * METRES_PER_DEGREE
+    return xs.tolist(), ys.tolist()
+
+
+def _path_length(tour: List[int], xs: List[float], ys: List[float]) -> float:
+    return sum(
+        math.hypot(xs[a] - xs[b], ys[a] - ys[b])
+        for a, b in zip(tour, tour[1:])
+    )
+
+
+class _RouteImprover:
+    """
+    2-opt and Or-opt local search on an open path, using neighbour lists.
+
+    With `fixed_start`, no move touches the first position, so the route keeps
+    beginning at the surveyor's nearest target.
+    """
+
+    def __init__(
+        self,
+        tour: List[int],
+        xs: List[float],
+        ys: List[float],
+        neighbours: List[List[int]],
+        fixed_start: bool = False
+    ):
+        self.tour = tour
+        self.first = 1 if fixed_start else 0
+        self.xs = xs
+        self.ys = ys
+        self.neighbours = neighbours
+        self.n = len(tour)
+        self.pos = [0] * self.n
+        self._reindex(0, self.n - 1)
+
+    def _reindex(self, lo: int, hi: int):
+        tour, pos = self.tour, self.pos
+        for p in range(lo, hi + 1):
+            pos[tour[p]] = p
+
+    def d(self, a: int, b: int) -> float:
+        return math.hypot(self.xs[a] - self.xs[b], self.ys[a] - self.ys[b])
+
+    def _edge(self, p: int) -> float:
+        """Length of the edge from position p to p + 1 (zero past either end)."""
+        if p < 0 or p >= self.n - 1:
+            return 0.0
+        return self.d(self.tour[p], self.tour[p + 1])
+
+    def _reversal_gain(self, p: int, q: int) -> float:
+        """Gain from reversing tour[p..q]."""
+        tour = self.tour
+        before = self._edge(p - 1) + self._edge(q)
+        after = 0.0
+        if p > 0:
+            after += self.d(tour[p - 1], tour[q])
+        if q < self.n - 1:
+            after += self.d(tour[p], tour[q + 1])
+        return before - after
+
+    def two_opt_pass(self, deadline: float) -> bool:
+        improved = False
+        for a in range(self.n):
+            if time.perf_counter() > deadline:
+                break
+            for b in self.neighbours[a]:
+                i, j = self.pos[a], self.pos[b]
+                lo, hi = min(i, j), max(i, j)
+                # Make a and b adjacent by reversing just after the first or up to before the second
+                for p, q in ((lo + 1, hi), (lo, hi - 1)):
+                    if q - p < 1 or p < self.first:
+                        continue
+                    if self._reversal_gain(p, q) > EPSILON:
+                        self.tour[p:q + 1] = self.tour[p:q + 1][::-1]
+                        self._reindex(p, q)
+                        improved = True
+                        break
+        return improved
+
+    def or_opt_pass(self, deadline: float) -> bool:
+        improved = False
+        for length in range(1, OR_OPT_MAX_SEGMENT + 1):
+            p = self.first
+            while p + length <= self.n:
+                if time.perf_counter() > deadline:
+                    return improved
+                if self._try_move_segment(p, length):
+                    improved = True
+                p += 1
+        return improved
+
+    def _try_move_segment(self, p: int, length: int) -> bool:
+        tour = self.tour
+        q = p + length - 1
+        first, last = tour[p], tour[q]
+        prev = tour[p - 1] if p > 0 else None
+        nxt = tour[q + 1] if q < self.n - 1 else None
+
+        removal_gain = self._edge(p - 1) + self._edge(q)
+        if prev is not None and nxt is not None:
+            removal_gain -= self.d(prev, nxt)
+        if removal_gain <= EPSILON:
+            return False
+
+        best = None
+        for anchor in set(self.neighbours[first]) | set(self.neighbours[last]):
+            k = self.pos[anchor]
+            if p <= k <= q:
+                continue
+            # Insert between positions (k, k + 1) or (k - 1, k)
+            for left in (k, k - 1):
+                right = left + 1
+                if p - 1 <= left <= q or left < self.first - 1:
+                    continue
+                a = tour[left] if left >= 0 else None
+                b = tour[right] if right < self.n else None
+                if a is None and b is None:
+                    continue
+                removed = self.d(a, b) if a is not None and b is not None else 0.0
+                for head, tail, reverse in ((first, last, False), (last, first, True)):
+                    added = (self.d(a, head) if a is not None else 0.0) + (self.d(tail, b) if b is not None else 0.0)
+                    gain = removal_gain - (added - removed)
+                    if gain > EPSILON and (best is None or gain > best[0]):
+                        best = (gain, left, reverse)
+
+        if best is None:
+            return False
+        _, left, reverse = best
+        segment = tour[p:q + 1]
+        if reverse:
+            segment.reverse()
+        anchor_city = tour[left] if left >= 0 else None
+        del tour[p:q + 1]
+        insert_at = tour.index(anchor_city) + 1 if anchor_city is not None else 0
+        tour[insert_at:insert_at] = segment
+        self._reindex(min(p, insert_at), max(q, insert_at + length - 1))
+        return True
+
+
+def _nearest_neighbour_tour(grid: _Grid, start: int) -> List[int]:
+    tour = [start]
+    grid.remove(start)
+    current = start
+    for _ in range(len(grid.xs) - 1):
+        nearest = grid.nearest(grid.xs[current], grid.ys[current], 1)
+        current = nearest[0]
+        grid.remove(current)
+        tour.append(current)
+    return tour
+
+
+def order_route(
+    points: Sequence[Sequence[float]],
+    start: Optional[Sequence[float]] = None,
+    time_limit: Optional[float] = None
+) -> List[int]:
+    """
+    Orders points into a short walking route.
+
+    Args:
+        points: [lat, lon] target points
+        start: Optional [lat, lon] of the surveyor; the route begins at the nearest target
+        time_limit: Seconds allowed for improvement (defaults to ROUTE_TIME_LIMIT)
+
+    Returns:
+        List of point indices in visiting order
+    """
+    n = len(points)
+    if n < 3:
+        return list(range(n))
+    if time_limit is None:
+        time_limit = getattr(settings, 'ROUTE_TIME_LIMIT', DEFAULT_TIME_LIMIT)
+    deadline = time.perf_counter() + time_limit
+
+    if start is not None:
+        xs, ys = _project(list(points) + [list(start)])
+        start_x, start_y = xs.pop(), ys.pop()
+    else:
+        xs, ys = _project(points)
+
+    lookup = _Grid(xs, ys)
+    k = min(NEIGHBOUR_COUNT, n - 1)
+    neighbours = [lookup.nearest(xs[i], ys[i], k, exclude=i) for i in range(n)]
+    first = lookup.nearest(start_x, start_y, 1)[0] if start is not None else 0
+
+    tour = _nearest_neighbour_tour(_Grid(xs, ys), first)
+    initial = _path_length(tour, xs, ys)
+
+    improver = _RouteImprover(tour, xs, ys, neighbours, fixed_start=start is not None)
+    rounds = 0
+    while time.perf_counter() < deadline:
+        rounds += 1
+        improved = improver.two_opt_pass(deadline)
+        improved = improver.or_opt_pass(deadline) or improved
+        if not improved:
+            break
+
+    tour = improver.tour
+    logger.debug(
+        f"Route of {n} points: {initial:.0f} m -> {_path_length(tour, xs, ys):.0f} m "
+        f"after {rounds} rounds"
+    )
+    return tour
+
+
+def get_session_route(session: SurveySession) -> List[int]:
+    """
+    Returns the visiting order of a session's sampling plan, computing and storing it once.
+
+    Args:
+        session: The SurveySession instance
+
+    Returns:
+        List of plan point indices in visiting order (empty without a plan)
+    """
+    plan = session.sampling_plan
+    if not plan or not plan.get('points'):
+        return []
+    route = plan.get('route')
+    if route is None or len(route) != len(plan['points']):
+        route = order_route(plan['points'])
+        plan['route'] = route
+        session.sampling_plan = plan
+        session.save(update_fields=['sampling_plan'])
+    return route
+
+
+def get_next_target(session: SurveySession) -> Optional[Dict[str, Any]]:
+    """
+    Suggests the next target plant to walk to.
+
+    Targets within the visit radius of a completed observation in this
+    session count as done; the suggestion is the first remaining target along
+    the stored route.
+
+    Args:
+        session: The SurveySession instance
+
+    Returns:
+        Dictionary with the target's lat/lon, its step number along the route
+        and how many targets remain, or None when there is no plan or every
+        target has been visited
+    """
+    route = get_session_route(session)
+    if not route:
+        return None
+    points = np.asarray(session.sampling_plan['points'], dtype=np.float64)
+
+    observed = np.asarray(
+        Observation.objects.completed().filter(
+            session=session, latitude__isnull=False, longitude__isnull=False
+        ).values_list('latitude', 'longitude'),
+        dtype=np.float64
+    ).reshape(-1, 2)
+
+    visited = np.zeros(len(points), dtype=bool)
+    if observed.size:
+        radius = getattr(settings, 'ROUTE_VISIT_RADIUS_M', DEFAULT_VISIT_RADIUS_M)
+        metres_per_lon = METRES_PER_DEGREE * math.cos(math.radians(float(points[:, 0].mean())))
+        for lat, lon in observed:
+            dy = (points[:, 0] - lat) * METRES_PER_DEGREE
+            dx = (points[:, 1] - lon) * metres_per_lon
+            visited |= dx * dx + dy * dy <= radius * radius
+
+    remaining = int(len(points) - visited.sum())
+    for step, index in enumerate(route, start=1):
+        if not visited[index]:
+            lat, lon = session.sampling_plan['points'][index]
+            return {
+                'index': index,
+                'step': step,
+                'latitude': lat,
+                'longitude': lon,
+                'remaining': remaining,
+                'total': len(route),
+            }
+    return None
@@ -0,0 +1,177 @@
+# core/services/sampling_service.py
+"""
+Spatially balanced sampling plans for survey sessions.
+
+Target points are drawn from a 2D Halton sequence over the boundary's
+bounding box and kept if they fall inside the prepared farm polygon. Halton
+points fill space evenly at every prefix length, so the accepted points stay
+well spread however irregular the boundary is. Each plan starts at a random
+offset into the sequence, so consecutive sessions visit different plants.
+"""
+import math
+import random
+import logging
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from ..models import SurveySession
+from .geofence_service import PreparedBoundary, get_prepared_boundary
+
+logger = logging.getLogger(__name__)
+
+METRES_PER_DEGREE = 111_320.0
+
+# Largest plan that will be generated; the calculator rarely asks for more
+DEFAULT_MAX_PLAN_POINTS = 5000
+
+# Rejection rounds before giving up on a (very thin or tiny) boundary
+MAX_ROUNDS = 20
+
+# Decimal places kept for plan coordinates (~1 cm)
+PLAN_COORD_PRECISION = 7
+
+
+def halton(indices: np.ndarray, base: int) -> np.ndarray:
+    """
+    Returns the radical inverse of each index in the given base.
+
+    Args:
+        indices: Array of non-negative integer sequence indices
+        base: Prime base of the sequence dimension
+
+    Returns:
+        Array of values in [0, 1)
+    """
+    n = np.asarray(indices, dtype=np.int64).copy()
+    result = np.zeros(n.shape, dtype=np.float64)
+    fraction = 1.0 / base
+    while n.any():
+        result += (n % base) * fraction
+        n //= base
+        fraction /= base
+    return result
+
+
+def generate_sampling_points(
+    boundary: PreparedBoundary,
+    count: int,
+    start_index: int = 1
+) -> List[List[float]]:
+    """
+    Generates well-spread points inside a boundary.
+
+    Halton points (bases 2 and 3) are scaled to the boundary's bounding box
+    and tested in batches with the vectorized point-in-polygon check until
+    `count` points are accepted.
+
+    Args:
+        boundary: The prepared farm boundary
+        count: Number of points wanted
+        start_index: First index into the Halton sequence
+
+    Returns:
+        List of [lat, lon] points in sequence order (may be shorter than
+        `count` if the boundary covers almost none of its bounding box)
+    """
+    if count <= 0 or boundary.is_empty():
+        return []
+
+    south, west, north, east = boundary.bbox
+    accepted_lats = []
+    accepted_lons = []
+    accepted = 0
+    next_index = start_index
+    # Start by assuming half the bounding box is inside, then adapt to the observed rate
+    acceptance = 0.5
+
+    for _ in range(MAX_ROUNDS):
+        batch = int(math.ceil((count - accepted) / max(acceptance, 0.01) * 1.1)) + 16
+        indices = np.arange(next_index, next_index + batch)
+        next_index += batch
+
+        lats = south + halton(indices, 3) * (north - south)
+        lons = west + halton(indices, 2) * (east - west)
+        inside = boundary.contains_many(lats, lons)
+
+        accepted_lats.append(lats[inside])
+        accepted_lons.append(lons[inside])
+        accepted += int(inside.sum())
+        acceptance = max(inside.mean(), 0.001)
+        if accepted >= count:
+            break
+    else:
+        logger.warning(f"Sampling plan stopped at {accepted} of {count} points")
+
+    lats = np.concatenate(accepted_lats)[:count].round(PLAN_COORD_PRECISION)
+    lons = np.concatenate(accepted_lons)[:count].round(PLAN_COORD_PRECISION)
+    return np.column_stack((lats, lons)).tolist()
+
+
+def _mean_spacing_m(points: List[List[float]]) -> Optional[float]:
+    """Approximate spacing (metres) of an even grid with the plan's point count over its extent."""
+    if len(points) < 2:
+        return None
+    arr = np.asarray(points)
+    height = (arr[:, 0].max() - arr[:, 0].min()) * METRES_PER_DEGREE
+    width = (arr[:, 1].max() - arr[:, 1].min()) * METRES_PER_DEGREE * math.cos(math.radians(arr[:, 0].mean()))
+    return round(math.sqrt(max(height * width, 0.0) / len(points)), 1)
+
+
+def build_sampling_plan(farm, count: Optional[int]) -> Optional[Dict[str, Any]]:
+    """
+    Builds a sampling plan for a farm.
+
+    Args:
+        farm: The Farm instance
+        count: Number of plants to survey (from the current calculation)
+
+    Returns:
+        Plan dictionary with the generated points, or None if the farm has no
+        usable boundary or there is no target count
+    """
+    if not count:
+        return None
+    boundary = get_prepared_boundary(farm)
+    if boundary is None:
+        return None
+
+    max_points = getattr(settings, 'SAMPLING_PLAN_MAX_POINTS', DEFAULT_MAX_PLAN_POINTS)
+    requested = min(int(count), max_points)
+    start_index = random.randint(1, 1_000_000)
+    points = generate_sampling_points(boundary, requested, start_index)
+
+    return {
+        'method': 'halton',
+        'start_index': start_index,
+        'requested': int(count),
+        'spacing_m': _mean_spacing_m(points),
+        'generated_at': timezone.now().isoformat(),
+        'points': points,
+    }
+
+
+def assign_sampling_plan(session: SurveySession, save: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Generates a plan for a session's target plant count and stores it on the session.
+
+    Args:
+        session: The SurveySession instance
+        save: Whether to save the session after assigning the plan
+
+    Returns:
+        The plan dictionary, or None if no plan could be built
+    """
+    try:
+        plan = build_sampling_plan(session.farm, session.target_plants_surveyed)
+    except Exception as e:
+        # A missing plan should never stop a survey from starting
+        logger.error(f"Could not build sampling plan for session {session.session_id}: {e}")
+        return None
+
+    session.sampling_plan = plan
+    if save:
+        session.save(update_fields=['sampling_plan'])
+    return plan
@@ -0,0 +1,368 @@
+# core/services/session_events.py
+"""
+Publish/subscribe channel for live survey session progress.
+
+Observations committed by `create_observation_api` are published here and
+streamed to supervisors by `session_event_stream_view` as Server-Sent Events.
+
+Two brokers are available:
+
+- LocalBroker: in-process fan-out, used for single-node deployments and
+  whenever no Redis URL is configured.
+- RedisBroker: Redis pub/sub, used when SESSION_EVENTS_REDIS_URL is set and
+  the `redis` package is installed, so events reach subscribers connected to
+  any worker process.
+
+Streams subscribe before reading the progress snapshot, so no observation
+committed in between is missed; buffered events the snapshot already counts
+are skipped. Observation events use the observation's primary key as their
+SSE id, which is the same whichever worker publishes them.
+"""
+import json
+import time
+import queue
+import asyncio
+import logging
+import threading
+from typing import Callable, Dict, Any, Optional, Set
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Count, Max
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of undelivered events buffered per subscriber
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Broker channel names are this prefix followed by the session UUID
+CHANNEL_PREFIX = 'survey-session:'
+
+# Seconds between keep-alive comments on an idle stream
+HEARTBEAT_INTERVAL = 15
+
+
+class Subscription:
+    """
+    A single listener on a session's event channel.
+
+    Subscriptions created from inside an event loop deliver events to an
+    asyncio queue; others use a thread-safe queue, so the same broker serves
+    ASGI (async) and WSGI (sync) streaming responses.
+    """
+
+    def __init__(self, broker, channel: str, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.broker = broker
+        self.channel = channel
+        self.loop = loop
+        if loop is not None:
+            self._queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        else:
+            self._queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def deliver(self, event: Dict[str, Any]) -> None:
+        """Hand an event to this subscriber from any thread, dropping it if the subscriber is too slow."""
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._put_nowait, event)
+        else:
+            self._put_nowait(event)
+
+    def _put_nowait(self, event: Dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(event)
+        except (asyncio.QueueFull, queue.Full):
+            logger.warning(f"Dropping session event for slow subscriber on {self.channel}")
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Wait for the next event in async mode, or return None on timeout."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def get_sync(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Wait for the next event in sync mode, or return None on timeout."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        """Stop receiving events."""
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """In-process broker that fans events out to subscribers in this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+
+    def publish(self, channel: str, event: Dict[str, Any]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+    def subscribe(self, channel: str, loop: Optional[asyncio.AbstractEventLoop] = None) -> Subscription:
+        subscription = Subscription(self, channel, loop)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+
+class RedisBroker(LocalBroker):
+    """
+    Broker that relays events through Redis pub/sub.
+
+    A single background thread per process listens on Redis and hands events
+    to local subscribers, so each open stream costs no extra Redis connection.
+    """
+
+    def __init__(self, url: str):
+        import redis
+
+        super().__init__()
+        self._client = redis.Redis.from_url(url)
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.psubscribe(**{f'{CHANNEL_PREFIX}*': self._on_message})
+        self._thread = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def _on_message(self, message) -> None:
+        try:
+            channel = message['channel'].decode()
+            event = json.loads(message['data'])
+        except (ValueError, KeyError, AttributeError) as e:
+            logger.warning(f"Ignoring malformed session event from Redis: {e}")
+            return
+        LocalBroker.publish(self, channel, event)
+
+    def publish(self, channel: str, event: Dict[str, Any]) -> None:
+        try:
+            self._client.publish(channel, json.dumps(event, default=str))
+        except Exception as e:
+            # Keep same-process subscribers working while Redis is unavailable
+            logger.error(f"Redis publish failed, delivering locally only: {e}")
+            LocalBroker.publish(self, channel, event)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker() -> LocalBroker:
+    """
+    Returns the process-wide broker, creating it on first use.
+
+    Returns:
+        A RedisBroker if configured and available, otherwise a LocalBroker
+    """
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                redis_url = getattr(settings, 'SESSION_EVENTS_REDIS_URL', None)
+                if redis_url:
+                    try:
+                        _broker = RedisBroker(redis_url)
+                        logger.info("Session events using Redis broker")
+                    except Exception as e:
+                        logger.error(f"Could not start Redis broker, falling back to local broker: {e}")
+                if _broker is None:
+                    _broker = LocalBroker()
+    return _broker
+
+
+def channel_for_session(session_id) -> str:
+    """
+    Returns the broker channel name for a survey session.
+
+    Args:
+        session_id: The session's UUID
+
+    Returns:
+        Channel name string
+    """
+    return f'{CHANNEL_PREFIX}{session_id}'
+
+
+def publish_session_event(
+    session_id, event_type: str, data: Dict[str, Any], event_id: Optional[int] = None
+) -> None:
+    """
+    Publishes an event to everyone watching a survey session.
+
+    Args:
+        session_id: The session's UUID
+        event_type: SSE event name (e.g. 'observation', 'finished')
+        data: JSON-serialisable payload
+        event_id: SSE event ID; the observation's primary key for 'observation' events
+    """
+    event = {'id': event_id, 'type': event_type, 'data': data}
+    try:
+        get_broker().publish(channel_for_session(session_id), event)
+    except Exception as e:
+        logger.error(f"Failed to publish {event_type} event for session {session_id}: {e}")
+
+
+def build_progress_snapshot(session) -> Dict[str, Any]:
+    """
+    Builds the counts shown on the session progress displays.
+
+    Args:
+        session: The SurveySession instance
+
+    Returns:
+        Dictionary with observation, progress and unique pest/disease counts,
+        and the ID of the latest observation counted
+    """
+    # One query, so the count and latest ID describe the same observations
+    completed = session.observations.filter(status='completed').aggregate(count=Count('id'), last_id=Max('id'))
+    return {
+        'status': session.status,
+        'observation_count': completed['count'],
+        'last_observation_id': completed['last_id'] or 0,
+        'target_plants': session.target_plants_surveyed,
+        'progress_percent': session.get_progress_percentage(),
+        'unique_pests_count': session.get_unique_pests().count(),
+        'unique_diseases_count': session.get_unique_diseases().count(),
+    }
+
+
+def build_observation_event(observation, session) -> Dict[str, Any]:
+    """
+    Builds the payload describing a newly committed observation.
+
+    Args:
+        observation: The completed Observation
+        session: The SurveySession it belongs to
+
+    Returns:
+        Dictionary with the observation's position, findings and session counts
+    """
+    return {
+        'observation_id': observation.id,
+        'plant_number': observation.plant_sequence_number,
+        'lat': float(observation.latitude) if observation.latitude is not None else None,
+        'lon': float(observation.longitude) if observation.longitude is not None else None,
+        'time': observation.observation_time.strftime('%I:%M %p'),
+        'pests': list(observation.pests_observed.values_list('name', flat=True)),
+        'diseases': list(observation.diseases_observed.values_list('name', flat=True)),
+        **build_progress_snapshot(session),
+    }
+
+
+def format_sse(event_type: str, data: Dict[str, Any], event_id: Optional[int] = None) -> str:
+    """
+    Formats an event as a Server-Sent Events message.
+
+    Args:
+        event_type: SSE event name
+        data: JSON-serialisable payload
+        event_id: Optional event ID
+
+    Returns:
+        The encoded SSE message
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event_type}')
+    lines.append(f'data: {json.dumps(data, default=str)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def get_max_stream_seconds() -> int:
+    """
+    Returns how long a single stream stays open before the client reconnects.
+
+    Returns:
+        Stream lifetime in seconds
+    """
+    return getattr(settings, 'SESSION_EVENTS_MAX_STREAM_SECONDS', 300)
+
+
+def _covered_by_snapshot(event: Dict[str, Any], snapshot: Dict[str, Any]) -> bool:
+    """Whether a buffered event describes an observation the snapshot already counts."""
+    return event['type'] == 'observation' and (event['id'] or 0) <= snapshot.get('last_observation_id', 0)
+
+
+async def aiter_session_events(session_id, get_snapshot: Callable[[], Dict[str, Any]]):
+    """
+    Async generator yielding SSE messages for a session (ASGI deployments).
+
+    Args:
+        session_id: The session's UUID
+        get_snapshot: Builds the progress snapshot sent as the first event;
+            called after subscribing
+
+    Yields:
+        Encoded SSE messages
+    """
+    loop = asyncio.get_running_loop()
+    subscription = get_broker().subscribe(channel_for_session(session_id), loop=loop)
+    deadline = loop.time() + get_max_stream_seconds()
+    try:
+        snapshot = await sync_to_async(get_snapshot)()
+        yield 'retry: 3000\n\n'
+        yield format_sse('snapshot', snapshot)
+        if snapshot.get('status') not in ('not_started', 'in_progress'):
+            return
+        while loop.time() < deadline:
+            event = await subscription.get(HEARTBEAT_INTERVAL)
+            if event is None:
+                yield ': keep-alive\n\n'
+                continue
+            if _covered_by_snapshot(event, snapshot):
+                continue
+            yield format_sse(event['type'], event['data'], event['id'])
+            if event['type'] == 'finished':
+                return
+    finally:
+        subscription.close()
+
+
+def iter_session_events(session_id, get_snapshot: Callable[[], Dict[str, Any]]):
+    """
+    Generator yielding SSE messages for a session (WSGI deployments).
+
+    Each open stream holds a worker thread, so streams are closed after
+    SESSION_EVENTS_MAX_STREAM_SECONDS and the browser reconnects.
+
+    Args:
+        session_id: The session's UUID
+        get_snapshot: Builds the progress snapshot sent as the first event;
+            called after subscribing
+
+    Yields:
+        Encoded SSE messages
+    """
+    subscription = get_broker().subscribe(channel_for_session(session_id))
+    deadline = time.monotonic() + get_max_stream_seconds()
+    try:
+        snapshot = get_snapshot()
+        yield 'retry: 3000\n\n'
+        yield format_sse('snapshot', snapshot)
+        if snapshot.get('status') not in ('not_started', 'in_progress'):
+            return
+        while time.monotonic() < deadline:
+            event = subscription.get_sync(HEARTBEAT_INTERVAL)
+            if event is None:
+                yield ': keep-alive\n\n'
+                continue
+            if _covered_by_snapshot(event, snapshot):
+                continue
+            yield format_sse(event['type'], event['data'], event['id'])
+            if event['type'] == 'finished':
+                return
+    finally:
+        subscription.close()
@@ -0,0 +1,103 @@
+# core/services/session_summary_service.py
+import logging
+from typing import Iterable, Optional
+
+from django.db.models import Count
+
+from ..models import SurveySession, SurveySessionSummary, Observation
+
+logger = logging.getLogger(__name__)
+
+# Decimal places kept for map coordinates (~0.1 m)
+MAP_COORD_PRECISION = 6
+
+
+def build_session_summary(session: SurveySession) -> SurveySessionSummary:
+    """
+    Computes and stores the summary of a survey session.
+
+    Observations are read in one pass with their pests and diseases
+    prefetched and image counts annotated, so the number of queries does not
+    grow with the number of observations. The bounding box covers the
+    observations the session map shows, so it leaves out those flagged
+    outside the farm boundary.
+
+    Args:
+        session: The SurveySession to summarize
+
+    Returns:
+        The saved SurveySessionSummary
+    """
+    # Finishing a session deletes its drafts, so every remaining observation counts
+    observations = Observation.objects.filter(session=session).prefetch_related(
+        'pests_observed',
+        'diseases_observed'
+    ).annotate(num_images=Count('images')).order_by('observation_time')
+
+    pests = {}
+    diseases = {}
+    lats = []
+    lons = []
+    observation_count = 0
+    image_count = 0
+
+    for obs in observations:
+        observation_count += 1
+        image_count += obs.num_images
+        pests.update((p.id, p.name) for p in obs.pests_observed.all())
+        diseases.update((d.id, d.name) for d in obs.diseases_observed.all())
+
+        if obs.has_coordinates() and not obs.outside_boundary:
+            lats.append(round(float(obs.latitude), MAP_COORD_PRECISION))
+            lons.append(round(float(obs.longitude), MAP_COORD_PRECISION))
+
+    bbox = [min(lats), min(lons), max(lats), max(lons)] if lats else None
+
+    summary, _ = SurveySessionSummary.objects.update_or_create(
+        session=session,
+        defaults={
+            'observation_count': observation_count,
+            'image_count': image_count,
+            'unique_pests': [{'id': pid, 'name': name} for pid, name in sorted(pests.items(), key=lambda i: i[1])],
+            'unique_diseases': [{'id': did, 'name': name} for did, name in sorted(diseases.items(), key=lambda i: i[1])],
+            'bbox': bbox,
+        }
+    )
+    logger.info(f"Built summary for session {session.session_id}: {observation_count} observations")
+    return summary
+
+
+def get_session_summary(session: SurveySession) -> Optional[SurveySessionSummary]:
+    """
+    Returns the stored summary of a completed session, building it if missing.
+
+    Sessions completed before summaries existed are summarized on first view.
+    Active sessions have no summary, since their observations still change.
+
+    Args:
+        session: The SurveySession instance
+
+    Returns:
+        The SurveySessionSummary, or None if the session is not completed
+    """
+    if session.status != 'completed':
+        return None
+    try:
+        return session.summary
+    except SurveySessionSummary.DoesNotExist:
+        return build_session_summary(session)
+
+
+def discard_session_summaries(session_ids: Iterable[int]) -> None:
+    """
+    Deletes the stored summaries of the given sessions.
+
+    Called when observations of a completed session change; the next view
+    rebuilds the summary (see get_session_summary).
+
+    Args:
+        session_ids: Primary keys of the affected sessions
+    """
+    session_ids = [pk for pk in set(session_ids) if pk]
+    if session_ids:
+        SurveySessionSummary.objects.filter(session_id__in=session_ids).delete()
@@ -0,0 +1,95 @@
+# core/services/single_flight.py
+"""
+Single-flight coalescing of identical concurrent calls.
+
+The first caller for a key runs the function. Callers arriving with the same
+key while it runs wait for it to finish and share its result (or its
+exception) instead of making the same upstream request again. Nothing is
+kept after the call returns; caching results is left to the caller.
+"""
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """One in-flight call and the outcome its waiters will share."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key.
+
+    Args:
+        name: Label used in logs
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Runs `fn`, or waits for an identical call already in flight.
+
+        Args:
+            key: Identifies identical calls (e.g. normalized request parameters)
+            fn: Zero-argument callable making the call
+
+        Returns:
+            The value returned by `fn`, shared by every caller with the same key
+
+        Raises:
+            Whatever `fn` raised, re-raised in every waiting caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            logger.debug(f"{self.name}: waiting on in-flight call for {key!r}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+            if call.waiters:
+                logger.info(f"{self.name}: {call.waiters} identical call(s) shared one request for {key!r}")
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def snapshot(self) -> Dict[str, int]:
+        """Returns call counts for display."""
+        with self._lock:
+            return {'executed': self.executed, 'coalesced': self.coalesced, 'in_flight': len(self._calls)}
@@ -0,0 +1,228 @@
+# core/services/tile_service.py
+"""
+z/x/y map tiles of observation points.
+
+Tiles use the Web Mercator (slippy map) scheme used by Leaflet. Below
+CLUSTER_MAX_ZOOM, observations in a tile are merged into clusters on a
+coarse pixel grid; at and above it each observation is returned on its own.
+Tiles are GeoJSON FeatureCollections, cached per tile and filter set under
+the view-cache version tokens of the objects they show.
+"""
+import math
+import hashlib
+import logging
+from datetime import date
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, QuerySet
+
+from ..spatial_index import filter_bbox
+from .view_cache import VersionKey, get_versions
+
+logger = logging.getLogger(__name__)
+
+# Zoom level from which observations are returned individually
+CLUSTER_MAX_ZOOM = 17
+
+# Clusters are formed on a grid of this many cells per tile edge (32 px cells on 256 px tiles)
+CLUSTER_GRID_SIZE = 8
+
+MAX_ZOOM = 22
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """
+    Returns the geographic bounds of a Web Mercator tile.
+
+    Args:
+        z: Zoom level
+        x: Tile column
+        y: Tile row
+
+    Returns:
+        Tuple of (south, west, north, east) in decimal degrees
+    """
+    n = 2 ** z
+    west = x / n * 360.0 - 180.0
+    east = (x + 1) / n * 360.0 - 180.0
+    north = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    south = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return south, west, north, east
+
+
+def is_valid_tile(z: int, x: int, y: int) -> bool:
+    """
+    Checks that tile coordinates exist at the given zoom.
+
+    Args:
+        z: Zoom level
+        x: Tile column
+        y: Tile row
+
+    Returns:
+        True if the tile is valid
+    """
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+def filter_observations(
+    observations: QuerySet,
+    pest_id: Optional[int] = None,
+    disease_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> QuerySet:
+    """
+    Applies the tile layer filters to an observation queryset.
+
+    Args:
+        observations: Base queryset (e.g. a farm's or session's observations)
+        pest_id: Only observations where this pest was found
+        disease_id: Only observations where this disease was found
+        start_date: Only observations on or after this date
+        end_date: Only observations on or before this date
+
+    Returns:
+        The filtered queryset
+    """
+    observations = observations.filter(
+        status='completed', latitude__isnull=False, longitude__isnull=False
+    ).exclude(outside_boundary=True)
+    if pest_id:
+        observations = observations.filter(pests_observed__id=pest_id)
+    if disease_id:
+        observations = observations.filter(diseases_observed__id=disease_id)
+    if start_date:
+        observations = observations.filter(observation_time__date__gte=start_date)
+    if end_date:
+        observations = observations.filter(observation_time__date__lte=end_date)
+    return observations
+
+
+def _cluster_features(rows, bounds) -> list:
+    """
+    Merges observations into grid clusters within a tile.
+
+    Args:
+        rows: Sequence of (latitude, longitude, findings) tuples
+        bounds: Tile bounds as (south, west, north, east)
+
+    Returns:
+        List of GeoJSON Point features, one per occupied cell
+    """
+    if not rows:
+        return []
+    data = np.asarray(rows, dtype=np.float64)
+    lats, lons, findings = data[:, 0], data[:, 1], data[:, 2]
+    south, west, north, east = bounds
+
+    # Grid in projected (Mercator) space so cells are square on screen
+    merc_y = np.log(np.tan(np.pi / 4 + np.radians(lats) / 2))
+    top = math.log(math.tan(math.pi / 4 + math.radians(north) / 2))
+    bottom = math.log(math.tan(math.pi / 4 + math.radians(south) / 2))
+    rows_idx = np.clip(((top - merc_y) / (top - bottom) * CLUSTER_GRID_SIZE).astype(int), 0, CLUSTER_GRID_SIZE - 1)
+    cols_idx = np.clip(((lons - west) / (east - west) * CLUSTER_GRID_SIZE).astype(int), 0, CLUSTER_GRID_SIZE - 1)
+    cell = rows_idx * CLUSTER_GRID_SIZE + cols_idx
+
+    cells, inverse, counts = np.unique(cell, return_inverse=True, return_counts=True)
+    lat_mean = np.bincount(inverse, weights=lats) / counts
+    lon_mean = np.bincount(inverse, weights=lons) / counts
+    finding_sum = np.bincount(inverse, weights=findings)
+
+    return [
+        {
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [round(float(lon_mean[i]), 7), round(float(lat_mean[i]), 7)]},
+            'properties': {
+                'cluster': True,
+                'point_count': int(counts[i]),
+                'findings': int(finding_sum[i]),
+            }
+        }
+        for i in range(len(cells))
+    ]
+
+
+def _point_features(observations: QuerySet) -> list:
+    """
+    Builds one feature per observation with its findings.
+
+    Args:
+        observations: Observations within the tile
+
+    Returns:
+        List of GeoJSON Point features
+    """
+    features = []
+    for obs in observations.select_related('session').prefetch_related('pests_observed', 'diseases_observed'):
+        features.append({
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [float(obs.longitude), float(obs.latitude)]},
+            'properties': {
+                'id': obs.id,
+                'session_id': str(obs.session.session_id),
+                'plant_number': obs.plant_sequence_number,
+                'time': obs.observation_time.isoformat(),
+                'pests': [p.name for p in obs.pests_observed.all()],
+                'diseases': [d.name for d in obs.diseases_observed.all()],
+            }
+        })
+    return features
+
+
+def get_observation_tile(
+    observations: QuerySet,
+    scope_key: str,
+    z: int,
+    x: int,
+    y: int,
+    versions: Iterable[VersionKey] = ()
+) -> Tuple[Dict[str, Any], str]:
+    """
+    Returns the GeoJSON tile for a filtered set of observations, using the cache when possible.
+
+    The ETag is derived from the scope, tile and the version tokens of the
+    objects in `versions`, so it changes whenever an observation, its
+    findings or the pest and disease names change.
+
+    Args:
+        observations: Filtered observation queryset (see filter_observations)
+        scope_key: String identifying the scope and filters, used in the cache key
+        z: Zoom level
+        x: Tile column
+        y: Tile row
+        versions: (kind, pk) pairs the tile depends on, e.g. [('farm', 3), REFERENCE]
+
+    Returns:
+        Tuple containing (feature_collection, etag)
+    """
+    bounds = tile_bounds(z, x, y)
+    south, west, north, east = bounds
+    in_tile = filter_bbox(observations, south, west, north, east)
+
+    raw_key = f"{scope_key}:{z}/{x}/{y}:{get_versions(versions)}"
+    etag = hashlib.sha1(raw_key.encode()).hexdigest()
+    cache_key = f'obs-tile:{etag}'
+
+    tile = cache.get(cache_key)
+    if tile is not None:
+        return tile, etag
+
+    if z < CLUSTER_MAX_ZOOM:
+        # Count findings on a fresh queryset: annotating in_tile would reuse the
+        # pest/disease filter joins and count only the filtered finding
+        rows = list(observations.model.objects.filter(pk__in=in_tile.values('pk')).annotate(
+            num_pests=Count('pests_observed', distinct=True),
+            num_diseases=Count('diseases_observed', distinct=True)
+        ).values_list('latitude', 'longitude', 'num_pests', 'num_diseases'))
+        rows = [(float(lat), float(lon), p + d) for lat, lon, p, d in rows]
+        features = _cluster_features(rows, bounds)
+    else:
+        features = _point_features(in_tile.distinct())
+
+    tile = {'type': 'FeatureCollection', 'features': features}
+    cache.set(cache_key, tile, getattr(settings, 'OBSERVATION_TILE_CACHE_TIMEOUT', 60 * 60))
+    return tile, etag
@@ -0,0 +1,222 @@
+# core/services/upload_service.py
+import os
+import logging
+from typing import Optional, Tuple, BinaryIO
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from ..models import (
+    SurveySession, Observation, ObservationImage, ImageUpload,
+    observation_image_path
+)
+from .image_storage_service import store_file_at_path
+
+logger = logging.getLogger(__name__)
+
+# Size of the blocks copied from the request stream to disk
+STREAM_BLOCK_SIZE = 64 * 1024
+
+
+def get_chunk_size() -> int:
+    """
+    Returns the chunk size clients are asked to send.
+
+    Returns:
+        Chunk size in bytes
+    """
+    return getattr(settings, 'IMAGE_UPLOAD_CHUNK_SIZE', 512 * 1024)
+
+
+def get_max_upload_size() -> int:
+    """
+    Returns the largest image the chunked upload endpoint will accept.
+
+    Returns:
+        Maximum file size in bytes
+    """
+    return getattr(settings, 'IMAGE_UPLOAD_MAX_SIZE', 20 * 1024 * 1024)
+
+
+def start_upload(
+    session: SurveySession,
+    user: User,
+    filename: str,
+    total_size: int
+) -> Tuple[Optional[ImageUpload], Optional[str]]:
+    """
+    Registers a new chunked upload and reserves its storage path.
+
+    Args:
+        session: The SurveySession the image belongs to
+        user: The user performing the upload
+        filename: Original filename of the image
+        total_size: Size of the complete file in bytes
+
+    Returns:
+        Tuple containing (upload_instance, error_message)
+    """
+    if not filename:
+        return None, "Filename is required."
+    if total_size <= 0:
+        return None, "File size must be greater than zero."
+    if total_size > get_max_upload_size():
+        return None, f"File is too large (maximum {get_max_upload_size() // (1024 * 1024)} MB)."
+
+    try:
+        upload = ImageUpload(
+            session=session,
+            uploaded_by=user,
+            filename=os.path.basename(filename)[:255],
+            total_size=total_size
+        )
+        upload.storage_path = observation_image_path(upload, upload.filename)
+        upload.save()
+
+        # Create the empty target file so chunks can be written at any offset
+        full_path = default_storage.path(upload.storage_path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        open(full_path, 'wb').close()
+
+        logger.info(f"Started chunked upload {upload.upload_id} ({total_size} bytes) for session {session.session_id}")
+        return upload, None
+
+    except Exception as e:
+        logger.exception(f"Error starting upload for session {session.session_id}: {e}")
+        return None, f"An unexpected error occurred: {e}"
+
+
+def get_upload(upload_id, user: User) -> Optional[ImageUpload]:
+    """
+    Retrieves an upload owned by the given user.
+
+    Args:
+        upload_id: UUID of the upload
+        user: The User instance to check ownership
+
+    Returns:
+        The ImageUpload instance or None if not found
+    """
+    try:
+        return ImageUpload.objects.select_related('session').get(upload_id=upload_id, uploaded_by=user)
+    except ImageUpload.DoesNotExist:
+        return None
+
+
+def append_chunk(
+    upload: ImageUpload,
+    offset: int,
+    stream: BinaryIO,
+    length: Optional[int] = None
+) -> Tuple[int, Optional[str]]:
+    """
+    Streams a chunk from the request body straight into the upload's file.
+
+    The chunk must start at the offset the server has acknowledged, which lets
+    clients resume after a dropped connection by asking for the current offset
+    and continuing from there. Bytes beyond the declared file size are rejected.
+
+    Args:
+        upload: The ImageUpload receiving the chunk
+        offset: Byte offset the client claims this chunk starts at
+        stream: File-like object to read the chunk from (e.g. the request)
+        length: Number of bytes in the chunk, if known (Content-Length)
+
+    Returns:
+        Tuple containing (new_offset, error_message)
+    """
+    if upload.status != 'pending':
+        return upload.offset, "Upload has already been committed."
+    if offset != upload.offset:
+        return upload.offset, f"Offset mismatch: expected {upload.offset}."
+
+    remaining = upload.total_size - upload.offset
+    if length is not None and length > remaining:
+        return upload.offset, "Chunk exceeds the declared file size."
+
+    full_path = default_storage.path(upload.storage_path)
+    written = 0
+
+    try:
+        with transaction.atomic():
+            # Re-read the row so two racing requests cannot both write at the same offset
+            locked = ImageUpload.objects.select_for_update().get(pk=upload.pk)
+            if locked.offset != offset:
+                return locked.offset, f"Offset mismatch: expected {locked.offset}."
+
+            with open(full_path, 'r+b') as target:
+                target.seek(offset)
+                while True:
+                    to_read = STREAM_BLOCK_SIZE
+                    if length is not None:
+                        to_read = min(to_read, length - written)
+                        if to_read <= 0:
+                            break
+                    block = stream.read(to_read)
+                    if not block:
+                        break
+                    if written + len(block) > remaining:
+                        return upload.offset, "Chunk exceeds the declared file size."
+                    target.write(block)
+                    written += len(block)
+
+            locked.offset = offset + written
+            locked.save(update_fields=['offset', 'updated_at'])
+            upload.offset = locked.offset
+
+        return upload.offset, None
+
+    except FileNotFoundError:
+        logger.error(f"Storage file missing for upload {upload.upload_id}")
+        return upload.offset, "Upload storage is missing. Please restart the upload."
+    except Exception as e:
+        logger.exception(f"Error writing chunk for upload {upload.upload_id}: {e}")
+        return upload.offset, f"An unexpected error occurred: {e}"
+
+
+def commit_upload(
+    upload: ImageUpload,
+    observation: Observation,
+    caption: Optional[str] = None
+) -> Tuple[Optional[ObservationImage], Optional[str]]:
+    """
+    Attaches a fully received upload to an Observation.
+
+    The assembled file is moved into the content-addressed image store, or
+    dropped in favour of an existing blob with the same bytes. Committing the
+    same upload twice to the same observation returns the image created the
+    first time.
+
+    Args:
+        upload: The ImageUpload to commit
+        observation: The Observation the image belongs to
+        caption: Optional caption for the image
+
+    Returns:
+        Tuple containing (observation_image, error_message)
+    """
+    if upload.status == 'completed' and upload.observation_image_id:
+        if upload.observation_image.observation_id != observation.id:
+            return None, "Upload is already attached to a different observation."
+        return upload.observation_image, None
+    if observation.session_id != upload.session_id:
+        return None, "Upload and observation belong to different sessions."
+    if not upload.is_complete():
+        return None, f"Upload is incomplete ({upload.offset}/{upload.total_size} bytes received)."
+
+    try:
+        with transaction.atomic():
+            image = store_file_at_path(observation, upload.storage_path, caption)
+
+            upload.observation_image = image
+            upload.status = 'completed'
+            upload.save(update_fields=['observation_image', 'status', 'updated_at'])
+
+        logger.info(f"Committed upload {upload.upload_id} as image {image.id} for observation {observation.id}")
+        return image, None
+
+    except Exception as e:
+        logger.exception(f"Error committing upload {upload.upload_id}: {e}")
+        return None, f"An unexpected error occurred: {e}"
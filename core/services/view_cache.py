@@ -0,0 +1,145 @@
+# core/services/view_cache.py
+"""
+Per-user caching of rendered read-heavy pages.
+
+Cached responses are keyed by the user, the request path and query string,
+today's date and a version token for every object the page shows. Model
+save/delete signals (see core/signals.py) bump those tokens with
+bump_version(), so the next request misses and renders fresh; stale entries
+are never served and simply expire.
+"""
+import hashlib
+import logging
+import time
+from functools import wraps
+from typing import Callable, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+
+logger = logging.getLogger(__name__)
+
+# Version kind for the shared reference data (pests, diseases, stages, ...)
+REFERENCE = ('reference', 'all')
+
+VersionKey = Tuple[str, object]
+
+
+def _version_key(kind: str, pk) -> str:
+    return f"view-version:{kind}:{pk}"
+
+
+def _new_token() -> str:
+    return str(time.time_ns())
+
+
+def get_versions(objects: Iterable[VersionKey]) -> str:
+    """
+    Returns the combined version token for a set of objects.
+
+    Missing tokens are created rather than treated as zero, so a token that was
+    evicted from the cache cannot bring back pages rendered before it was bumped.
+
+    Args:
+        objects: (kind, pk) pairs, e.g. ('farm', 3)
+
+    Returns:
+        The tokens joined in the order given
+    """
+    keys = [_version_key(kind, pk) for kind, pk in objects]
+    found = cache.get_many(keys)
+    tokens = []
+    for key in keys:
+        token = found.get(key)
+        if token is None:
+            token = _new_token()
+            # add() so that concurrent requests agree on one token
+            if not cache.add(key, token, None):
+                token = cache.get(key, token)
+        tokens.append(token)
+    return '.'.join(tokens)
+
+
+def bump_version(kind: str, pk) -> None:
+    """
+    Invalidates every cached page that shows the given object.
+
+    Args:
+        kind: Object kind, e.g. 'farm' or 'session'
+        pk: Primary key (or other identifier used in the version pairs)
+    """
+    cache.set(_version_key(kind, pk), _new_token(), None)
+
+
+def _pending_messages(request) -> int:
+    storage = getattr(request, '_messages', None)
+    return len(storage) if storage is not None else 0
+
+
+def cache_per_user(
+    versions: Callable[..., Iterable[VersionKey]],
+    timeout: Optional[int] = None,
+    unless: Optional[Callable] = None,
+) -> Callable:
+    """
+    Caches a view's successful GET responses per user and object version.
+
+    Only 200 responses to authenticated GET requests are cached, and never when
+    the request carries or adds flash messages, since those must be shown once.
+    The CSRF cookie is part of the key because rendered forms embed its token.
+
+    Args:
+        versions: Called with the view's arguments; returns the (kind, pk)
+            pairs whose versions the page depends on
+        timeout: Seconds to keep a response (defaults to VIEW_CACHE_TIMEOUT)
+        unless: Optional predicate, called with the view's arguments; when it
+            returns true the view runs uncached
+
+    Returns:
+        View decorator
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            user = getattr(request, 'user', None)
+            if (
+                request.method != 'GET'
+                or not (user and user.is_authenticated)
+                or (unless and unless(request, *args, **kwargs))
+                or _pending_messages(request)
+            ):
+                return view_func(request, *args, **kwargs)
+
+            objects = [('user', user.pk), *versions(request, *args, **kwargs)]
+            csrf = request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')
+            digest = hashlib.md5(
+                f"{request.get_full_path()}|{csrf}".encode(), usedforsecurity=False
+            ).hexdigest()
+            key = (
+                f"view:{view_func.__module__}.{view_func.__name__}:{user.pk}:{digest}:"
+                f"{timezone.localdate().isoformat()}:{get_versions(objects)}"
+            )
+
+            response = cache.get(key)
+            if response is not None:
+                return response
+
+            response = view_func(request, *args, **kwargs)
+            if (
+                response.status_code == 200
+                and not response.streaming
+                and not _pending_messages(request)
+            ):
+                patch_cache_control(response, private=True)
+                if hasattr(response, 'render') and callable(response.render):
+                    response = response.render()
+                try:
+                    cache.set(key, response, timeout if timeout is not None
+                              else getattr(settings, 'VIEW_CACHE_TIMEOUT', 10 * 60))
+                except Exception as e:
+                    logger.warning(f"Could not cache response for {request.path}: {e}")
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,157 @@
+# core/signals.py
+import logging
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, m2m_changed
+from django.dispatch import receiver
+
+from .models import (
+    Grower, Region, PlantType, PlantPart, Pest, Disease, SeasonalStage, Farm,
+    SurveillanceCalculation, SurveySession, SurveySessionSummary, Observation, ObservationImage
+)
+from .services.image_storage_service import release_blob
+from .services.session_summary_service import discard_session_summaries
+from .services.view_cache import bump_version, REFERENCE
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_delete, sender=ObservationImage)
+def release_observation_image_blob(sender, instance, **kwargs):
+    """Drop the deleted image's reference to its shared blob."""
+    if instance.blob_id:
+        release_blob(instance.blob_id)
+
+
+@receiver(post_save, sender=Observation)
+@receiver(post_delete, sender=Observation)
+def discard_observation_session_summary(sender, instance, **kwargs):
+    """A completed session's stored summary is stale once an observation changes."""
+    discard_session_summaries([instance.session_id])
+
+
+@receiver(m2m_changed, sender=Observation.pests_observed.through)
+@receiver(m2m_changed, sender=Observation.diseases_observed.through)
+def discard_findings_session_summary(sender, instance, action, reverse, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        discard_session_summaries([instance.session_id])
+        return
+    discard_session_summaries(
+        Observation.objects.filter(pk__in=kwargs.get('pk_set') or ()).values_list('session_id', flat=True)
+    )
+
+
+@receiver(post_save, sender=ObservationImage)
+@receiver(post_delete, sender=ObservationImage)
+def discard_image_session_summary(sender, instance, **kwargs):
+    discard_session_summaries(
+        Observation.objects.filter(pk=instance.observation_id).values_list('session_id', flat=True)
+    )
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Apply the SQLITE_PRAGMAS connection profile to each new SQLite connection."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', None) or {}
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            if not name.isidentifier():
+                logger.warning(f"Ignoring invalid SQLite pragma name {name!r}")
+                continue
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+# --- Cached view invalidation (see core/services/view_cache.py) ---
+
+REFERENCE_MODELS = (Region, PlantType, PlantPart, Pest, Disease, SeasonalStage)
+
+
+def invalidate_reference_views(sender, **kwargs):
+    """Reference data appears on every cached page."""
+    bump_version(*REFERENCE)
+
+
+for _model in REFERENCE_MODELS:
+    post_save.connect(invalidate_reference_views, sender=_model, dispatch_uid=f'view_cache_{_model.__name__}_save')
+    post_delete.connect(invalidate_reference_views, sender=_model, dispatch_uid=f'view_cache_{_model.__name__}_delete')
+m2m_changed.connect(invalidate_reference_views, sender=SeasonalStage.active_pests.through, dispatch_uid='view_cache_stage_pests')
+m2m_changed.connect(invalidate_reference_views, sender=SeasonalStage.active_diseases.through, dispatch_uid='view_cache_stage_diseases')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_views(sender, instance, **kwargs):
+    bump_version('user', instance.pk)
+
+
+@receiver(post_save, sender=Grower)
+@receiver(post_delete, sender=Grower)
+def invalidate_grower_views(sender, instance, **kwargs):
+    bump_version('user', instance.user_id)
+
+
+@receiver(post_save, sender=Farm)
+@receiver(post_delete, sender=Farm)
+def invalidate_farm_views(sender, instance, **kwargs):
+    bump_version('farm', instance.pk)
+    # The owner's farm list (e.g. the calculator's farm choices) changed too
+    bump_version('grower', instance.owner_id)
+
+
+@receiver(post_save, sender=SurveillanceCalculation)
+@receiver(post_delete, sender=SurveillanceCalculation)
+def invalidate_calculation_views(sender, instance, **kwargs):
+    bump_version('farm', instance.farm_id)
+
+
+@receiver(post_save, sender=SurveySession)
+@receiver(post_delete, sender=SurveySession)
+def invalidate_session_views(sender, instance, **kwargs):
+    bump_version('session', instance.pk)
+    bump_version('farm', instance.farm_id)
+
+
+@receiver(post_save, sender=SurveySessionSummary)
+@receiver(post_delete, sender=SurveySessionSummary)
+def invalidate_summary_views(sender, instance, **kwargs):
+    bump_version('session', instance.session_id)
+
+
+@receiver(post_save, sender=Observation)
+@receiver(post_delete, sender=Observation)
+def invalidate_observation_views(sender, instance, **kwargs):
+    bump_version('session', instance.session_id)
+    # Farm pages summarise findings per session
+    bump_version('farm', instance.session.farm_id)
+
+
+@receiver(m2m_changed, sender=Observation.pests_observed.through)
+@receiver(m2m_changed, sender=Observation.diseases_observed.through)
+def invalidate_observation_findings_views(sender, instance, action, reverse, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        bump_version('session', instance.session_id)
+        bump_version('farm', instance.session.farm_id)
+        return
+    # Changed from the pest/disease side: every affected observation's session
+    sessions = Observation.objects.filter(
+        pk__in=kwargs.get('pk_set') or ()
+    ).values_list('session_id', 'session__farm_id').distinct()
+    for session_id, farm_id in sessions:
+        bump_version('session', session_id)
+        bump_version('farm', farm_id)
+
+
+@receiver(post_save, sender=ObservationImage)
+@receiver(post_delete, sender=ObservationImage)
+def invalidate_observation_image_views(sender, instance, **kwargs):
+    session_id = Observation.objects.filter(pk=instance.observation_id).values_list('session_id', flat=True).first()
+    if session_id:
+        bump_version('session', session_id)
@@ -0,0 +1,246 @@
+"""
+Quadkey spatial index for observation coordinates.
+
+SQLite has no spatial index, so each Observation stores the quadkey of the
+Web Mercator tile containing it at QUADKEY_LEVEL (about 2.4 m at the equator).
+Quadkeys of points in the same tile share a prefix, and every quadkey has the
+same length, so a tile at any coarser level corresponds to one contiguous
+range of the indexed column. A bounding box is covered by a handful of tiles,
+giving a few index range scans instead of a full table scan.
+"""
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+from django.db.models import Q, QuerySet
+
+# Quadkey length (tile zoom level) stored on each observation
+QUADKEY_LEVEL = 24
+
+# Web Mercator latitude limit
+MAX_LATITUDE = 85.05112878
+
+# Default upper bound on tiles used to cover a query box
+DEFAULT_MAX_CELLS = 16
+
+METRES_PER_DEGREE = 111_320.0
+
+
+def latlon_to_tile(lat: float, lon: float, level: int) -> Tuple[int, int]:
+    """
+    Returns the Web Mercator tile containing a point.
+
+    Args:
+        lat: Latitude in decimal degrees
+        lon: Longitude in decimal degrees
+        level: Zoom level
+
+    Returns:
+        Tuple of (x, y) tile coordinates
+    """
+    lat = min(max(lat, -MAX_LATITUDE), MAX_LATITUDE)
+    n = 1 << level
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tile_to_quadkey(x: int, y: int, level: int) -> str:
+    """
+    Converts tile coordinates to a quadkey string.
+
+    Args:
+        x: Tile column
+        y: Tile row
+        level: Zoom level
+
+    Returns:
+        Quadkey of `level` digits ('0'-'3')
+    """
+    digits = []
+    for i in range(level, 0, -1):
+        mask = 1 << (i - 1)
+        digits.append(str((1 if x & mask else 0) + (2 if y & mask else 0)))
+    return ''.join(digits)
+
+
+def latlon_to_quadkey(lat: float, lon: float, level: int = QUADKEY_LEVEL) -> str:
+    """
+    Returns the quadkey of the tile containing a point.
+
+    Args:
+        lat: Latitude in decimal degrees
+        lon: Longitude in decimal degrees
+        level: Zoom level (quadkey length)
+
+    Returns:
+        Quadkey string
+    """
+    x, y = latlon_to_tile(float(lat), float(lon), level)
+    return tile_to_quadkey(x, y, level)
+
+
+def latlon_to_quadkeys(lats, lons, level: int = QUADKEY_LEVEL) -> np.ndarray:
+    """
+    Vectorized latlon_to_quadkey for bulk loads and backfills.
+
+    Args:
+        lats: Array-like of latitudes
+        lons: Array-like of longitudes
+        level: Zoom level (quadkey length)
+
+    Returns:
+        NumPy array of quadkey strings
+    """
+    lat = np.clip(np.asarray(lats, dtype=np.float64), -MAX_LATITUDE, MAX_LATITUDE)
+    lon = np.asarray(lons, dtype=np.float64)
+    n = 1 << level
+    x = np.clip(((lon + 180.0) / 360.0 * n).astype(np.int64), 0, n - 1)
+    y = np.clip(((1.0 - np.arcsinh(np.tan(np.radians(lat))) / np.pi) / 2.0 * n).astype(np.int64), 0, n - 1)
+
+    shifts = np.arange(level - 1, -1, -1, dtype=np.int64)
+    digits = ((x[:, None] >> shifts) & 1) + 2 * ((y[:, None] >> shifts) & 1)
+    chars = (digits + ord('0')).astype(np.uint8)
+    return np.ascontiguousarray(chars).view(f'S{level}').ravel().astype(str)
+
+
+def _quadkey_from_int(code: int, level: int) -> str:
+    """Formats an interleaved tile code as a fixed-length quadkey."""
+    digits = []
+    for _ in range(level):
+        digits.append(str(code & 3))
+        code >>= 2
+    return ''.join(reversed(digits))
+
+
+def quadkey_ranges_for_bbox(
+    south: float,
+    west: float,
+    north: float,
+    east: float,
+    max_cells: int = DEFAULT_MAX_CELLS
+) -> List[Tuple[str, Optional[str]]]:
+    """
+    Covers a bounding box with quadkey ranges.
+
+    The box is covered by tiles at the finest level using at most `max_cells`
+    tiles. Each tile becomes a range of full-length quadkeys, and adjacent
+    ranges are merged.
+
+    Args:
+        south: Southern latitude
+        west: Western longitude
+        north: Northern latitude
+        east: Eastern longitude
+        max_cells: Maximum number of covering tiles
+
+    Returns:
+        List of (low, high) bounds where low <= quadkey < high; high is None
+        for a range running to the end of the key space
+    """
+    level = 0
+    x0 = y0 = x1 = y1 = 0
+    for candidate in range(1, QUADKEY_LEVEL + 1):
+        cx0, cy0 = latlon_to_tile(north, west, candidate)
+        cx1, cy1 = latlon_to_tile(south, east, candidate)
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > max_cells:
+            break
+        level, x0, y0, x1, y1 = candidate, cx0, cy0, cx1, cy1
+
+    if level == 0:
+        return [('', None)]
+
+    shift = 2 * (QUADKEY_LEVEL - level)
+    intervals = []
+    for x in range(x0, x1 + 1):
+        for y in range(y0, y1 + 1):
+            code = int(tile_to_quadkey(x, y, level), 4)
+            intervals.append((code << shift, (code + 1) << shift))
+    intervals.sort()
+
+    merged = [list(intervals[0])]
+    for lo, hi in intervals[1:]:
+        if lo <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], hi)
+        else:
+            merged.append([lo, hi])
+
+    end = 1 << (2 * QUADKEY_LEVEL)
+    return [
+        (_quadkey_from_int(lo, QUADKEY_LEVEL), _quadkey_from_int(hi, QUADKEY_LEVEL) if hi < end else None)
+        for lo, hi in merged
+    ]
+
+
+def bbox_for_radius(lat: float, lon: float, radius_m: float) -> Tuple[float, float, float, float]:
+    """
+    Returns the bounding box enclosing a circle.
+
+    Args:
+        lat: Centre latitude
+        lon: Centre longitude
+        radius_m: Radius in metres
+
+    Returns:
+        Tuple of (south, west, north, east)
+    """
+    dlat = radius_m / METRES_PER_DEGREE
+    dlon = radius_m / (METRES_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+    return lat - dlat, lon - dlon, lat + dlat, lon + dlon
+
+
+def filter_bbox(
+    queryset: QuerySet,
+    south: float,
+    west: float,
+    north: float,
+    east: float,
+    field: str = 'quadkey'
+) -> QuerySet:
+    """
+    Restricts a queryset of observations to a bounding box using the quadkey index.
+
+    Args:
+        queryset: Observation queryset (or one whose `field` path leads to a quadkey)
+        south: Southern latitude
+        west: Western longitude
+        north: Northern latitude (exclusive)
+        east: Eastern longitude (exclusive)
+        field: Name of the quadkey field
+
+    Returns:
+        The filtered queryset
+    """
+    condition = Q()
+    for lo, hi in quadkey_ranges_for_bbox(south, west, north, east):
+        part = Q(**{f'{field}__gte': lo})
+        if hi is not None:
+            part &= Q(**{f'{field}__lt': hi})
+        condition |= part
+
+    # Ranges cover whole tiles; the exact bounds trim the edges. The box is
+    # half-open, [south, north) x [west, east), like map tiles, so a point on
+    # the edge between two adjacent boxes falls in exactly one of them
+    return queryset.filter(condition).filter(
+        latitude__gte=south, latitude__lt=north,
+        longitude__gte=west, longitude__lt=east
+    )
+
+
+def filter_radius(queryset: QuerySet, lat: float, lon: float, radius_m: float) -> QuerySet:
+    """
+    Restricts a queryset of observations to the box enclosing a circle.
+
+    Callers needing an exact circle should check distances on the (small)
+    result set.
+
+    Args:
+        queryset: Observation queryset
+        lat: Centre latitude
+        lon: Centre longitude
+        radius_m: Radius in metres
+
+    Returns:
+        The filtered queryset
+    """
+    return filter_bbox(queryset, *bbox_for_radius(lat, lon, radius_m))
@@ -0,0 +1,69 @@
+"""
+Third-party CSS/JS served from our own static files.
+
+Each asset is pinned to a CDN URL and a path under static/vendor/. Running
+`manage.py vendor_static` downloads the pinned files (plus the fonts, images
+and source maps they reference) into STATICFILES_DIRS, checking them against
+their Subresource Integrity hashes. Templates include assets with
+{% vendor_asset %}, which points at the local copy once it exists, so it is
+fingerprinted, precompressed and cached like our own static files, and at the
+CDN until then.
+"""
+from functools import lru_cache
+from typing import Dict, Any
+
+from django.contrib.staticfiles import finders
+
+VENDOR_DIR = 'vendor'
+
+VENDOR_ASSETS: Dict[str, Dict[str, Any]] = {
+    'bootstrap.css': {
+        'url': 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/css/bootstrap.min.css',
+        'path': 'vendor/bootstrap/5.3.3/css/bootstrap.min.css',
+        'integrity': 'sha384-QWTKZyjpPEjISv5WaRU9OFeRpok6YctnYmDr5pNlyT2bRjXh0JMhjY6hW+ALEwIH',
+    },
+    'bootstrap.js': {
+        'url': 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/js/bootstrap.bundle.min.js',
+        'path': 'vendor/bootstrap/5.3.3/js/bootstrap.bundle.min.js',
+        'integrity': 'sha384-YvpcrYf0tY3lHB60NNkmXc5s9fDVZLESaAA55NDzOxhy9GkcIdslK1eN7N6jIeHz',
+    },
+    'bootstrap-icons.css': {
+        'url': 'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.3/font/bootstrap-icons.min.css',
+        'path': 'vendor/bootstrap-icons/1.11.3/font/bootstrap-icons.min.css',
+        'integrity': None,
+    },
+    'leaflet.css': {
+        'url': 'https://unpkg.com/leaflet@1.9.4/dist/leaflet.css',
+        'path': 'vendor/leaflet/1.9.4/leaflet.css',
+        'integrity': 'sha256-p4NxAoJBhIIN+hmNHrzRCf9tD/miZyoHS5obTRR9BMY=',
+    },
+    'leaflet.js': {
+        'url': 'https://unpkg.com/leaflet@1.9.4/dist/leaflet.js',
+        'path': 'vendor/leaflet/1.9.4/leaflet.js',
+        'integrity': 'sha256-20nQCchB9co0qIjJZRGuk2/Z9VM+kNiyxNV1lvTlZBo=',
+    },
+    'leaflet-heat.js': {
+        'url': 'https://unpkg.com/leaflet.heat@0.2.0/dist/leaflet-heat.js',
+        'path': 'vendor/leaflet.heat/0.2.0/leaflet-heat.js',
+        'integrity': None,
+    },
+    'qrcode.js': {
+        'url': 'https://cdn.jsdelivr.net/npm/qrcodejs@1.0.0/qrcode.min.js',
+        'path': 'vendor/qrcodejs/1.0.0/qrcode.min.js',
+        'integrity': None,
+    },
+}
+
+
+@lru_cache(maxsize=None)
+def is_vendored(name: str) -> bool:
+    """
+    Returns whether the named asset has been downloaded into the static files.
+
+    Args:
+        name: Key in VENDOR_ASSETS
+
+    Returns:
+        True if a static files finder locates the asset's local path
+    """
+    return finders.find(VENDOR_ASSETS[name]['path']) is not None
@@ -0,0 +1,68 @@
+"""
+Static files storage: content-hashed names plus precompressed copies.
+
+collectstatic writes each file under a name containing its content hash (so
+it can be cached forever) and, for text formats, a .gz sibling and, when the
+brotli package is installed, a .br sibling. Servers that support precompressed
+files (WhiteNoise, nginx gzip_static/brotli_static) send those directly
+instead of compressing on every request.
+"""
+import gzip
+import logging
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip copies are always written
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_EXTENSIONS = {
+    '.css', '.js', '.mjs', '.map', '.json', '.svg', '.txt', '.html', '.xml', '.ico', '.ttf', '.eot', '.otf',
+}
+
+
+class PrecompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage that also writes .gz (and .br) copies of text files."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        names = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            yield name, hashed_name, processed
+            if not isinstance(processed, Exception):
+                names.add(name)
+                if hashed_name:
+                    names.add(hashed_name)
+
+        if dry_run:
+            return
+        for name in sorted(names):
+            for compressed_name in self._compress(name):
+                yield name, compressed_name, True
+
+    def _compress(self, name):
+        """Writes the compressed copies of one collected file; returns their names."""
+        if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTENSIONS or not self.exists(name):
+            return []
+        with self.open(name) as f:
+            content = f.read()
+        if len(content) < getattr(settings, 'STATIC_PRECOMPRESS_MIN_SIZE', 256):
+            return []
+
+        written = []
+        encoders = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            encoders.append(('.br', lambda data: brotli.compress(data, quality=11)))
+        for suffix, encode in encoders:
+            compressed = encode(content)
+            # Not worth serving if it barely shrinks
+            if len(compressed) >= len(content) * 0.95:
+                continue
+            with open(self.path(name) + suffix, 'wb') as f:
+                f.write(compressed)
+            written.append(name + suffix)
+        return written
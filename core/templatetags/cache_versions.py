@@ -0,0 +1,17 @@
+from django import template
+
+from ..services.view_cache import get_versions
+
+register = template.Library()
+
+
+@register.simple_tag
+def cache_version(*objects):
+    """
+    Returns the combined version token for (kind, pk) pairs, for {% cache %} keys.
+    The tokens change whenever a model save invalidates the objects (see core/signals.py).
+    Usage: {% cache_version 'session' session.pk 'reference' 'all' as version %}
+    """
+    if len(objects) % 2:
+        raise template.TemplateSyntaxError("cache_version takes (kind, pk) pairs")
+    return get_versions(zip(objects[::2], objects[1::2]))
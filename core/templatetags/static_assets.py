@@ -0,0 +1,30 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html
+
+from ..static_assets import VENDOR_ASSETS, is_vendored
+
+register = template.Library()
+
+
+@register.simple_tag
+def vendor_asset(name):
+    """
+    Renders the <link> or <script> tag for a pinned third-party asset.
+    Uses the local static copy when it has been vendored, else the CDN.
+    Usage: {% vendor_asset 'leaflet.js' %}
+    """
+    try:
+        asset = VENDOR_ASSETS[name]
+    except KeyError:
+        raise template.TemplateSyntaxError(f"Unknown vendor asset '{name}'")
+
+    if is_vendored(name):
+        url, integrity = static(asset['path']), None
+    else:
+        url, integrity = asset['url'], asset['integrity']
+
+    sri = format_html(' integrity="{}" crossorigin="anonymous"', integrity) if integrity else ''
+    if name.endswith('.css'):
+        return format_html('<link rel="stylesheet" href="{}"{}>', url, sri)
+    return format_html('<script src="{}"{}></script>', url, sri)
@@ -1,3 +1,1336 @@
-from django.test import TestCase
+import contextlib
+import importlib.util
+import io
+import math
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
 
-# Create your tests here.
+import requests
+
+import numpy as np
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.backends.signals import connection_created
+from django.template import Context, Template, TemplateSyntaxError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import views
+from .models import (
+    CadastralBoundary, Disease, Farm, Grower, ImageBlob, Observation, ObservationImage, Pest, PlantType, Region,
+    SurveySession
+)
+from .services import (
+    address_cache, api_metrics, boundary_service, circuit_breaker, draft_service, farm_import_service, geofence_service,
+    geoscape_service, http_client, route_service, sampling_service, single_flight
+)
+from .services.farm_import_service import RateLimiter, import_farms
+from .services.heatmap_service import bin_observations, get_farm_heatmap, get_session_heatmap
+from .services.hotspot_service import binomial_upper_tail, detect_hotspots
+from .services.image_storage_service import store_file_at_path, store_uploaded_image
+from .services.session_events import build_progress_snapshot, iter_session_events, publish_session_event
+from .services.session_summary_service import build_session_summary, get_session_summary
+from .services.upload_service import append_chunk, commit_upload, start_upload
+from .services.view_cache import bump_version
+from .spatial_index import filter_bbox, latlon_to_quadkey, latlon_to_quadkeys
+
+PARCEL = {
+    'type': 'Polygon',
+    'coordinates': [[[130.0, -12.0], [130.01, -12.0], [130.01, -12.01], [130.0, -12.01], [130.0, -12.0]]],
+}
+
+
+class GrowerTestMixin:
+    """Creates a logged-in grower with one farm."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('grower', password='secret')
+        self.grower = Grower.objects.create(user=self.user, farm_name='Test Farm')
+        self.farm = Farm.objects.create(owner=self.grower, name='Test Farm', geoscape_address_id='GANT_TEST')
+        self.client.force_login(self.user)
+
+    def add_observation(self, session, lat, lon, pests=(), diseases=(), **fields):
+        observation = Observation.objects.create(
+            session=session, latitude=lat, longitude=lon, status='completed', **fields
+        )
+        observation.pests_observed.add(*pests)
+        observation.diseases_observed.add(*diseases)
+        return observation
+
+    def get_cached_page(self, url):
+        # The first response sets the CSRF cookie, which is part of the cache key
+        self.get_page(url)
+        return self.get_page(url)
+
+    def get_page(self, url):
+        # Views print debug output
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = self.client.get(url, HTTP_USER_AGENT='iphone')
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+
+@override_settings(BOUNDARY_FETCH_IN_BACKGROUND=False)
+class BoundaryJobCacheTests(GrowerTestMixin, TestCase):
+
+    def test_cached_pending_page_shows_boundary_after_job(self):
+        url = reverse('core:farm_detail', args=[self.farm.id])
+        with self.captureOnCommitCallbacks() as callbacks:
+            boundary_service.request_cadastral_boundary(self.farm)
+        self.assertIn('Retrieving the cadastral boundary', self.get_cached_page(url))
+
+        with mock.patch.object(boundary_service, 'get_cadastral_boundary', return_value=PARCEL):
+            for callback in callbacks:
+                callback()
+
+        self.farm.refresh_from_db()
+        self.assertEqual(self.farm.boundary_status, 'ok')
+        page = self.get_page(url)
+        self.assertNotIn('Retrieving the cadastral boundary', page)
+        self.assertIn('130.01', page)
+
+    def test_cached_pending_page_shows_failure(self):
+        url = reverse('core:farm_detail', args=[self.farm.id])
+        with self.captureOnCommitCallbacks() as callbacks:
+            boundary_service.request_cadastral_boundary(self.farm)
+        self.get_cached_page(url)
+
+        with mock.patch.object(boundary_service, 'get_cadastral_boundary', return_value=None):
+            for callback in callbacks:
+                callback()
+
+        page = self.get_page(url)
+        self.assertNotIn('Retrieving the cadastral boundary', page)
+        self.assertIn('could not be retrieved automatically', page)
+
+
+class DraftStoreTests(GrowerTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.session = SurveySession.objects.create(farm=self.farm, surveyor=self.user, status='in_progress')
+        draft_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(draft_dir.cleanup)
+        self.draft_dir = draft_dir.name
+
+    def test_store_selection(self):
+        for setting, expected in (('database', 'database'), ('cache', 'cache'), ('file', 'file'), ('redis', 'database')):
+            with self.subTest(setting), override_settings(DRAFT_STORE=setting):
+                self.assertEqual(draft_service.get_draft_store(), expected)
+                self.assertEqual(draft_service.drafts_buffered(), expected != 'database')
+
+    def test_buffered_stores_round_trip(self):
+        for store in ('cache', 'file'):
+            with self.subTest(store), override_settings(DRAFT_STORE=store, DRAFT_STORE_DIR=self.draft_dir):
+                draft_service.save_draft(self.session, self.user, {'notes': 'first', 'latitude': '-12.4'})
+                draft_service.save_draft(self.session, self.user, {'notes': 'second', 'extra': 'dropped'})
+                draft = draft_service.load_draft(self.session, self.user)
+                self.assertEqual(draft['notes'], 'second')
+                self.assertIsNone(draft['latitude'])
+                self.assertNotIn('extra', draft)
+                draft_service.discard_draft(self.session, self.user)
+                self.assertIsNone(draft_service.load_draft(self.session, self.user))
+
+    @override_settings(DRAFT_STORE='cache')
+    def test_autosave_does_not_write_observation_rows(self):
+        response = self.client.post(reverse('core:api_auto_save_observation'), {
+            'session_id': self.session.session_id, 'latitude': '-12.46', 'longitude': '130.84', 'notes': 'Leaf spots',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Observation.objects.exists())
+        self.assertEqual(draft_service.load_draft(self.session, self.user)['notes'], 'Leaf spots')
+
+
+class SessionEventStreamTests(GrowerTestMixin, TestCase):
+
+    def test_observations_around_the_snapshot_are_sent_once(self):
+        session = SurveySession.objects.create(farm=self.farm, surveyor=self.user, status='in_progress')
+
+        def commit(lat):
+            observation = self.add_observation(session, lat, '130.84')
+            publish_session_event(session.session_id, 'observation', {'observation_id': observation.id}, observation.id)
+            return observation
+
+        def get_snapshot():
+            # One observation commits before the snapshot is read and one after
+            commit('-12.46')
+            snapshot = build_progress_snapshot(session)
+            self.later = commit('-12.47')
+            return snapshot
+
+        events = iter_session_events(session.session_id, get_snapshot)
+        self.addCleanup(events.close)
+        self.assertEqual(next(events), 'retry: 3000\n\n')
+        self.assertIn('"observation_count": 1', next(events))
+        self.assertEqual(next(events).splitlines()[:2], [f'id: {self.later.id}', 'event: observation'])
+
+
+class SessionSummaryTests(GrowerTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Farm 1 shows generated demo data, so use a farm that never has that id
+        farm = Farm.objects.create(owner=self.grower, name='Second Farm')
+        self.session = SurveySession.objects.create(farm=farm, surveyor=self.user, status='completed')
+        self.pest = Pest.objects.create(name='Pest A')
+        self.observation = self.add_observation(self.session, '-12.5', '130.9', [self.pest])
+        self.add_observation(self.session, '-12.4', '130.8')
+        self.add_observation(self.session, '-13.0', '131.5', outside_boundary=True)
+
+    def test_summary_counts_and_mapped_extent(self):
+        summary = build_session_summary(self.session)
+        self.assertEqual(summary.observation_count, 3)
+        self.assertEqual(summary.unique_pests, [{'id': self.pest.id, 'name': 'Pest A'}])
+        self.assertEqual(summary.bbox, [-12.5, 130.8, -12.4, 130.9])
+
+    def test_summary_is_rebuilt_after_observations_change(self):
+        build_session_summary(self.session)
+
+        self.observation.pests_observed.clear()
+        self.session.refresh_from_db()
+        self.assertEqual(get_session_summary(self.session).unique_pests, [])
+
+        extra = self.add_observation(self.session, '-12.3', '130.9')
+        self.session.refresh_from_db()
+        self.assertEqual(get_session_summary(self.session).bbox, [-12.5, 130.8, -12.3, 130.9])
+
+        extra.delete()
+        self.session.refresh_from_db()
+        self.assertEqual(get_session_summary(self.session).observation_count, 3)
+
+    def test_completed_page_uses_summary_extent(self):
+        build_session_summary(self.session)
+        url = reverse('core:survey_session_detail', args=[self.session.session_id])
+        with mock.patch.object(views, 'filter_observations') as filter_observations:
+            page = self.get_page(url)
+        filter_observations.assert_not_called()
+        self.assertIn('[[-12.5, 130.8], [-12.4, 130.9]]', page)
+
+
+@override_settings(BOUNDARY_FETCH_IN_BACKGROUND=False)
+class BoundaryJobTests(GrowerTestMixin, TestCase):
+
+    def run_job(self, geometry):
+        with mock.patch.object(boundary_service, 'get_cadastral_boundary', return_value=geometry) as fetch:
+            with self.captureOnCommitCallbacks(execute=True):
+                queued = boundary_service.request_cadastral_boundary(self.farm)
+        self.assertTrue(queued)
+        self.farm.refresh_from_db()
+        return fetch
+
+    def get_status(self):
+        url = reverse('core:api_farm_boundary_status', args=[self.farm.id])
+        return self.client.get(url).json()
+
+    def make_pending(self, minutes_ago):
+        Farm.objects.filter(pk=self.farm.pk).update(
+            boundary_status='pending', boundary_status_updated=timezone.now() - timedelta(minutes=minutes_ago)
+        )
+
+    def test_success_saves_the_boundary(self):
+        self.run_job(PARCEL).assert_called_once_with('GANT_TEST')
+        self.assertEqual(self.farm.boundary_status, 'ok')
+        self.assertEqual(self.farm.boundary, PARCEL)
+
+    def test_failure_is_recorded(self):
+        self.run_job(None)
+        self.assertEqual(self.farm.boundary_status, 'failed')
+        self.assertIsNone(self.farm.boundary)
+
+    def test_stale_pending_job_is_requeued_when_status_is_read(self):
+        self.make_pending(minutes_ago=60)
+        with mock.patch.object(boundary_service, 'get_cadastral_boundary', return_value=PARCEL) as fetch:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.get_status()
+        fetch.assert_called_once_with('GANT_TEST')
+        self.assertEqual(self.get_status()['boundary_status'], 'ok')
+
+    def test_recent_pending_job_is_left_running(self):
+        self.make_pending(minutes_ago=1)
+        with mock.patch.object(boundary_service, 'get_cadastral_boundary') as fetch:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(self.get_status()['boundary_status'], 'pending')
+        fetch.assert_not_called()
+
+    def test_sweep_command_retries_stale_jobs(self):
+        self.make_pending(minutes_ago=60)
+        with mock.patch.object(boundary_service, 'get_cadastral_boundary', return_value=None):
+            call_command('fetch_farm_boundaries', stdout=io.StringIO())
+        self.farm.refresh_from_db()
+        self.assertEqual(self.farm.boundary_status, 'failed')
+
+
+@override_settings(CADASTRAL_REVALIDATE_IN_BACKGROUND=False)
+class CadastralBoundaryCacheTests(TestCase):
+
+    def fetch_result(self, geometry=PARCEL, not_modified=False, etag='"v1"', max_age=None):
+        return {
+            'not_modified': not_modified, 'geometry': geometry, 'etag': etag,
+            'last_modified': 'Mon, 05 Oct 2026 00:00:00 GMT', 'max_age': max_age,
+        }
+
+    def fetch(self, **result):
+        return mock.patch.object(
+            boundary_service, 'fetch_cadastral_boundary_conditional', return_value=self.fetch_result(**result)
+        )
+
+    def expire(self):
+        CadastralBoundary.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+    def test_miss_fetches_and_stores(self):
+        with self.fetch(max_age=3600) as fetch:
+            self.assertEqual(boundary_service.get_cadastral_boundary('GANT_1'), PARCEL)
+        fetch.assert_called_once_with('GANT_1')
+        entry = CadastralBoundary.objects.get(geoscape_address_id='GANT_1')
+        self.assertEqual(entry.etag, '"v1"')
+        self.assertFalse(entry.is_expired())
+        self.assertLess(entry.expires_at, timezone.now() + timedelta(hours=2))
+
+    def test_hit_does_not_fetch(self):
+        with self.fetch():
+            boundary_service.get_cadastral_boundary('GANT_1')
+        with self.fetch() as fetch:
+            self.assertEqual(boundary_service.get_cadastral_boundary('GANT_1'), PARCEL)
+        fetch.assert_not_called()
+
+    def test_failed_miss_is_not_cached(self):
+        with mock.patch.object(boundary_service, 'fetch_cadastral_boundary_conditional', return_value=None):
+            self.assertIsNone(boundary_service.get_cadastral_boundary('GANT_1'))
+        self.assertFalse(CadastralBoundary.objects.exists())
+
+    def test_expired_entry_is_served_then_revalidated(self):
+        with self.fetch():
+            boundary_service.get_cadastral_boundary('GANT_1')
+        self.expire()
+        with self.fetch(geometry=None, not_modified=True) as fetch:
+            self.assertEqual(boundary_service.get_cadastral_boundary('GANT_1'), PARCEL)
+        fetch.assert_called_once_with('GANT_1', '"v1"', 'Mon, 05 Oct 2026 00:00:00 GMT')
+        entry = CadastralBoundary.objects.get()
+        self.assertFalse(entry.is_expired())
+        self.assertEqual(entry.geometry, PARCEL)
+
+    def test_changed_boundary_replaces_geometry(self):
+        moved = {**PARCEL, 'coordinates': [[[131.0, -12.0], [131.01, -12.0], [131.0, -12.01], [131.0, -12.0]]]}
+        with self.fetch():
+            boundary_service.get_cadastral_boundary('GANT_1')
+        self.expire()
+        with self.fetch(geometry=moved, etag='"v2"'):
+            self.assertTrue(boundary_service.revalidate_cadastral_boundary('GANT_1'))
+        entry = CadastralBoundary.objects.get()
+        self.assertEqual(entry.geometry, moved)
+        self.assertEqual(entry.etag, '"v2"')
+
+    def test_failed_revalidation_keeps_entry(self):
+        with self.fetch():
+            boundary_service.get_cadastral_boundary('GANT_1')
+        self.expire()
+        with mock.patch.object(boundary_service, 'fetch_cadastral_boundary_conditional', return_value=None):
+            self.assertFalse(boundary_service.revalidate_cadastral_boundary('GANT_1'))
+        entry = CadastralBoundary.objects.get()
+        self.assertEqual(entry.geometry, PARCEL)
+        self.assertTrue(entry.is_expired())
+
+
+class HeatmapTests(GrowerTestMixin, TestCase):
+
+    def test_binning_sums_weights_per_cell(self):
+        # Two findings a metre apart share a cell; the third is ~100 m north
+        heatmap = bin_observations([-12.0, -12.00001, -11.999], [130.0, 130.0, 130.0], [2, 1, 4], cell_size_m=10)
+        self.assertEqual(heatmap['max'], 4.0)
+        self.assertEqual(sorted(weight for _, _, weight in heatmap['cells']), [3.0, 4.0])
+        self.assertEqual(heatmap['bounds'][:3], [-12.00001, 130.0, -11.999])
+        self.assertEqual(bin_observations([], [], [])['cells'], [])
+
+    def test_grid_is_rebuilt_when_findings_or_flags_change(self):
+        session = SurveySession.objects.create(farm=self.farm, surveyor=self.user)
+        pest = Pest.objects.create(name='Pest A')
+        disease = Disease.objects.create(name='Disease A')
+        observation = self.add_observation(session, '-12.46', '130.84', [pest], [disease])
+        self.add_observation(session, '-12.47', '130.85', [pest])
+        self.assertEqual(get_session_heatmap(session)['max'], 2.0)
+
+        observation.diseases_observed.remove(disease)
+        self.assertEqual(get_session_heatmap(session)['max'], 1.0)
+        self.assertEqual(len(get_farm_heatmap(self.farm)['cells']), 2)
+
+        observation.outside_boundary = True
+        observation.save()
+        self.assertEqual(len(get_session_heatmap(session)['cells']), 1)
+        self.assertEqual(get_farm_heatmap(self.farm)['observation_count'], 1)
+
+
+class HotspotDetectionTests(TestCase):
+
+    def random_points(self, seed, n=20_000, rate=0.1):
+        rng = np.random.default_rng(seed)
+        lats = -12.5 + rng.random(n) * 0.02
+        lons = 130.9 + rng.random(n) * 0.02
+        findings = (rng.random(n) < rate).astype(int)
+        return lats, lons, findings, rng
+
+    def test_binomial_upper_tail_is_exact(self):
+        tails = binomial_upper_tail(np.array([0, 1, 2, 3]), np.array([3, 3, 3, 3]), 0.5)
+        np.testing.assert_allclose(tails, [1.0, 7 / 8, 4 / 8, 1 / 8])
+
+    def test_random_findings_give_no_hotspots(self):
+        for seed in range(5):
+            lats, lons, findings, _ = self.random_points(seed)
+            result = detect_hotspots(lats, lons, findings)
+            self.assertEqual(result['features'], [], f"seed {seed}")
+
+    def test_planted_cluster_is_found(self):
+        lats, lons, findings, rng = self.random_points(1)
+        cluster = (np.abs(lats + 12.49) < 0.001) & (np.abs(lons - 130.91) < 0.001)
+        findings[cluster] = rng.random(cluster.sum()) < 0.6
+
+        features = detect_hotspots(lats, lons, findings)['features']
+        self.assertTrue(features)
+        ring = np.array(features[0]['geometry']['coordinates'][0])
+        self.assertTrue(ring[:, 1].min() < -12.49 < ring[:, 1].max())
+        self.assertTrue(ring[:, 0].min() < 130.91 < ring[:, 0].max())
+
+    def test_unsurveyed_cells_are_not_counted_as_clean(self):
+        # A block of surveyed points, all at the same positive rate, in a large
+        # empty area: nothing stands out from the other surveyed cells
+        lats, lons, findings, _ = self.random_points(2, n=5_000, rate=0.3)
+        lats = np.concatenate([lats * 0.1 - 11.25, [-12.5, -12.3]])
+        lons = np.concatenate([lons * 0.1 + 117.81, [130.9, 131.1]])
+        findings = np.concatenate([findings, [0, 0]])
+        self.assertEqual(detect_hotspots(lats, lons, findings, cell_size_m=5)['features'], [])
+
+
+class SamplingPlanTests(GrowerTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.boundary = geofence_service.PreparedBoundary(PARCEL)
+
+    def test_halton_sequence(self):
+        np.testing.assert_allclose(sampling_service.halton(np.arange(1, 5), 2), [0.5, 0.25, 0.75, 0.125])
+        np.testing.assert_allclose(sampling_service.halton(np.arange(1, 4), 3), [1 / 3, 2 / 3, 1 / 9])
+
+    def test_points_are_deterministic_and_inside_the_boundary(self):
+        points = sampling_service.generate_sampling_points(self.boundary, 50, start_index=17)
+        self.assertEqual(len(points), 50)
+        self.assertEqual(points, sampling_service.generate_sampling_points(self.boundary, 50, start_index=17))
+        self.assertNotEqual(points, sampling_service.generate_sampling_points(self.boundary, 50, start_index=18))
+        lats, lons = zip(*points)
+        self.assertTrue(self.boundary.contains_many(lats, lons).all())
+
+    def test_plan_records_its_start_index(self):
+        self.farm.boundary = PARCEL
+        self.farm.save()
+        plan = sampling_service.build_sampling_plan(self.farm, 20)
+        self.assertEqual(len(plan['points']), 20)
+        self.assertEqual(
+            plan['points'], sampling_service.generate_sampling_points(self.boundary, 20, plan['start_index'])
+        )
+        self.assertIsNone(sampling_service.build_sampling_plan(self.farm, 0))
+
+
+class WalkingRouteTests(GrowerTestMixin, TestCase):
+
+    def random_points(self, n, seed=0):
+        rng = np.random.default_rng(seed)
+        return np.column_stack((-12.5 + rng.random(n) * 0.01, 130.9 + rng.random(n) * 0.01)).tolist()
+
+    def test_route_visits_every_point_once(self):
+        for n in (0, 1, 2, 3, 10, 400):
+            with self.subTest(n=n):
+                route = route_service.order_route(self.random_points(n), time_limit=0.05)
+                self.assertEqual(sorted(route), list(range(n)))
+
+    def test_route_starts_nearest_the_surveyor_and_follows_a_line(self):
+        # Points along one row, shuffled; the best path walks the row end to end
+        points = [[-12.5, 130.9 + i * 0.0001] for i in (4, 0, 7, 2, 9, 5, 1, 8, 3, 6)]
+        route = route_service.order_route(points, start=[-12.5, 130.8999])
+        self.assertEqual([points[i][1] for i in route], sorted(p[1] for p in points))
+
+    def test_improvement_never_lengthens_the_tour(self):
+        points = self.random_points(300, seed=1)
+        xs, ys = route_service._project(points)
+        greedy = route_service._nearest_neighbour_tour(route_service._Grid(xs, ys), 0)
+        improved = route_service.order_route(points, time_limit=0.5)
+        self.assertLessEqual(
+            route_service._path_length(improved, xs, ys), route_service._path_length(greedy, xs, ys) + 1e-6
+        )
+
+    def test_next_target_skips_visited_points(self):
+        points = [[-12.5, 130.9 + i * 0.001] for i in range(3)]
+        session = SurveySession.objects.create(
+            farm=self.farm, surveyor=self.user, status='in_progress',
+            sampling_plan={'points': points, 'route': [0, 1, 2]}
+        )
+        self.assertEqual(route_service.get_next_target(session)['index'], 0)
+        # An observation within a couple of metres of the first target
+        self.add_observation(session, '-12.500010', '130.900010')
+        target = route_service.get_next_target(session)
+        self.assertEqual((target['index'], target['step'], target['remaining']), (1, 2, 2))
+
+
+class AddressSuggestionCacheTests(TestCase):
+
+    def setUp(self):
+        self.now = 100.0
+        clock = mock.patch.object(address_cache.time, 'monotonic', side_effect=lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        lru = address_cache.LRUTTLCache(maxsize=2, ttl=60)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        self.assertEqual(lru.get('a'), 1)
+        lru.set('c', 3)
+        self.assertEqual((lru.get('a'), lru.get('b'), lru.get('c')), (1, None, 3))
+
+    def test_entries_expire_after_ttl(self):
+        lru = address_cache.LRUTTLCache(maxsize=2, ttl=60)
+        lru.set('a', 1)
+        self.now += 59
+        self.assertEqual(lru.get('a'), 1)
+        self.now += 2
+        self.assertIsNone(lru.get('a'))
+        self.assertEqual(len(lru), 0)
+
+    def test_complete_prefix_answers_longer_queries(self):
+        suggestions = address_cache.SuggestionCache(maxsize=10, ttl=60)
+        found = [{'address': '1 Smith St, Darwin City NT'}, {'address': '1 Smithfield Rd, Parap NT'}]
+        suggestions.put('1 smi', 'NT', found, complete=True)
+        self.assertEqual(suggestions.get('1 Smith  St,', 'NT'), found[:1])
+        self.assertIsNone(suggestions.get('1 Smith St', 'QLD'))
+
+    def test_truncated_prefix_is_not_filtered(self):
+        suggestions = address_cache.SuggestionCache(maxsize=10, ttl=60)
+        suggestions.put('1 smi', 'NT', [{'address': '1 Smith St, Darwin City NT'}], complete=False)
+        self.assertIsNone(suggestions.get('1 smith', 'NT'))
+        self.assertIsNotNone(suggestions.get('1 smi', 'NT'))
+
+
+class SingleFlightTests(TestCase):
+
+    def setUp(self):
+        self.flight = single_flight.SingleFlight('test')
+        self.release = threading.Event()
+        self.runs = 0
+
+    def slow_call(self, result='parcel'):
+        def call():
+            self.runs += 1
+            self.release.wait(5)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        return call
+
+    def run_concurrently(self, calls):
+        """Runs (key, fn) pairs in threads; the first is the leader the rest arrive behind."""
+        outcomes = [None] * len(calls)
+
+        def run(i, key, fn):
+            try:
+                outcomes[i] = self.flight.do(key, fn)
+            except Exception as e:
+                outcomes[i] = e
+
+        threads = [threading.Thread(target=run, args=(i, key, fn)) for i, (key, fn) in enumerate(calls)]
+        threads[0].start()
+        while not self.flight.in_flight():
+            time.sleep(0.001)
+        for thread in threads[1:]:
+            thread.start()
+        deadline = time.monotonic() + 5
+        while self.flight.coalesced + self.flight.executed < len(calls) and time.monotonic() < deadline:
+            time.sleep(0.001)
+        self.release.set()
+        for thread in threads:
+            thread.join(5)
+        return outcomes
+
+    def test_identical_calls_share_one_execution(self):
+        outcomes = self.run_concurrently([('GANT_1', self.slow_call())] * 4)
+        self.assertEqual(outcomes, ['parcel'] * 4)
+        self.assertEqual(self.runs, 1)
+        self.assertEqual(self.flight.snapshot(), {'executed': 1, 'coalesced': 3, 'in_flight': 0})
+
+    def test_different_keys_run_separately(self):
+        outcomes = self.run_concurrently([('GANT_1', self.slow_call('a')), ('GANT_2', self.slow_call('b'))])
+        self.assertEqual(outcomes, ['a', 'b'])
+        self.assertEqual(self.runs, 2)
+
+    def test_error_is_raised_in_every_waiter(self):
+        error = requests.ConnectionError('down')
+        outcomes = self.run_concurrently([('GANT_1', self.slow_call(error))] * 3)
+        self.assertEqual(outcomes, [error] * 3)
+        self.assertEqual(self.runs, 1)
+
+    def test_results_are_not_kept_after_the_call(self):
+        self.release.set()
+        self.flight.do('GANT_1', self.slow_call())
+        self.flight.do('GANT_1', self.slow_call())
+        self.assertEqual(self.runs, 2)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers with the server's scripted (status, headers, delay) responses, then 200s."""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.respond()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.respond()
+
+    def respond(self):
+        self.server.received.append((self.command, self.path, self.client_address))
+        status, headers, delay = self.server.script.pop(0) if self.server.script else (200, {}, 0)
+        if delay:
+            threading.Event().wait(delay)
+        body = b'' if status == 304 else b'{"ok": true}'
+        try:
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServerMixin:
+    """Runs a StubHandler server on a free local port."""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        self.server.received = []
+        self.server.script = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def make_client(self, **kwargs):
+        client = http_client.PooledHttpClient(f"http://127.0.0.1:{self.server.server_port}", **kwargs)
+        self.addCleanup(client.close)
+        return client
+
+
+class PooledHttpClientTests(StubServerMixin, TestCase):
+
+    def test_connection_is_reused_across_calls(self):
+        client = self.make_client()
+        for _ in range(3):
+            self.assertEqual(client.get('/ping').status_code, 200)
+        self.assertEqual(len(self.server.received), 3)
+        self.assertEqual(len({address for _, _, address in self.server.received}), 1)
+
+    @mock.patch.object(http_client.time, 'sleep')
+    def test_retries_503(self, sleep):
+        self.server.script = [(503, {}, 0)]
+        client = self.make_client(backoff_base=0.5)
+        self.assertEqual(client.get('/flaky').status_code, 200)
+        self.assertEqual(len(self.server.received), 2)
+        sleep.assert_called_once()
+        self.assertLessEqual(sleep.call_args[0][0], 0.5)
+
+    @mock.patch.object(http_client.time, 'sleep')
+    def test_retry_after_is_honoured_and_capped(self, sleep):
+        self.server.script = [(429, {'Retry-After': '2'}, 0), (429, {'Retry-After': '60'}, 0)]
+        client = self.make_client(backoff_max=5.0)
+        self.assertEqual(client.get('/limited').status_code, 200)
+        self.assertEqual(len(self.server.received), 3)
+        self.assertEqual([c[0][0] for c in sleep.call_args_list], [2.0, 5.0])
+
+    @mock.patch.object(http_client.time, 'sleep')
+    def test_gives_up_after_max_retries(self, sleep):
+        self.server.script = [(503, {}, 0)] * 5
+        client = self.make_client(max_retries=2)
+        self.assertEqual(client.get('/down').status_code, 503)
+        self.assertEqual(len(self.server.received), 3)
+        self.assertEqual(sleep.call_count, 2)
+
+    @mock.patch.object(http_client.time, 'sleep')
+    def test_post_is_not_retried(self, sleep):
+        self.server.script = [(503, {}, 0)]
+        client = self.make_client()
+        self.assertEqual(client.request('POST', '/submit', json={'a': 1}).status_code, 503)
+        self.assertEqual([method for method, _, _ in self.server.received], ['POST'])
+        sleep.assert_not_called()
+
+    def test_connect_and_read_timeouts_are_separate(self):
+        client = self.make_client(connect_timeout=2.0, read_timeout=0.2, max_retries=0)
+        with mock.patch.object(client.session, 'request', wraps=client.session.request) as send:
+            self.assertEqual(client.get('/fast').status_code, 200)
+        self.assertEqual(send.call_args.kwargs['timeout'], (2.0, 0.2))
+
+        self.server.script = [(200, {}, 1.0)]
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            client.get('/slow')
+
+
+class CircuitBreakerTests(TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        clock = mock.patch.object(circuit_breaker.time, 'monotonic', side_effect=lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+        self.breaker = circuit_breaker.CircuitBreaker(
+            'test', failure_threshold=3, latency_threshold=1.0, reset_timeout=30.0
+        )
+
+    def trip(self):
+        for _ in range(3):
+            self.assertTrue(self.breaker.allow_request())
+            self.breaker.record_failure(0.1)
+
+    def test_consecutive_failures_open_the_breaker(self):
+        self.breaker.record_failure(0.1)
+        self.breaker.record_success(0.1)
+        self.trip()
+        self.assertEqual(self.breaker.state, circuit_breaker.STATE_OPEN)
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_half_open_probe_closes_or_reopens(self):
+        self.trip()
+        self.now += 30
+        self.assertEqual(self.breaker.state, circuit_breaker.STATE_HALF_OPEN)
+        self.assertTrue(self.breaker.allow_request())
+        # Only one probe at a time
+        self.assertFalse(self.breaker.allow_request())
+        self.breaker.record_failure(0.1)
+        self.assertEqual(self.breaker.state, circuit_breaker.STATE_OPEN)
+
+        self.now += 30
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record_success(0.1)
+        self.assertEqual(self.breaker.state, circuit_breaker.STATE_CLOSED)
+
+    def test_slow_calls_open_the_breaker(self):
+        for _ in range(circuit_breaker.MIN_LATENCY_SAMPLES):
+            self.breaker.record_success(2.0)
+        self.assertEqual(self.breaker.state, circuit_breaker.STATE_OPEN)
+        self.assertIn('p95 latency', self.breaker.snapshot()['open_reason'])
+
+    def test_success_while_open_is_ignored(self):
+        self.trip()
+        self.breaker.record_success(5.0)
+        snapshot = self.breaker.snapshot()
+        self.assertEqual(snapshot['state'], circuit_breaker.STATE_OPEN)
+        self.assertEqual(snapshot['recent_samples'], 0)
+
+
+class ApiMetricsTests(StubServerMixin, TestCase):
+
+    @mock.patch.object(http_client.time, 'sleep')
+    def test_every_attempt_counts_against_the_quota(self, sleep):
+        cache.clear()
+        metrics = api_metrics.ApiMetrics('stub')
+        self.server.script = [(503, {}, 0), (503, {}, 0)]
+        client = self.make_client(metrics=metrics)
+        self.assertEqual(client.get('/flaky').status_code, 200)
+
+        endpoint = metrics.snapshot()['endpoints']['/flaky']
+        self.assertEqual(endpoint['calls'], 1)
+        self.assertEqual(endpoint['quota'], {'today': 3, 'this_month': 3})
+
+
+def tile_for(lat, lon, z):
+    n = 2 ** z
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n)
+    return z, x, y
+
+
+class ObservationTileTests(GrowerTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.session = SurveySession.objects.create(farm=self.farm, surveyor=self.user)
+        self.pest_a = Pest.objects.create(name='Pest A')
+        self.pest_b = Pest.objects.create(name='Pest B')
+        self.disease = Disease.objects.create(name='Disease A')
+        self.observation = self.add_observation(
+            self.session, '-12.460000', '130.840000', [self.pest_a, self.pest_b], [self.disease]
+        )
+        self.add_observation(self.session, '-12.460100', '130.840100')
+
+    def get_tile(self, z, **params):
+        url = reverse('core:api_observation_tile', args=tile_for(-12.46, 130.84, z))
+        response = self.client.get(url, {'farm': self.farm.id, **params})
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_pest_filter_still_counts_every_finding(self):
+        features = self.get_tile(10, pest=self.pest_a.id).json()['features']
+        self.assertEqual(len(features), 1)
+        self.assertEqual(features[0]['properties']['point_count'], 1)
+        self.assertEqual(features[0]['properties']['findings'], 3)
+
+    def test_tile_changes_when_findings_are_edited(self):
+        first = self.get_tile(10)
+        self.assertEqual(first.json()['features'][0]['properties']['findings'], 3)
+
+        self.observation.pests_observed.remove(self.pest_b)
+        second = self.get_tile(10)
+        self.assertNotEqual(first['ETag'], second['ETag'])
+        self.assertEqual(second.json()['features'][0]['properties']['findings'], 2)
+
+    def test_tile_changes_when_a_pest_is_renamed(self):
+        before = self.get_tile(18).json()['features']
+        self.pest_a.name = 'Renamed pest'
+        self.pest_a.save()
+        after = self.get_tile(18).json()['features']
+        self.assertNotEqual(before, after)
+        self.assertIn('Renamed pest', {name for f in after for name in f['properties']['pests']})
+
+    def test_session_detail_does_not_embed_observations(self):
+        # Farm 1 shows generated demo data, so use a farm that never has that id
+        farm = Farm.objects.create(owner=self.grower, name='Second Farm')
+        session = SurveySession.objects.create(farm=farm, surveyor=self.user)
+        self.add_observation(session, '-12.5', '130.9')
+        page = self.get_page(reverse('core:survey_session_detail', args=[session.session_id]))
+        self.assertNotIn('id="observation-coords-data"', page)
+        self.assertIn('[[-12.5, 130.9], [-12.5, 130.9]]', page)
+
+
+class BulkWriteInvalidationTests(GrowerTestMixin, TestCase):
+    """Writes that bypass model signals must still invalidate cached pages."""
+
+    def test_farm_import_refreshes_calculator(self):
+        Region.objects.create(name='Top End')
+        PlantType.objects.create(name='Mango')
+        url = reverse('core:calculator')
+        self.assertNotIn('Imported Farm', self.get_cached_page(url))
+
+        report = import_farms(b'name,region\nImported Farm,Top End\n', 'farms.csv', self.grower)
+        self.assertEqual(report['created'], 1)
+        self.assertIn('Imported Farm', self.get_page(url))
+
+    def test_boundary_check_refreshes_session_page(self):
+        # Farm 1 shows generated demo data, so use a farm that never has that id
+        farm = Farm.objects.create(owner=self.grower, name='Bounded Farm', boundary={
+            'type': 'Polygon',
+            'coordinates': [[[130.8, -12.6], [131.0, -12.6], [131.0, -12.4], [130.8, -12.4], [130.8, -12.6]]],
+        })
+        session = SurveySession.objects.create(farm=farm, surveyor=self.user)
+        self.add_observation(session, '-12.5', '130.9')
+        self.add_observation(session, '-12.7', '130.9')
+        url = reverse('core:survey_session_detail', args=[session.session_id])
+        self.assertIn('[[-12.7, 130.9], [-12.5, 130.9]]', self.get_cached_page(url))
+
+        call_command('check_observation_boundaries', stdout=io.StringIO())
+        self.assertIn('[[-12.5, 130.9], [-12.5, 130.9]]', self.get_page(url))
+
+
+class FarmImportTests(GrowerTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        Region.objects.create(name='Top End', state_abbreviation='NT')
+        PlantType.objects.create(name='Mango')
+
+    def test_report_lists_failed_rows_and_creates_the_rest(self):
+        data = (
+            b'name,region,size_hectares\n'
+            b'Good Farm,NT,12.5\n'
+            b'Lost Farm,Atlantis,3\n'
+            b'Test Farm,Top End,\n'
+            b'Good Farm,Top End,x\n'
+        )
+        report = import_farms(data, 'farms.csv', self.grower)
+        self.assertEqual((report['created'], report['invalid']), (1, 3))
+        self.assertEqual([row['status'] for row in report['rows']], ['created', 'invalid', 'invalid', 'invalid'])
+        self.assertEqual([row['line'] for row in report['rows']], [2, 3, 4, 5])
+        self.assertIn("Unknown region 'Atlantis'.", report['rows'][1]['messages'])
+        self.assertIn("You already have a farm with this name.", report['rows'][2]['messages'])
+        self.assertEqual(len(report['rows'][3]['messages']), 2)
+        farm = Farm.objects.get(pk=report['rows'][0]['farm_id'])
+        self.assertEqual((farm.name, str(farm.size_hectares)), ('Good Farm', '12.50'))
+
+    def test_boundaries_are_fetched_and_failures_reported(self):
+        parcels = {'GANT_A': {'geometry': PARCEL, 'etag': '', 'last_modified': '', 'max_age': None}}
+        data = b'name,region,geoscape_address_id\nFarm A,NT,GANT_A\nFarm B,NT,GANT_B\n'
+        with mock.patch.object(
+            farm_import_service, 'fetch_cadastral_boundary_conditional', side_effect=lambda a: parcels.get(a)
+        ):
+            report = import_farms(data, 'farms.csv', self.grower, rate=0)
+
+        self.assertEqual(report['created'], 2)
+        self.assertEqual([row['boundary'] for row in report['rows']], ['yes', 'no'])
+        self.assertIn('could not be fetched', report['rows'][1]['messages'][0])
+        statuses = dict(Farm.objects.filter(name__in=['Farm A', 'Farm B']).values_list('name', 'boundary_status'))
+        self.assertEqual(statuses, {'Farm A': 'ok', 'Farm B': 'failed'})
+
+    def test_rate_limiter_spaces_calls(self):
+        limiter = RateLimiter(rate=50, burst=2)
+        started = time.monotonic()
+        for _ in range(12):
+            limiter.acquire()
+        # Two calls from the burst, then one every 20 ms
+        self.assertGreaterEqual(time.monotonic() - started, 0.19)
+
+    def post_file(self, data, **fields):
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = self.client.post(reverse('core:import_farms'), {
+                'file': SimpleUploadedFile('farms.csv', data, content_type='text/csv'), **fields
+            })
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_view_shows_report(self):
+        page = self.post_file(b'name,region\nWeb Farm,NT\nLost Farm,Atlantis\n')
+        self.assertIn('Imported 1 farm(s).', page)
+        self.assertIn('Unknown region &#x27;Atlantis&#x27;.', page)
+        self.assertTrue(Farm.objects.filter(name='Web Farm').exists())
+
+    @override_settings(FARM_IMPORT_WEB_MAX_ROWS=2)
+    def test_view_rejects_files_over_the_web_limit(self):
+        page = self.post_file(b'name,region\nA,NT\nB,NT\nC,NT\n')
+        self.assertIn('at most 2 can be imported at once', page)
+        self.assertFalse(Farm.objects.filter(name__in=['A', 'B', 'C']).exists())
+
+
+class ViewCacheTests(GrowerTestMixin, TestCase):
+
+    def test_demo_session_page_is_not_cached(self):
+        farm = Farm.objects.filter(pk=1).first() or Farm.objects.create(pk=1, owner=self.grower, name='Demo Farm')
+        session = SurveySession.objects.create(farm=farm, surveyor=self.user)
+        url = reverse('core:survey_session_detail', args=[session.session_id])
+        with mock.patch.object(
+            views, 'generate_test_observation_data', wraps=views.generate_test_observation_data
+        ) as generate:
+            self.get_cached_page(url)
+            self.get_page(url)
+        self.assertEqual(generate.call_count, 3)
+
+    def test_session_page_is_cached(self):
+        farm = Farm.objects.create(owner=self.grower, name='Second Farm')
+        session = SurveySession.objects.create(farm=farm, surveyor=self.user)
+        self.add_observation(session, '-12.5', '130.9')
+        url = reverse('core:survey_session_detail', args=[session.session_id])
+        self.get_cached_page(url)
+        with mock.patch.object(views, 'get_session_summary') as get_summary:
+            self.get_page(url)
+        get_summary.assert_not_called()
+
+
+class FragmentCacheTests(GrowerTestMixin, TestCase):
+    TEMPLATE = (
+        "{% load cache cache_versions %}"
+        "{% cache_version 'farm' farm.pk 'reference' 'all' as version %}"
+        "{% cache 60 farm_fragment farm.pk version %}{{ farm.name }}{% endcache %}"
+    )
+
+    def render(self):
+        return Template(self.TEMPLATE).render(Context({'farm': Farm.objects.get(pk=self.farm.pk)}))
+
+    def test_fragment_is_rerendered_after_a_version_bump(self):
+        self.assertEqual(self.render(), 'Test Farm')
+        Farm.objects.filter(pk=self.farm.pk).update(name='Renamed Farm')
+        self.assertEqual(self.render(), 'Test Farm')
+        bump_version('farm', self.farm.pk)
+        self.assertEqual(self.render(), 'Renamed Farm')
+
+    def test_model_saves_change_the_key(self):
+        self.render()
+        self.farm.name = 'Renamed Farm'
+        self.farm.save()
+        self.assertEqual(self.render(), 'Renamed Farm')
+        Farm.objects.filter(pk=self.farm.pk).update(name='Third Name')
+        Pest.objects.create(name='Pest A')
+        self.assertEqual(self.render(), 'Third Name')
+
+    def test_pairs_are_required(self):
+        with self.assertRaises(TemplateSyntaxError):
+            Template("{% load cache_versions %}{% cache_version 'farm' %}").render(Context())
+
+
+class SqlitePragmaTests(TestCase):
+
+    def read_pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_profile_is_applied_to_new_connections(self):
+        # The test connection was opened after the receiver was registered
+        self.assertEqual(self.read_pragma('busy_timeout'), settings.SQLITE_PRAGMAS['busy_timeout'])
+        self.assertEqual(self.read_pragma('cache_size'), settings.SQLITE_PRAGMAS['cache_size'])
+        self.assertEqual(self.read_pragma('synchronous'), 1)  # NORMAL
+
+    def test_receiver_skips_invalid_names(self):
+        with override_settings(SQLITE_PRAGMAS={'busy_timeout': 1234, 'bad name; DROP': 1}):
+            with self.assertLogs('core.signals', 'WARNING'):
+                connection_created.send(sender=connection.__class__, connection=connection)
+            self.assertEqual(self.read_pragma('busy_timeout'), 1234)
+        # The test connection is shared with later tests
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA busy_timeout = {settings.SQLITE_PRAGMAS['busy_timeout']}")
+
+    def test_other_databases_are_left_alone(self):
+        other = mock.Mock(vendor='postgresql')
+        connection_created.send(sender=other.__class__, connection=other)
+        other.cursor.assert_not_called()
+
+
+class DatabaseSettingsTests(GrowerTestMixin, TestCase):
+
+    def load_settings(self, **environ):
+        """Executes a fresh copy of the settings module with only the given DB_* variables set."""
+        path = settings.BASE_DIR / 'hub_surveillance' / 'settings.py'
+        spec = importlib.util.spec_from_file_location('settings_under_test', path)
+        module = importlib.util.module_from_spec(spec)
+        with mock.patch.dict(os.environ), mock.patch('dotenv.load_dotenv'):
+            for name in [name for name in os.environ if name.startswith('DB_')]:
+                del os.environ[name]
+            os.environ.update(environ)
+            spec.loader.exec_module(module)
+        return module.DATABASES['default']
+
+    def test_sqlite_is_the_default(self):
+        database = self.load_settings()
+        self.assertEqual(database['ENGINE'], 'django.db.backends.sqlite3')
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+        self.assertTrue(database['CONN_HEALTH_CHECKS'])
+
+    def test_postgresql_from_environment(self):
+        database = self.load_settings(
+            DB_ENGINE='PostgreSQL', DB_NAME='hub', DB_USER='hub', DB_PASSWORD='secret', DB_HOST='db',
+            DB_PORT='6432', DB_CONN_MAX_AGE='300', DB_PGBOUNCER='1',
+        )
+        self.assertEqual(database['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual((database['NAME'], database['HOST'], database['PORT']), ('hub', 'db', '6432'))
+        self.assertEqual(database['CONN_MAX_AGE'], 300)
+        self.assertTrue(database['DISABLE_SERVER_SIDE_CURSORS'])
+        self.assertFalse(self.load_settings(DB_ENGINE='postgres')['DISABLE_SERVER_SIDE_CURSORS'])
+
+    def test_plant_numbering_ignores_unnumbered_drafts(self):
+        session = SurveySession.objects.create(farm=self.farm, surveyor=self.user, status='in_progress')
+        self.add_observation(session, '-12.46', '130.84', plant_sequence_number=4)
+        Observation.objects.create(session=session, status='draft')
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = self.client.post(reverse('core:api_create_observation'), {
+                'session_id': session.session_id, 'latitude': '-12.47', 'longitude': '130.85',
+            })
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['plant_number'], 5)
+
+
+class SpatialIndexTests(GrowerTestMixin, TestCase):
+
+    def test_adjacent_boxes_share_no_points(self):
+        session = SurveySession.objects.create(farm=self.farm, surveyor=self.user)
+        on_edge = self.add_observation(session, '-12.450000', '130.850000')
+        observations = Observation.objects.all()
+        boxes = [
+            (-12.46, 130.84, -12.45, 130.85), (-12.46, 130.85, -12.45, 130.86),
+            (-12.45, 130.84, -12.44, 130.85), (-12.45, 130.85, -12.44, 130.86),
+        ]
+        found = [list(filter_bbox(observations, *box).values_list('id', flat=True)) for box in boxes]
+        self.assertEqual(found, [[], [], [], [on_edge.id]])
+
+    def test_migration_backfill_matches_the_index(self):
+        migration = importlib.import_module('core.migrations.0023_observation_quadkey')
+        rng = np.random.default_rng(0)
+        lats = rng.uniform(-89, 89, 200)
+        lons = rng.uniform(-180, 180, 200)
+        expected = latlon_to_quadkeys(lats, lons)
+        for lat, lon, quadkey in zip(lats, lons, expected):
+            self.assertEqual(migration.latlon_to_quadkey(float(lat), float(lon)), quadkey)
+            self.assertEqual(latlon_to_quadkey(lat, lon), quadkey)
+
+
+class GeoscapeRecordingTests(TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        self.server.received = []
+        self.server.script = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        fixture_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(fixture_dir.cleanup)
+        settings_override = override_settings(GEOSCAPE_FIXTURE_DIR=fixture_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_not_modified_does_not_replace_recording(self):
+        client = http_client.PooledHttpClient(f"http://127.0.0.1:{self.server.server_port}")
+        self.addCleanup(client.close)
+        recorder = geoscape_service.RecordingClient(client)
+        params = {'query': '1 Test St'}
+
+        self.server.script = [(200, {'ETag': '"v1"'}, 0), (304, {'ETag': '"v1"'}, 0)]
+        recorder.get('/v1/parcels', params=params)
+        revalidated = recorder.get('/v1/parcels', params=params, headers={'If-None-Match': '"v1"'})
+        self.assertEqual(revalidated.status_code, 304)
+
+        recorded = geoscape_service.load_fixture('/v1/parcels', params)
+        self.assertEqual(recorded['status'], 200)
+        self.assertEqual(recorded['body'], {'ok': True})
+
+
+def png_bytes(colour):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), colour).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class UploadTestMixin(GrowerTestMixin):
+    """Stores media in a temporary directory and provides a session with an observation."""
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.session = SurveySession.objects.create(farm=self.farm, surveyor=self.user)
+        self.observation = self.add_observation(self.session, '-12.46', '130.84')
+
+    def send(self, data, filename='leaf.png'):
+        upload, error = start_upload(self.session, self.user, filename, len(data))
+        self.assertIsNone(error)
+        offset, error = append_chunk(upload, 0, io.BytesIO(data), len(data))
+        self.assertIsNone(error)
+        self.assertEqual(offset, len(data))
+        return upload
+
+    def commit(self, upload, observation=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return commit_upload(upload, observation or self.observation)
+
+
+class ImageBlobTests(UploadTestMixin, TestCase):
+
+    def test_identical_uploads_share_one_blob_until_both_are_deleted(self):
+        data = png_bytes('green')
+        first, error = self.commit(self.send(data))
+        self.assertIsNone(error)
+        second_upload = self.send(data)
+        second, error = self.commit(second_upload)
+        self.assertIsNone(error)
+
+        self.assertEqual(first.blob_id, second.blob_id)
+        blob = ImageBlob.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+        self.assertTrue(default_storage.exists(blob.file.name))
+        self.assertTrue(blob.thumbnail.name and default_storage.exists(blob.thumbnail.name))
+        self.assertFalse(default_storage.exists(second_upload.storage_path))
+
+        file_names = [blob.file.name, blob.thumbnail.name]
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 1)
+        self.assertTrue(default_storage.exists(blob.file.name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(ImageBlob.objects.exists())
+        for name in file_names:
+            self.assertFalse(default_storage.exists(name))
+
+    def test_form_uploads_are_deduplicated(self):
+        data = png_bytes('green')
+        first = store_uploaded_image(self.observation, SimpleUploadedFile('a.png', data))
+        second = store_uploaded_image(self.observation, SimpleUploadedFile('b.png', data))
+        third = store_uploaded_image(self.observation, SimpleUploadedFile('c.png', png_bytes('red')))
+        self.assertEqual(first.blob_id, second.blob_id)
+        self.assertNotEqual(first.blob_id, third.blob_id)
+        self.assertEqual(ImageBlob.objects.get(pk=first.blob_id).ref_count, 2)
+
+    def test_dedupe_command_adopts_legacy_images(self):
+        data = png_bytes('green')
+        legacy = [
+            ObservationImage.objects.create(
+                observation=self.observation,
+                image=default_storage.save(f'observation_images/legacy_{i}.png', ContentFile(data))
+            )
+            for i in range(2)
+        ]
+        missing = ObservationImage.objects.create(observation=self.observation, image='observation_images/gone.png')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('dedupe_observation_images', stdout=io.StringIO())
+
+        blob = ImageBlob.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+        for image in legacy:
+            image.refresh_from_db()
+            self.assertEqual((image.blob_id, image.image.name), (blob.id, blob.file.name))
+        self.assertFalse(default_storage.exists('observation_images/legacy_1.png'))
+        missing.refresh_from_db()
+        self.assertIsNone(missing.blob_id)
+
+    def test_rolled_back_commit_leaves_the_staged_file(self):
+        upload = self.send(png_bytes('red'))
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    store_file_at_path(self.observation, upload.storage_path)
+                    raise RuntimeError('simulated failure before commit')
+
+        self.assertEqual(callbacks, [])
+        self.assertFalse(ImageBlob.objects.exists())
+        self.assertTrue(default_storage.exists(upload.storage_path))
+
+        image, error = self.commit(upload)
+        self.assertIsNone(error)
+        self.assertTrue(default_storage.exists(image.blob.file.name))
+        self.assertFalse(default_storage.exists(upload.storage_path))
+
+
+class ChunkedUploadTests(UploadTestMixin, TestCase):
+
+    def test_upload_resumes_from_acknowledged_offset(self):
+        data = png_bytes('blue')
+        upload, error = start_upload(self.session, self.user, 'leaf.png', len(data))
+        self.assertIsNone(error)
+        half = len(data) // 2
+
+        offset, error = append_chunk(upload, 0, io.BytesIO(data[:half]), half)
+        self.assertEqual((offset, error), (half, None))
+        # The connection drops; the client asks where to continue from
+        upload.refresh_from_db()
+        offset, error = append_chunk(upload, upload.offset, io.BytesIO(data[half:]), len(data) - half)
+        self.assertEqual((offset, error), (len(data), None))
+
+        image, error = self.commit(upload)
+        self.assertIsNone(error)
+        with image.blob.file.open('rb') as stored:
+            self.assertEqual(stored.read(), data)
+
+    def test_chunk_at_wrong_offset_is_rejected(self):
+        data = png_bytes('blue')
+        upload, _ = start_upload(self.session, self.user, 'leaf.png', len(data))
+        append_chunk(upload, 0, io.BytesIO(data[:10]), 10)
+
+        for offset in (0, 5, 20):
+            new_offset, error = append_chunk(upload, offset, io.BytesIO(data[offset:]), len(data) - offset)
+            self.assertEqual(new_offset, 10)
+            self.assertIn('Offset mismatch', error)
+        upload.refresh_from_db()
+        self.assertEqual(upload.offset, 10)
+
+    def test_chunk_past_declared_size_is_rejected(self):
+        upload, _ = start_upload(self.session, self.user, 'leaf.png', 10)
+        offset, error = append_chunk(upload, 0, io.BytesIO(b'x' * 11), 11)
+        self.assertEqual(offset, 0)
+        self.assertIn('exceeds', error)
+
+    def test_upload_endpoints(self):
+        data = png_bytes('yellow')
+        half = len(data) // 2
+        response = self.client.post(reverse('core:api_start_image_upload'), {
+            'session_id': self.session.session_id, 'filename': 'leaf.png', 'total_size': len(data),
+        })
+        self.assertEqual(response.status_code, 200)
+        chunk_url = reverse('core:api_image_upload_chunk', args=[response.json()['upload_id']])
+
+        def send_chunk(offset, chunk):
+            return self.client.post(f"{chunk_url}?offset={offset}", chunk, content_type='application/octet-stream')
+
+        self.assertEqual(send_chunk(0, data[:half]).status_code, 200)
+        rejected = send_chunk(0, data)
+        self.assertEqual(rejected.status_code, 409)
+        self.assertEqual(rejected.json()['offset'], half)
+        self.assertEqual(self.client.get(chunk_url).json()['offset'], half)
+        self.assertEqual(send_chunk(half, data[half:]).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f"{chunk_url}commit/", {'observation_id': self.observation.id})
+        self.assertEqual(response.status_code, 200)
+        with self.observation.images.get().blob.file.open('rb') as stored:
+            self.assertEqual(stored.read(), data)
+
+    def test_recommit_returns_the_same_image(self):
+        upload = self.send(png_bytes('blue'))
+        image, _ = self.commit(upload)
+        again, error = self.commit(upload)
+        self.assertIsNone(error)
+        self.assertEqual(again.pk, image.pk)
+
+    def test_recommit_to_another_observation_is_rejected(self):
+        upload = self.send(png_bytes('blue'))
+        self.commit(upload)
+        other = self.add_observation(self.session, '-12.47', '130.85')
+        image, error = self.commit(upload, other)
+        self.assertIsNone(image)
+        self.assertIn('different observation', error)
+        self.assertFalse(other.images.exists())
+
+
+class PointInPolygonTests(TestCase):
+    # A 10 x 10 square (lon 0-10, lat 0-10) with a 4 x 4 hole (lon/lat 3-7)
+    BOUNDARY = {
+        'type': 'Polygon',
+        'coordinates': [
+            [[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]],
+            [[3, 3], [3, 7], [7, 7], [7, 3], [3, 3]],
+        ],
+    }
+    # (lat, lon, inside)
+    CASES = [
+        (1, 1, True),     # Inside the outer ring
+        (5, 5, False),    # In the hole
+        (5, 8.5, True),   # Between the hole and the east edge
+        (-1, 5, False),   # South of the square
+        (5, 11, False),   # East of the square
+        (0, 5, True),     # On the south edge
+        (5, 0, True),     # On the west edge
+        (10, 5, False),   # On the north edge
+        (5, 10, False),   # On the east edge
+        (5, 3, False),    # On the hole's west edge, which borders the hole
+        (5, 7, True),     # On the hole's east edge, which borders the square
+        (0, 0, True),     # South-west corner
+        (10, 10, False),  # North-east corner
+    ]
+
+    def check(self, boundary):
+        lats = [lat for lat, _, _ in self.CASES]
+        lons = [lon for _, lon, _ in self.CASES]
+        expected = [inside for _, _, inside in self.CASES]
+        self.assertEqual([boundary.contains(lat, lon) for lat, lon in zip(lats, lons)], expected)
+        self.assertEqual(boundary.contains_many(lats, lons).tolist(), expected)
+
+    def test_polygon_with_hole(self):
+        self.check(geofence_service.PreparedBoundary(self.BOUNDARY))
+
+    def test_polygon_with_hole_vectorized_single_point_path(self):
+        with mock.patch.object(geofence_service, 'SCALAR_EDGE_LIMIT', 0):
+            self.check(geofence_service.PreparedBoundary(self.BOUNDARY))
+
+    def test_multipolygon_feature(self):
+        far_square = [[[20, 20], [30, 20], [30, 30], [20, 30], [20, 20]]]
+        boundary = geofence_service.PreparedBoundary({
+            'type': 'Feature',
+            'geometry': {'type': 'MultiPolygon', 'coordinates': [self.BOUNDARY['coordinates'], far_square]},
+        })
+        self.check(boundary)
+        self.assertTrue(boundary.contains(25, 25))
+        self.assertFalse(boundary.contains(15, 15))
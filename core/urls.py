@@ -33,6 +33,7 @@ urlpatterns = [
     # Farm management
     path('myfarms/', views.home_view, name='myfarms'),
     path('farms/create/', views.create_farm_view, name='create_farm'),
+    path('farms/import/', views.import_farms_view, name='import_farms'),
     path('farms/<int:farm_id>/', views.farm_detail_view, name='farm_detail'),
     path('farms/<int:farm_id>/edit/', views.edit_farm_view, name='edit_farm'),
     path('farms/<int:farm_id>/delete/', views.delete_farm_view, name='delete_farm'),
@@ -66,8 +67,21 @@ urlpatterns = [
     # ---> NEW API Endpoint for Observations <---
     path('api/survey/observation/create/', views.create_observation_api, name='api_create_observation'),
     path('api/survey/observation/autosave/', views.auto_save_observation_api, name='api_auto_save_observation'),
+    # Resumable chunked image uploads
+    path('api/survey/uploads/', views.start_image_upload_api, name='api_start_image_upload'),
+    path('api/survey/uploads/<uuid:upload_id>/', views.image_upload_chunk_api, name='api_image_upload_chunk'),
+    path('api/survey/uploads/<uuid:upload_id>/commit/', views.commit_image_upload_api, name='api_commit_image_upload'),
     # ---> NEW API Endpoint for Finishing Session <---
     path('api/survey/<uuid:session_id>/finish/', views.finish_survey_session_api, name='api_finish_survey'),
+    path('api/survey/<uuid:session_id>/events/', views.session_event_stream_view, name='api_session_events'),
+    path('api/survey/<uuid:session_id>/heatmap/', views.session_heatmap_api, name='api_session_heatmap'),
+    path('api/farms/<int:farm_id>/heatmap/', views.farm_heatmap_api, name='api_farm_heatmap'),
+    path('api/survey/<uuid:session_id>/hotspots/', views.session_hotspots_api, name='api_session_hotspots'),
+    path('api/survey/<uuid:session_id>/plan/', views.session_sampling_plan_api, name='api_session_sampling_plan'),
+    path('api/farms/<int:farm_id>/hotspots/', views.farm_hotspots_api, name='api_farm_hotspots'),
+    path('api/staff/geoscape-status/', views.geoscape_status_api, name='api_geoscape_status'),
+    path('api/farms/<int:farm_id>/boundary-status/', views.farm_boundary_status_api, name='api_farm_boundary_status'),
+    path('api/tiles/observations/<int:z>/<int:x>/<int:y>.geojson', views.observation_tile_api, name='api_observation_tile'),
 
     # Survey Session URLs
     path('farms/<int:farm_id>/sessions/start/', views.start_survey_session_view, name='start_survey_session'),
@@ -1,11 +1,14 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from .season_utils import get_seasonal_stage_info
-from django.http import Http404, JsonResponse, HttpResponse
+from django.http import Http404, JsonResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.core.exceptions import ValidationError
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
-from django.db import models
-from django.db.models import Count, F, Q, Max
+from django.db import models, transaction
+from django.db.models import Count, F, Q, Max, Min
 from django.utils import timezone
 from django.urls import reverse
 import json
@@ -27,7 +30,7 @@ import base64
 import qrcode
 
 from .forms import (
-    SignUpForm, FarmForm, 
+    SignUpForm, FarmForm, FarmImportForm,
     UserEditForm, GrowerProfileEditForm, CalculatorForm, ObservationForm
 )
 from .models import (
@@ -50,11 +53,32 @@ from .services.surveillance_service import (
     get_surveillance_stats
 )
 from .services.geoscape_service import (
-    fetch_cadastral_boundary, search_addresses
+    fetch_cadastral_boundary, search_addresses, is_geoscape_available, get_geoscape_status,
+    GEOSCAPE_UNAVAILABLE_MESSAGE
 )
 from .services.boundary_service import (
     create_mapping_token, get_mapping_url, validate_mapping_token,
-    invalidate_token, save_boundary_to_farm, fetch_and_save_cadastral_boundary
+    invalidate_token, save_boundary_to_farm, fetch_and_save_cadastral_boundary,
+    request_cadastral_boundary, requeue_stale_boundary_job
+)
+from .services.address_cache import get_region_state
+from .services.farm_import_service import import_farms, FarmImportError, DEFAULT_WEB_MAX_ROWS
+from .services.image_storage_service import store_uploaded_image
+from .services.geofence_service import check_point_in_farm, get_boundary_policy, BOUNDARY_POLICY_REJECT
+from .services.tile_service import is_valid_tile, filter_observations, get_observation_tile
+from .services.sampling_service import assign_sampling_plan
+from .services.route_service import get_session_route, get_next_target
+from .services.hotspot_service import get_session_hotspots, get_farm_hotspots
+from .services.heatmap_service import get_session_heatmap, get_farm_heatmap, DEFAULT_CELL_SIZE_M
+from .services.session_summary_service import build_session_summary, get_session_summary
+from .services.view_cache import cache_per_user, REFERENCE
+from .services.draft_service import drafts_buffered, save_draft, load_draft, discard_draft
+from .services.session_events import (
+    publish_session_event, build_observation_event, build_progress_snapshot,
+    iter_session_events, aiter_session_events
+)
+from .services.upload_service import (
+    start_upload, get_upload, append_chunk, commit_upload, get_chunk_size
 )
 
 # Import new utils
@@ -119,6 +143,41 @@ def create_farm_view(request):
 
 
 @login_required
+def import_farms_view(request):
+    """
+    Handle bulk farm import from a CSV or GeoJSON upload.
+
+    Geoscape lookups run within the request, so uploads are limited to
+    FARM_IMPORT_WEB_MAX_ROWS farms; `manage.py import_farms` takes larger files.
+    """
+    report = None
+    max_rows = getattr(settings, 'FARM_IMPORT_WEB_MAX_ROWS', DEFAULT_WEB_MAX_ROWS)
+    if request.method == 'POST':
+        form = FarmImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            try:
+                report = import_farms(
+                    upload.read(), upload.name, request.user.grower_profile,
+                    dry_run=form.cleaned_data['dry_run'], max_rows=max_rows
+                )
+            except FarmImportError as e:
+                messages.error(request, str(e))
+            else:
+                if report['dry_run']:
+                    messages.info(request, f"Checked {len(report['rows'])} farm(s); {report['invalid']} have problems. Nothing was created.")
+                elif report['created']:
+                    messages.success(request, f"Imported {report['created']} farm(s).")
+                if report['invalid']:
+                    messages.warning(request, f"{report['invalid']} row(s) were not imported; see the report below.")
+    else:
+        form = FarmImportForm()
+    
+    return render(request, 'core/import_farms.html', {'form': form, 'report': report, 'max_rows': max_rows})
+
+
+@login_required
+@cache_per_user(lambda request, farm_id: [('farm', farm_id), REFERENCE])
 def farm_detail_view(request, farm_id):
     """Display detailed information about a specific farm, using dynamic recommendations."""
     print(f"--- Entering farm_detail_view for farm_id: {farm_id} ---")
@@ -274,7 +333,8 @@ def farm_detail_view(request, farm_id):
         'surveillance_frequency': surveillance_frequency,
         'last_surveillance_date': last_surveillance_date,
         'next_due_date': next_due_date,
-        'farm_boundary_json': farm.boundary
+        'farm_boundary_json': farm.boundary,
+        'fragment_timeout': getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 60 * 60),
     }
     print(f"\nDEBUG (farm_detail_view): Final context dictionary passed to template:")
     pprint.pprint(context)
@@ -314,16 +374,9 @@ def edit_farm_view(request, farm_id):
             new_address_id_set = bool(updated_farm.geoscape_address_id)
             
             if new_address_id_set and (address_id_changed or boundary_is_missing):
-                success, message = fetch_and_save_cadastral_boundary(updated_farm)
-                if success:
-                    messages.info(request, f"Cadastral boundary retrieved/updated and saved for '{updated_farm.name}'.")
-                elif address_id_changed and updated_farm.boundary is not None:
-                    # Clear potentially outdated boundary
-                    updated_farm.boundary = None
-                    updated_farm.save(update_fields=['boundary'])
-                    messages.warning(request, f"Address changed, but could not retrieve new boundary for '{updated_farm.name}'. Old boundary cleared.")
-                elif boundary_is_missing:
-                    messages.warning(request, f"Could not automatically retrieve cadastral boundary for '{updated_farm.name}'.")
+                # Fetched in the background; a failed fetch after an address change clears the outdated boundary
+                request_cadastral_boundary(updated_farm, clear_on_failure=address_id_changed)
+                messages.info(request, f"Retrieving the cadastral boundary for '{updated_farm.name}' in the background.")
             
             return redirect('core:farm_detail', farm_id=updated_farm.id)
     else:
@@ -361,7 +414,16 @@ def delete_farm_view(request, farm_id):
     return render(request, 'core/delete_farm_confirm.html', context)
 
 
+def _calculator_submitted(request):
+    """A submitted calculator form saves a calculation, so it is never served from cache."""
+    return 'farm' in request.GET and 'confidence_level' in request.GET
+
+
 @login_required
+@cache_per_user(
+    lambda request: [('grower', request.user.grower_profile.pk), REFERENCE],
+    unless=_calculator_submitted
+)
 def calculator_view(request):
     """Calculate surveillance requirements based on user inputs (confidence only)."""
     grower = request.user.grower_profile
@@ -839,20 +901,23 @@ def address_suggestion_view(request):
         error_message = "Region must be selected first."
     elif query and len(query) >= 3:
         try:
-            # Look up the region to get the state abbreviation
-            selected_region = Region.objects.get(id=region_id)
-            state_territory_used = selected_region.state_abbreviation
-            
-            if not state_territory_used:
-                error_message = f"State/Territory not configured for region: {selected_region.name}."
+            # Look up the region to get the state abbreviation (cached in process)
+            region = get_region_state(region_id)
+            if region is None:
+                error_message = "Invalid region selected."
             else:
-                # Use service to search addresses
-                suggestions = search_addresses(query, state_territory_used)
-                if not suggestions:
-                    error_message = "No address suggestions found. Try a different search term."
+                region_name, state_territory_used = region
+                if not state_territory_used:
+                    error_message = f"State/Territory not configured for region: {region_name}."
+                else:
+                    # Use service to search addresses
+                    suggestions = search_addresses(query, state_territory_used)
+                    if not suggestions and not is_geoscape_available():
+                        # Cached suggestions are still served; only uncached queries fail fast
+                        error_message = GEOSCAPE_UNAVAILABLE_MESSAGE
+                    elif not suggestions:
+                        error_message = "No address suggestions found. Try a different search term."
 
-        except Region.DoesNotExist:
-            error_message = "Invalid region selected."
         except Exception as e:
             error_message = "An error occurred while processing the address search."
 
@@ -997,6 +1062,7 @@ def start_survey_session_view(request, farm_id):
             start_time=timezone.now(),
             target_plants_surveyed=target_plants
         )
+        assign_sampling_plan(new_session)
         messages.success(request, f"New survey session started for {farm.name}.")
         print(f"StartSession: Created new session {new_session.session_id} for farm {farm.id}")
         
@@ -1086,14 +1152,20 @@ def active_survey_session_view(request, session_id):
         status='completed'
     ).select_related().order_by('-observation_time')
     
-    latest_draft = Observation.objects.filter(
-        session=session, 
-        status='draft'
-    ).order_by('-observation_time').first()
+    # Buffered drafts live outside the database; fall back to draft rows otherwise
+    buffered_draft = load_draft(session, request.user) if drafts_buffered() else None
+    latest_draft = None
+    if not buffered_draft:
+        latest_draft = Observation.objects.filter(
+            session=session, 
+            status='draft'
+        ).order_by('-observation_time').first()
     
     # Prepare draft data for frontend if it exists
     draft_data_json = '{}'
-    if latest_draft:
+    if buffered_draft:
+        draft_data_json = json.dumps({'id': None, **buffered_draft})
+    elif latest_draft:
         draft_data = {
             'id': latest_draft.id,
             'latitude': str(latest_draft.latitude) if latest_draft.latitude else None,
@@ -1122,6 +1194,9 @@ def active_survey_session_view(request, session_id):
     unique_pests_count = Pest.objects.filter(observations__in=observations).distinct().count()
     unique_diseases_count = Disease.objects.filter(observations__in=observations).distinct().count()
     
+    # Suggest the next plant along the walking route through the sampling plan
+    next_target = get_next_target(session)
+    
     # Prepare view context
     context = {
         'session': session,
@@ -1141,6 +1216,8 @@ def active_survey_session_view(request, session_id):
         'recommended_parts': recommended_parts,
         'current_stage_name': current_stage_name,
         'latest_draft_json': draft_data_json,
+        'next_target': next_target,
+        'fragment_timeout': getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 60 * 60),
     }
     
     return render(request, 'core/active_survey_session.html', context)
@@ -1208,6 +1285,40 @@ def auto_save_observation_api(request):
                 logger.debug(f"Invalid plant sequence number provided: {plant_seq_str}")
                 # Ignore invalid input for drafts
 
+        # Flag GPS fixes that fall outside the farm boundary
+        in_bounds = check_point_in_farm(
+            session.farm,
+            Decimal(latitude) if latitude else None,
+            Decimal(longitude) if longitude else None
+        )
+        outside_boundary = None if in_bounds is None else not in_bounds
+
+        # Keep the draft out of the observation tables when buffering is enabled
+        if drafts_buffered():
+            save_draft(session, request.user, {
+                'latitude': latitude or None,
+                'longitude': longitude or None,
+                'gps_accuracy': gps_accuracy or None,
+                'pests_observed': [int(pid) for pid in pest_ids if pid.isdigit()],
+                'diseases_observed': [int(did) for did in disease_ids if did.isdigit()],
+                'notes': notes,
+                'plant_sequence_number': plant_sequence_number or '',
+            })
+            
+            if session.status == 'not_started':
+                session.status = 'in_progress'
+                session.save(update_fields=['status'])
+
+            return JsonResponse({
+                'status': 'success',
+                'message': 'Draft saved successfully.',
+                'draft_id': None,
+                'has_coordinates': bool(latitude and longitude),
+                'has_pests': bool(pest_ids),
+                'has_diseases': bool(disease_ids),
+                'outside_boundary': outside_boundary
+            })
+
         # Find existing draft or create a new one
         observation = None
         if draft_id:
@@ -1232,6 +1343,7 @@ def auto_save_observation_api(request):
             observation.gps_accuracy = Decimal(gps_accuracy) if gps_accuracy else None
             observation.notes = notes
             observation.plant_sequence_number = plant_sequence_number
+            observation.outside_boundary = outside_boundary
             observation.observation_time = timezone.now()  # Update timestamp on each save
 
             # Save to generate ID if new
@@ -1252,7 +1364,8 @@ def auto_save_observation_api(request):
                 'draft_id': observation.id,
                 'has_coordinates': observation.has_coordinates(),
                 'has_pests': observation.has_pests(),
-                'has_diseases': observation.has_diseases()
+                'has_diseases': observation.has_diseases(),
+                'outside_boundary': outside_boundary
             })
         except Exception as field_error:
             logger.error(f"Error saving observation fields: {field_error}", exc_info=True)
@@ -1341,9 +1454,10 @@ def create_observation_api(request):
 
         # Auto-assign sequence number if not provided
         if not plant_sequence_number:
-            # Use the custom manager to get the highest sequence number
-            latest_observations = Observation.objects.filter(session=session).order_by('-plant_sequence_number')
-            max_sequence = latest_observations[0].plant_sequence_number if latest_observations.exists() else 0
+            # Aggregate rather than order, since backends sort NULL (unnumbered drafts) differently
+            max_sequence = Observation.objects.filter(session=session).aggregate(
+                max_sequence=Max('plant_sequence_number')
+            )['max_sequence'] or 0
             plant_sequence_number = max_sequence + 1
             logger.debug(f"Auto-assigned plant sequence number {plant_sequence_number} for session {session_id}")
 
@@ -1364,6 +1478,17 @@ def create_observation_api(request):
             observation.plant_sequence_number = plant_sequence_number
             observation.observation_time = timezone.now()
             
+            # Check the GPS fix against the farm boundary
+            in_bounds = check_point_in_farm(session.farm, observation.latitude, observation.longitude)
+            if in_bounds is False and get_boundary_policy() == BOUNDARY_POLICY_REJECT:
+                logger.info(f"Rejected observation outside farm boundary for session {session_id}")
+                return JsonResponse({
+                    'status': 'error',
+                    'message': 'Your GPS position is outside the farm boundary. Please move into the farm and try again.',
+                    'outside_boundary': True
+                }, status=400)
+            observation.outside_boundary = None if in_bounds is None else not in_bounds
+            
             # Use our custom finalize method
             observation.finalize(save=True)
             
@@ -1383,14 +1508,35 @@ def create_observation_api(request):
             
             for img_file in files:
                 try:
-                    image = ObservationImage(observation=observation, image=img_file)
-                    image.save()
+                    image = store_uploaded_image(observation, img_file)
                     image_ids.append(image.id)
                     logger.debug(f"Saved image for observation {observation.id}")
                 except Exception as img_error:
                     logger.error(f"Error saving image: {img_error}", exc_info=True)
                     # Continue processing other images if one fails
             
+            # Attach images that were sent ahead via the chunked upload endpoints
+            for upload_id in request.POST.getlist('upload_ids'):
+                upload = get_upload(upload_id, request.user)
+                if not upload:
+                    logger.warning(f"Upload {upload_id} not found for observation {observation.id}")
+                    continue
+                image, upload_error = commit_upload(upload, observation)
+                if upload_error:
+                    logger.warning(f"Could not attach upload {upload_id}: {upload_error}")
+                    continue
+                image_ids.append(image.id)
+            
+            # The buffered draft has now been promoted to a real observation
+            if drafts_buffered():
+                discard_draft(session, request.user)
+            
+            # Notify anyone watching this session's live progress
+            transaction.on_commit(lambda: publish_session_event(
+                session.session_id, 'observation', build_observation_event(observation, session),
+                event_id=observation.id
+            ))
+            
             # Build response with observation data
             return JsonResponse({
                 'status': 'success',
@@ -1399,7 +1545,9 @@ def create_observation_api(request):
                 'image_ids': image_ids,
                 'plant_number': plant_sequence_number,
                 'progress_percent': session.get_progress_percentage(),
-                'observation_count': session.observation_count()
+                'observation_count': session.observation_count(),
+                'outside_boundary': observation.outside_boundary,
+                'next_target': get_next_target(session)
             })
             
         except Observation.DoesNotExist:
@@ -1423,6 +1571,170 @@ def create_observation_api(request):
         }, status=500)
 
 
+@csrf_exempt
+@require_POST
+@login_required
+def start_image_upload_api(request):
+    """
+    API endpoint to begin a resumable, chunked image upload.
+    
+    The client registers the file first, then sends it in chunks to
+    `image_upload_chunk_api` and finally attaches it to an observation, either
+    via `commit_image_upload_api` or by passing `upload_ids` to
+    `create_observation_api`.
+    
+    Args:
+        request: HTTP request with session_id, filename and total_size POST params
+        
+    Returns:
+        JsonResponse with the upload ID, current offset and preferred chunk size
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+    
+    session_id = request.POST.get('session_id')
+    filename = request.POST.get('filename', '')
+    
+    try:
+        total_size = int(request.POST.get('total_size', ''))
+    except (ValueError, TypeError):
+        return JsonResponse({
+            'status': 'error',
+            'message': 'A valid total_size is required.'
+        }, status=400)
+    
+    if not session_id:
+        return JsonResponse({
+            'status': 'error', 
+            'message': 'Session ID is required.'
+        }, status=400)
+    
+    try:
+        session = SurveySession.objects.get(session_id=session_id, surveyor=request.user)
+    except (SurveySession.DoesNotExist, ValueError):
+        logger.warning(f"User {request.user.username} attempted upload to non-existent session {session_id}")
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Survey session not found.'
+        }, status=404)
+    
+    if not session.is_active():
+        return JsonResponse({
+            'status': 'error',
+            'message': 'This survey session is no longer active.'
+        }, status=400)
+    
+    upload, error = start_upload(session, request.user, filename, total_size)
+    if error:
+        return JsonResponse({'status': 'error', 'message': error}, status=400)
+    
+    return JsonResponse({
+        'status': 'success',
+        'chunk_size': get_chunk_size(),
+        **upload.to_dict()
+    })
+
+
+@csrf_exempt
+@login_required
+def image_upload_chunk_api(request, upload_id):
+    """
+    API endpoint to query or extend a chunked image upload.
+    
+    GET returns the number of bytes the server holds so an interrupted client
+    can resume. POST appends the raw request body at the `offset` query
+    parameter; the body is streamed to disk rather than read into memory.
+    
+    Args:
+        request: HTTP request (raw chunk bytes as the body for POST)
+        upload_id: UUID of the upload
+        
+    Returns:
+        JsonResponse with the current upload state
+    """
+    upload = get_upload(upload_id, request.user)
+    if not upload:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Upload not found.'
+        }, status=404)
+    
+    if request.method == 'GET':
+        return JsonResponse({'status': 'success', **upload.to_dict()})
+    
+    if request.method != 'POST':
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Method not allowed.'
+        }, status=405)
+    
+    try:
+        offset = int(request.GET.get('offset', ''))
+        content_length = request.META.get('CONTENT_LENGTH')
+        length = int(content_length) if content_length else None
+    except (ValueError, TypeError):
+        return JsonResponse({
+            'status': 'error',
+            'message': 'A valid offset is required.'
+        }, status=400)
+    
+    new_offset, error = append_chunk(upload, offset, request, length)
+    if error:
+        # 409 tells the client to resync its offset from the response
+        status_code = 409 if 'Offset mismatch' in error else 400
+        return JsonResponse({
+            'status': 'error',
+            'message': error,
+            **upload.to_dict()
+        }, status=status_code)
+    
+    return JsonResponse({'status': 'success', **upload.to_dict()})
+
+
+@csrf_exempt
+@require_POST
+@login_required
+def commit_image_upload_api(request, upload_id):
+    """
+    API endpoint to attach a completed chunked upload to an observation.
+    
+    Args:
+        request: HTTP request with observation_id and optional caption POST params
+        upload_id: UUID of the upload
+        
+    Returns:
+        JsonResponse with the created image ID
+    """
+    upload = get_upload(upload_id, request.user)
+    if not upload:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Upload not found.'
+        }, status=404)
+    
+    try:
+        observation = Observation.objects.get(
+            id=request.POST.get('observation_id'),
+            session__surveyor=request.user
+        )
+    except (Observation.DoesNotExist, ValueError, TypeError):
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Observation not found.'
+        }, status=404)
+    
+    image, error = commit_upload(upload, observation, request.POST.get('caption') or None)
+    if error:
+        return JsonResponse({'status': 'error', 'message': error}, status=400)
+    
+    return JsonResponse({
+        'status': 'success',
+        'message': 'Image attached successfully.',
+        'image_id': image.id,
+        'image_url': image.image.url
+    })
+
+
 @csrf_exempt
 @require_POST
 @login_required
@@ -1492,14 +1804,24 @@ def finish_survey_session_api(request, session_id):
         if draft_count > 0:
             logger.info(f"Deleting {draft_count} draft observations from session {session_id}")
             draft_observations.delete()
+        if drafts_buffered():
+            discard_draft(session, request.user)
         
-        # Generate summary info
-        unique_pests_count = session.get_unique_pests().count()
-        unique_diseases_count = session.get_unique_diseases().count()
+        # Store the summary the detail page renders from
+        try:
+            summary = build_session_summary(session)
+            unique_pests_count = len(summary.unique_pests)
+            unique_diseases_count = len(summary.unique_diseases)
+        except Exception as summary_error:
+            logger.error(f"Error building summary for session {session_id}: {summary_error}", exc_info=True)
+            unique_pests_count = session.get_unique_pests().count()
+            unique_diseases_count = session.get_unique_diseases().count()
         
         # Calculate duration if available
         duration_minutes = session.duration()
         
+        publish_session_event(session.session_id, 'finished', build_progress_snapshot(session))
+        
         # Return success response with redirection URL and additional info
         redirect_url = reverse('core:survey_session_detail', kwargs={'session_id': session_id})
         return JsonResponse({
@@ -1521,6 +1843,334 @@ def finish_survey_session_api(request, session_id):
         }, status=500)
 
 
+@login_required
+def session_event_stream_view(request, session_id):
+    """
+    Streams live progress of a survey session as Server-Sent Events.
+    
+    Sends a 'snapshot' event with the current counts, then an 'observation'
+    event for every observation committed and a 'finished' event when the
+    session is completed. Under ASGI the stream is served from the event loop;
+    under WSGI each stream holds a worker thread until it times out and the
+    browser reconnects.
+    
+    Args:
+        request: HTTP request
+        session_id: UUID of the survey session to watch
+        
+    Returns:
+        StreamingHttpResponse with content type text/event-stream
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+    
+    session = get_object_or_404(
+        SurveySession.objects.select_related('farm__owner'),
+        session_id=session_id
+    )
+    if session.surveyor != request.user and session.farm.owner.user != request.user:
+        logger.warning(f"Permission denied for user {request.user.username} on session events {session_id}")
+        return JsonResponse({
+            'status': 'error',
+            'message': 'You do not have permission to view this survey session.'
+        }, status=403)
+    
+    # The stream subscribes before taking the snapshot, so nothing committed in between is lost
+    get_snapshot = lambda: build_progress_snapshot(session)
+    if isinstance(request, ASGIRequest):
+        events = aiter_session_events(session.session_id, get_snapshot)
+    else:
+        events = iter_session_events(session.session_id, get_snapshot)
+    
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop reverse proxies from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _parse_cell_size(request, default=DEFAULT_CELL_SIZE_M):
+    """Reads a grid cell size in metres from the query string, clamped to 1-1000."""
+    try:
+        cell_size = float(request.GET.get('cell', default))
+    except (TypeError, ValueError):
+        cell_size = default
+    return min(max(cell_size, 1.0), 1000.0)
+
+
+@login_required
+def session_heatmap_api(request, session_id):
+    """
+    API endpoint returning the binned pest/disease heatmap for a survey session.
+    
+    Query parameters:
+    - cell: grid cell edge in metres (default 10)
+    
+    Args:
+        request: HTTP request
+        session_id: UUID of the survey session
+        
+    Returns:
+        JsonResponse with the intensity grid
+    """
+    session = get_object_or_404(
+        SurveySession.objects.select_related('farm__owner'),
+        session_id=session_id
+    )
+    if session.surveyor != request.user and session.farm.owner.user != request.user:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'You do not have permission to view this survey session.'
+        }, status=403)
+    
+    heatmap = get_session_heatmap(session, _parse_cell_size(request))
+    return JsonResponse({'status': 'success', **heatmap})
+
+
+@login_required
+def farm_heatmap_api(request, farm_id):
+    """
+    API endpoint returning the binned pest/disease heatmap across a farm's sessions.
+    
+    Query parameters:
+    - start, end: optional date range (YYYY-MM-DD), inclusive
+    - cell: grid cell edge in metres (default 10)
+    
+    Args:
+        request: HTTP request
+        farm_id: ID of the farm
+        
+    Returns:
+        JsonResponse with the intensity grid
+    """
+    farm = get_object_or_404(Farm, id=farm_id, owner=request.user.grower_profile)
+    
+    try:
+        start_date = date.fromisoformat(request.GET['start']) if request.GET.get('start') else None
+        end_date = date.fromisoformat(request.GET['end']) if request.GET.get('end') else None
+    except ValueError:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Dates must be in YYYY-MM-DD format.'
+        }, status=400)
+    
+    heatmap = get_farm_heatmap(farm, start_date, end_date, _parse_cell_size(request))
+    return JsonResponse({'status': 'success', **heatmap})
+
+
+@login_required
+def farm_boundary_status_api(request, farm_id):
+    """
+    API endpoint reporting the progress of a farm's background boundary fetch.
+    
+    Args:
+        request: HTTP request
+        farm_id: ID of the farm
+        
+    Returns:
+        JsonResponse with boundary_status ('', 'pending', 'ok' or 'failed')
+        and whether the farm has a boundary. A fetch pending for longer than
+        BOUNDARY_PENDING_TIMEOUT is re-queued.
+    """
+    farm = get_object_or_404(Farm, id=farm_id, owner=request.user.grower_profile)
+    # A job lost to a restart would otherwise stay pending forever
+    requeue_stale_boundary_job(farm)
+    return JsonResponse({
+        'status': 'success',
+        'boundary_status': farm.boundary_status,
+        'has_boundary': bool(farm.boundary),
+        'updated': farm.boundary_status_updated.isoformat() if farm.boundary_status_updated else None,
+    })
+
+
+@login_required
+def session_sampling_plan_api(request, session_id):
+    """
+    API endpoint returning the sampling plan (target plant positions) of a session.
+    
+    Sessions started before plans existed, or before the farm had a boundary,
+    get a plan generated on first request while they are still in progress.
+    
+    Args:
+        request: HTTP request
+        session_id: UUID of the survey session
+        
+    Returns:
+        JsonResponse with the plan, or 404 JSON if none can be built
+    """
+    session = get_object_or_404(
+        SurveySession.objects.select_related('farm__owner'),
+        session_id=session_id
+    )
+    if session.surveyor != request.user and session.farm.owner.user != request.user:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'You do not have permission to view this survey session.'
+        }, status=403)
+    
+    plan = session.sampling_plan
+    if plan is None and session.status == 'in_progress':
+        plan = assign_sampling_plan(session)
+    if plan is None:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'No sampling plan is available. The farm needs a boundary and a current surveillance calculation.'
+        }, status=404)
+    
+    # Include the walking order so clients can draw the route
+    get_session_route(session)
+    return JsonResponse({'status': 'success', 'plan': plan})
+
+
+@login_required
+def session_hotspots_api(request, session_id):
+    """
+    API endpoint returning pest/disease hotspot clusters for a survey session.
+    
+    Query parameters:
+    - cell: grid cell edge in metres (default 20)
+    
+    Args:
+        request: HTTP request
+        session_id: UUID of the survey session
+        
+    Returns:
+        JsonResponse with a GeoJSON FeatureCollection of cluster polygons
+    """
+    session = get_object_or_404(
+        SurveySession.objects.select_related('farm__owner'),
+        session_id=session_id
+    )
+    if session.surveyor != request.user and session.farm.owner.user != request.user:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'You do not have permission to view this survey session.'
+        }, status=403)
+    
+    cell_size = _parse_cell_size(request, default=20.0)
+    return JsonResponse(get_session_hotspots(session, cell_size))
+
+
+@login_required
+def farm_hotspots_api(request, farm_id):
+    """
+    API endpoint returning pest/disease hotspot clusters across a farm's history.
+    
+    Query parameters:
+    - start, end: optional date range (YYYY-MM-DD), inclusive
+    - cell: grid cell edge in metres (default 20)
+    
+    Args:
+        request: HTTP request
+        farm_id: ID of the farm
+        
+    Returns:
+        JsonResponse with a GeoJSON FeatureCollection of cluster polygons
+    """
+    farm = get_object_or_404(Farm, id=farm_id, owner=request.user.grower_profile)
+    
+    try:
+        start_date = date.fromisoformat(request.GET['start']) if request.GET.get('start') else None
+        end_date = date.fromisoformat(request.GET['end']) if request.GET.get('end') else None
+    except ValueError:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Dates must be in YYYY-MM-DD format.'
+        }, status=400)
+    
+    cell_size = _parse_cell_size(request, default=20.0)
+    return JsonResponse(get_farm_hotspots(farm, start_date, end_date, cell_size))
+
+
+@staff_member_required
+def geoscape_status_api(request):
+    """
+    Staff-only API endpoint reporting Geoscape health and usage.
+    
+    Shows the circuit breaker state, per-endpoint call counts, status codes
+    and latency histograms for this worker, quota usage for today and this
+    month, and how many calls were coalesced into in-flight requests.
+    
+    Args:
+        request: HTTP request
+        
+    Returns:
+        JsonResponse with the breaker state and endpoint metrics
+    """
+    return JsonResponse({'status': 'success', **get_geoscape_status()})
+
+
+@login_required
+def observation_tile_api(request, z, x, y):
+    """
+    API endpoint serving a z/x/y GeoJSON tile of observation points.
+    
+    Points are clustered below tile_service.CLUSTER_MAX_ZOOM and returned
+    individually above it. Responses carry an ETag so unchanged tiles are
+    answered with 304 Not Modified.
+    
+    Query parameters:
+    - farm: farm ID, or session: session UUID (one is required)
+    - pest, disease: optional pest/disease IDs to filter by
+    - start, end: optional date range (YYYY-MM-DD), inclusive
+    
+    Args:
+        request: HTTP request
+        z: Zoom level
+        x: Tile column
+        y: Tile row
+        
+    Returns:
+        JsonResponse with a GeoJSON FeatureCollection
+    """
+    if not is_valid_tile(z, x, y):
+        return JsonResponse({'status': 'error', 'message': 'Invalid tile coordinates.'}, status=400)
+    
+    farm_id = request.GET.get('farm')
+    session_id = request.GET.get('session')
+    try:
+        if session_id:
+            session = get_object_or_404(
+                SurveySession.objects.select_related('farm__owner'),
+                session_id=session_id
+            )
+            if session.surveyor != request.user and session.farm.owner.user != request.user:
+                return JsonResponse({
+                    'status': 'error',
+                    'message': 'You do not have permission to view this survey session.'
+                }, status=403)
+            observations = Observation.objects.filter(session=session)
+            scope_key = f'session:{session.pk}'
+            versions = [('session', session.pk), REFERENCE]
+        elif farm_id:
+            farm = get_object_or_404(Farm, id=farm_id, owner=request.user.grower_profile)
+            observations = Observation.objects.filter(session__farm=farm)
+            scope_key = f'farm:{farm.pk}'
+            versions = [('farm', farm.pk), REFERENCE]
+        else:
+            return JsonResponse({'status': 'error', 'message': 'A farm or session is required.'}, status=400)
+        
+        pest_id = int(request.GET['pest']) if request.GET.get('pest') else None
+        disease_id = int(request.GET['disease']) if request.GET.get('disease') else None
+        start_date = date.fromisoformat(request.GET['start']) if request.GET.get('start') else None
+        end_date = date.fromisoformat(request.GET['end']) if request.GET.get('end') else None
+    except (ValueError, ValidationError):
+        return JsonResponse({'status': 'error', 'message': 'Invalid filter parameters.'}, status=400)
+    
+    observations = filter_observations(observations, pest_id, disease_id, start_date, end_date)
+    scope_key = f'{scope_key}:{pest_id}:{disease_id}:{start_date}:{end_date}'
+    tile, etag = get_observation_tile(observations, scope_key, z, x, y, versions)
+    
+    quoted_etag = f'"{etag}"'
+    if request.headers.get('If-None-Match') == quoted_etag:
+        response = HttpResponseNotModified()
+    else:
+        response = JsonResponse(tile)
+    response['ETag'] = quoted_etag
+    response['Cache-Control'] = 'private, max-age=60'
+    return response
+
+
 @login_required
 def survey_session_list_view(request, farm_id):
     """
@@ -1667,6 +2317,22 @@ def generate_test_observation_data(farm_id):
     return observation_coords, all_pests, all_diseases, farm_boundary_json
 
 
+def _session_detail_versions(request, session_id):
+    """Version keys for a session detail page: the session, its farm and reference data."""
+    session = SurveySession.objects.filter(session_id=session_id).values('pk', 'farm_id').first()
+    if session is None:
+        return [('session', session_id)]
+    return [('session', session['pk']), ('farm', session['farm_id']), REFERENCE]
+
+
+def _session_shows_demo_data(request, session_id):
+    """Empty sessions on farm 1 show random demo data, which must not be cached."""
+    return SurveySession.objects.filter(
+        session_id=session_id, farm_id=1, observations__isnull=True
+    ).exists()
+
+
+@cache_per_user(_session_detail_versions, unless=_session_shows_demo_data)
 def survey_session_detail_view(request, session_id):
     """
     Displays the details of a completed or abandoned survey session.
@@ -1690,7 +2356,7 @@ def survey_session_detail_view(request, session_id):
     try:
         # Fetch the session, prefetching related data for efficiency
         session = get_object_or_404(
-            SurveySession.objects.select_related('farm', 'surveyor'), 
+            SurveySession.objects.select_related('farm', 'surveyor', 'summary'), 
             session_id=session_id
         )
         logger.info(f"Fetched session {session.session_id} for farm '{session.farm.name}'")
@@ -1719,8 +2385,13 @@ def survey_session_detail_view(request, session_id):
         'images'
     ).order_by('observation_time')
     
+    # Completed sessions render from their stored summary
+    summary = get_session_summary(session)
+    
     # --- Determine if we need test data ---
-    use_test_data = session.farm.id == 1 and not observations.exists()
+    use_test_data = session.farm.id == 1 and (
+        summary.observation_count == 0 if summary else not observations.exists()
+    )
     
     # --- Process observations or generate test data ---
     observation_coords = []
@@ -1739,22 +2410,21 @@ def survey_session_detail_view(request, session_id):
         except Exception as e:
             logger.error(f"Error generating test data: {e}", exc_info=True)
             use_test_data = False
-    else:
-        # Process actual observation data
-        observation_coords = []
-        for obs in observations:
-            if obs.has_coordinates():
-                observation_coords.append({
-                    'lat': float(obs.latitude), 
-                    'lon': float(obs.longitude),
-                    'time': obs.observation_time.strftime('%I:%M %p'),
-                    'pests': [p.name for p in obs.pests_observed.all()],
-                    'diseases': [d.name for d in obs.diseases_observed.all()],
-                    'has_image': obs.has_images()
-                })
-    
-    # Serialize observation coordinates for the map
+    
+    # Demo points are embedded in the page; real observations are loaded by
+    # the map from the tile and heatmap APIs, so only their extent is needed
     observation_coords_json = json.dumps(observation_coords)
+    map_bounds = None
+    if summary and not use_test_data:
+        if summary.bbox:
+            south, west, north, east = summary.bbox
+            map_bounds = [[south, west], [north, east]]
+    elif not use_test_data:
+        extent = filter_observations(Observation.objects.filter(session=session)).aggregate(
+            south=Min('latitude'), west=Min('longitude'), north=Max('latitude'), east=Max('longitude')
+        )
+        if extent['south'] is not None:
+            map_bounds = [[float(extent['south']), float(extent['west'])], [float(extent['north']), float(extent['east'])]]
 
     # --- Calculate stats and prepare context data ---
     if use_test_data:
@@ -1763,11 +2433,15 @@ def survey_session_detail_view(request, session_id):
         observations, unique_pests, unique_diseases = create_mock_observations(
             observation_coords, all_pests, all_diseases
         )
+    elif summary:
+        completed_count = summary.observation_count
+        unique_pests = summary.unique_pests
+        unique_diseases = summary.unique_diseases
     else:
         # For real data, use database queries
         completed_count = observations.count()
-        unique_pests = Pest.objects.filter(observations__session=session).distinct()
-        unique_diseases = Disease.objects.filter(observations__session=session).distinct()
+        unique_pests = list(Pest.objects.filter(observations__session=session).distinct())
+        unique_diseases = list(Disease.objects.filter(observations__session=session).distinct())
 
     # --- Process farm boundary data ---
     farm_boundary_json = session.farm.boundary if session.farm.boundary else None
@@ -1785,13 +2459,18 @@ def survey_session_detail_view(request, session_id):
         'farm': session.farm,
         'observations': observations,
         'completed_count': completed_count,
-        'unique_pests_count': unique_pests.count(),
-        'unique_diseases_count': unique_diseases.count(),
+        'unique_pests_count': len(unique_pests),
+        'unique_diseases_count': len(unique_diseases),
         'unique_pests': unique_pests,
         'unique_diseases': unique_diseases,
         'observation_coords_json': observation_coords_json,
+        'map_bounds': map_bounds,
+        'has_map_points': bool(observation_coords) or map_bounds is not None,
         'farm_boundary_json': farm_boundary_json_str,
-        'using_test_data': use_test_data
+        'using_test_data': use_test_data,
+        # Demo data is random on every render, so it must not be cached
+        # (the whole page is excluded by _session_shows_demo_data)
+        'fragment_timeout': 0 if use_test_data else getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 60 * 60),
     }
 
     return render(request, 'core/survey_session_detail.html', context)
@@ -1969,6 +2648,9 @@ def create_mock_observations(observation_coords, all_pests, all_diseases):
         
         def count(self):
             return len(self.items)
+        
+        def __len__(self):
+            return len(self.items)
             
         def __iter__(self):
             return iter(self.items)
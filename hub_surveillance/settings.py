@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
 from pathlib import Path
+import importlib.util
 import os
 from dotenv import load_dotenv
 
@@ -82,14 +83,110 @@ WSGI_APPLICATION = 'hub_surveillance.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# SQLite by default. Set DB_ENGINE=postgresql (with DB_NAME, DB_USER,
+# DB_PASSWORD, DB_HOST, DB_PORT) to use PostgreSQL; this needs psycopg
+# (see requirements.txt). Connections are kept open for DB_CONN_MAX_AGE
+# seconds and health-checked before each request reuses them. Behind a
+# transaction-pooling PgBouncer set DB_PGBOUNCER=1, which turns off the
+# server-side cursors that mode cannot support.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite').lower()
+
+if DB_ENGINE in ('postgres', 'postgresql'):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'hub_surveillance'),
+            'USER': os.environ.get('DB_USER', ''),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('DB_PGBOUNCER', '').lower() in ('1', 'true', 'yes'),
+            'OPTIONS': {
+                'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 5)),
+                'sslmode': os.environ.get('DB_SSLMODE', 'prefer'),
+            },
+        }
     }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 0)),
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+
+# Applied to every new SQLite connection (see core/signals.py). WAL lets
+# surveyors keep reading while another one writes, and synchronous=NORMAL
+# only syncs at checkpoints, which is still safe against application
+# crashes in WAL mode. busy_timeout (ms) makes a writer wait for the lock
+# rather than fail with "database is locked". cache_size is in KiB when
+# negative. Run `manage.py benchmark_db_concurrency` to compare against
+# SQLite's defaults, or set this to {} to use them.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 10000,
+    'cache_size': -32000,
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'MEMORY',
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+# CACHE_BACKEND picks the default cache: 'locmem' (per process, the default),
+# 'file' (shared by the workers on one host, under CACHE_DIR) or 'redis'
+# (shared by every host, at CACHE_URL; needs the redis package, see
+# requirements.txt). Any Redis-compatible server (Valkey, KeyDB, ...) works.
+# Drafts, heatmaps, tiles, API quotas and cached views all use this cache.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem').lower()
+CACHE_KEY_PREFIX = os.environ.get('CACHE_KEY_PREFIX', 'hub')
+
+if CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('CACHE_URL', 'redis://127.0.0.1:6379/1'),
+            'KEY_PREFIX': CACHE_KEY_PREFIX,
+            'TIMEOUT': 300,
+        }
+    }
+elif CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_DIR', os.path.join(BASE_DIR, 'cache')),
+            'KEY_PREFIX': CACHE_KEY_PREFIX,
+            'TIMEOUT': 300,
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'hub-surveillance',
+            'KEY_PREFIX': CACHE_KEY_PREFIX,
+            'TIMEOUT': 300,
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+
+# Rendered pages cached per user by core.services.view_cache.cache_per_user.
+# Model saves bump the version tokens these entries are keyed on, so the
+# timeout only bounds how long unreachable entries linger.
+VIEW_CACHE_TIMEOUT = 10 * 60
+
+# Template fragments ({% cache %} blocks keyed with {% cache_version %}) on
+# the farm and survey session pages. 0 renders them without caching.
+FRAGMENT_CACHE_TIMEOUT = 60 * 60
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -130,10 +227,69 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+# Third-party CSS/JS is pinned in core/static_assets.py and loaded from its
+# CDN (with Subresource Integrity) until `manage.py vendor_static` has been
+# run and static/vendor/ committed. Once it has, switch collectstatic to the
+# hashing, precompressing storage so the vendored files can be cached forever:
+#
+# STORAGES = {
+#     'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+#     'staticfiles': {'BACKEND': 'core.storage.PrecompressedManifestStaticFilesStorage'},
+# }
+STATIC_PRECOMPRESS_MIN_SIZE = 256  # bytes; smaller files are not precompressed
+
+# When WhiteNoise is installed it serves static files from the app, choosing
+# the precompressed copies the browser accepts. With the storage above,
+# hashed files are sent with
+# "Cache-Control: max-age=315360000, public, immutable"; the rest are cached
+# for WHITENOISE_MAX_AGE seconds. Without it, configure the web server to do
+# the same for STATIC_URL.
+if importlib.util.find_spec('whitenoise') is not None:
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1,
+        'whitenoise.middleware.WhiteNoiseMiddleware',
+    )
+    WHITENOISE_MAX_AGE = 60 * 60
+
 # Media files (User uploaded files)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Resumable chunked image uploads (see core/services/upload_service.py)
+IMAGE_UPLOAD_CHUNK_SIZE = 512 * 1024  # 512 KB per chunk
+IMAGE_UPLOAD_MAX_SIZE = 20 * 1024 * 1024  # 20 MB per image
+
+# Live survey session progress streams (see core/services/session_events.py).
+# Without a Redis URL events are fanned out in-process, which only reaches
+# viewers connected to the same worker. Serve under ASGI (e.g. uvicorn
+# hub_surveillance.asgi:application) so open streams don't hold worker threads.
+SESSION_EVENTS_REDIS_URL = os.environ.get('SESSION_EVENTS_REDIS_URL')
+SESSION_EVENTS_MAX_STREAM_SECONDS = 300
+
+# Where auto-saved observation drafts are kept (see core/services/draft_service.py):
+# 'database' (draft Observation rows), 'cache' (Django cache) or 'file'.
+DRAFT_STORE = os.environ.get('DRAFT_STORE', 'database')
+DRAFT_STORE_DIR = os.path.join(BASE_DIR, 'draft_store')
+DRAFT_STORE_TIMEOUT = 7 * 24 * 60 * 60  # Buffered drafts expire after a week
+
+# Binned heatmap grids are cached per scope, filters and data version
+HEATMAP_CACHE_TIMEOUT = 60 * 60
+OBSERVATION_TILE_CACHE_TIMEOUT = 60 * 60
+
+# What happens to submitted observations whose GPS position is outside the
+# farm boundary: 'flag' (store and mark them), 'reject' or 'off'
+OBSERVATION_BOUNDARY_POLICY = os.environ.get('OBSERVATION_BOUNDARY_POLICY', 'flag')
+
+# Upper bound on target points in a session's sampling plan
+# (see core/services/sampling_service.py)
+SAMPLING_PLAN_MAX_POINTS = 5000
+
+# Walking routes through sampling plans (see core/services/route_service.py):
+# seconds spent improving a route, and how close (metres) an observation must
+# be to a target for it to count as visited
+ROUTE_TIME_LIMIT = 0.15
+ROUTE_VISIT_RADIUS_M = 5.0
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -147,6 +303,66 @@ LOGIN_URL = 'core:login'
 # Read the API key from the environment variable loaded from .env
 GEOSCAPE_API_KEY = os.environ.get('GEOSCAPE_API_KEY')
 
+# Geoscape HTTP client (see core/services/http_client.py). Connections are
+# pooled and kept alive; GET requests failing with 429/5xx or a network error
+# are retried with jittered exponential backoff.
+GEOSCAPE_BASE_URL = os.environ.get('GEOSCAPE_BASE_URL', 'https://api.psma.com.au')
+GEOSCAPE_POOL_SIZE = int(os.environ.get('GEOSCAPE_POOL_SIZE', 10))
+GEOSCAPE_CONNECT_TIMEOUT = 3.05
+GEOSCAPE_READ_TIMEOUT = 10
+GEOSCAPE_MAX_RETRIES = 2
+GEOSCAPE_BACKOFF_BASE = 0.25
+GEOSCAPE_BACKOFF_MAX = 4.0
+
+# Circuit breaker (see core/services/circuit_breaker.py). It opens after
+# FAILURE_THRESHOLD consecutive failed calls, or when the p95 of the last
+# WINDOW call latencies exceeds LATENCY_THRESHOLD seconds, then refuses calls
+# for RESET_TIMEOUT seconds before letting HALF_OPEN_CALLS probes through.
+# Staff can see its state and per-endpoint metrics at /api/staff/geoscape-status/.
+GEOSCAPE_BREAKER_FAILURE_THRESHOLD = 5
+GEOSCAPE_BREAKER_LATENCY_THRESHOLD = 3.0
+GEOSCAPE_BREAKER_WINDOW = 50
+GEOSCAPE_BREAKER_RESET_TIMEOUT = 30
+GEOSCAPE_BREAKER_HALF_OPEN_CALLS = 1
+
+# 'live' calls Geoscape; 'record' also saves each response under
+# GEOSCAPE_FIXTURE_DIR; 'replay' answers from those fixtures offline. For load
+# tests, run `manage.py geoscape_standin` and point GEOSCAPE_BASE_URL at it.
+GEOSCAPE_MODE = os.environ.get('GEOSCAPE_MODE', 'live')
+GEOSCAPE_FIXTURE_DIR = os.environ.get('GEOSCAPE_FIXTURE_DIR', os.path.join(BASE_DIR, 'geoscape_fixtures'))
+
+# In-process address search caches (see core/services/address_cache.py).
+# A search returning fewer than GEOSCAPE_SUGGESTION_LIMIT results is treated
+# as complete, and longer queries extending it are filtered locally.
+GEOSCAPE_SUGGESTION_LIMIT = 10
+ADDRESS_SUGGESTION_CACHE_SIZE = 1024
+ADDRESS_SUGGESTION_CACHE_TTL = 10 * 60
+REGION_CACHE_TTL = 5 * 60
+
+# Cached cadastral parcels (core.models.CadastralBoundary) are trusted for this
+# many seconds unless Geoscape sends a max-age, then served while being
+# revalidated with a conditional request in a background thread
+CADASTRAL_CACHE_TTL = 30 * 24 * 60 * 60
+CADASTRAL_REVALIDATE_IN_BACKGROUND = True
+
+# Fetch farm boundaries from Geoscape in a background thread after farm
+# create/edit, tracked by Farm.boundary_status (False fetches inline). A fetch
+# still pending after BOUNDARY_PENDING_TIMEOUT seconds (e.g. lost to a
+# restart) is re-queued when its status is next read; run
+# `manage.py fetch_farm_boundaries` periodically to sweep the rest.
+BOUNDARY_FETCH_IN_BACKGROUND = True
+BOUNDARY_PENDING_TIMEOUT = 10 * 60
+
+# Bulk farm import (farms/import/ and `manage.py import_farms`). Addresses and
+# boundaries are resolved by FARM_IMPORT_WORKERS threads making at most
+# FARM_IMPORT_RATE_LIMIT Geoscape calls per second between them. The web
+# page resolves rows within the request, so it takes at most
+# FARM_IMPORT_WEB_MAX_ROWS; larger files go through the management command.
+FARM_IMPORT_MAX_ROWS = 500
+FARM_IMPORT_WEB_MAX_ROWS = 25
+FARM_IMPORT_WORKERS = 8
+FARM_IMPORT_RATE_LIMIT = 10.0
+
 # Add a check during development (optional but recommended)
 # if DEBUG and not GEOSCAPE_API_KEY:
 #     print("\n*** WARNING: GEOSCAPE_API_KEY environment variable not set! ***\n")